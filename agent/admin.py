@@ -1,16 +1,125 @@
 from django.contrib import admin
 from .models import ScholarshipLead
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+from . import facets, tags
+from .canonical import canonicalize_url
 from .models import ScholarshipCategory, VerifiedScholarship
 
+# Above this many rows the unfiltered changelist shows an estimate instead of COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimate_row_count(model):
+    """
+    Cheap row estimate for SQLite: the row count ANALYZE stored in sqlite_stat1,
+    or the rowid span when the table was never analysed. Both are O(1).
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            row = cursor.fetchone()
+            if row:
+                return int(row[0].split()[0])
+        except Exception:
+            pass # no sqlite_stat1 yet
+        cursor.execute(f'SELECT MAX(rowid) - MIN(rowid) + 1 FROM "{table}"')
+        return cursor.fetchone()[0] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Skips the full-table COUNT(*) on unfiltered changelist pages of big tables."""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimate_row_count(self.object_list.model)
+            if estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class TrustScoreBucketFilter(admin.SimpleListFilter):
+    """Range buckets (same cut-offs as the Trust Engine statuses) instead of one link per score."""
+    title = 'trust score'
+    parameter_name = 'trust_bucket'
+    BUCKETS = {
+        'risk': ('Risk (below 30)', None, 30),
+        'caution': ('Caution (30 - 60)', 30, 61),
+        'verified': ('Verified (61 - 89)', 61, 90),
+        'official': ('Official source (90+)', 90, None),
+    }
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, (label, _, _) in self.BUCKETS.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.BUCKETS:
+            return queryset
+        _, low, high = self.BUCKETS[self.value()]
+        if low is not None:
+            queryset = queryset.filter(trust_score__gte=low)
+        if high is not None:
+            queryset = queryset.filter(trust_score__lt=high)
+        return queryset
+
+
 @admin.register(VerifiedScholarship)
 class VerifiedScholarshipAdmin(admin.ModelAdmin):
     list_display = ('title', 'trust_score', 'category', 'added_from')
-    list_filter = ('added_from', 'category', 'trust_score')
+    list_select_related = ('category',)
+    list_filter = ('added_from', 'category', TrustScoreBucketFilter)
     search_fields = ('title', 'url')
+    search_help_text = ("Paste a link to find its exact record, or type the start of a title "
+                        "(anything else falls back to a slower substring search).")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False # avoids a second COUNT(*) on filtered pages
+
+    def get_search_results(self, request, queryset, search_term):
+        # Indexed lookups first: exact canonical URL, or a title prefix
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.startswith(('http://', 'https://', 'www.')):
+            url = term if '://' in term else f"https://{term}"
+            matches = queryset.filter(canonical_url=canonicalize_url(url))
+        else:
+            matches = queryset.filter(title__istartswith=term)
+        if matches.exists():
+            return matches, False
+        # Nothing found that way (a word from the middle of a title, part of a URL):
+        # the stock icontains search over search_fields
+        return super().get_search_results(request, queryset, search_term)
+
+    def save_model(self, request, obj, form, change):
+        # Same bookkeeping as utils._upsert_scholarship; the change view already runs in a
+        # transaction. Deletes are covered by the pre_delete signal and the tag FK cascade.
+        before = (VerifiedScholarship.objects
+                  .filter(pk=obj.pk)
+                  .values_list('category__name', 'added_from', 'status')
+                  .first()) if change else None
+        super().save_model(request, obj, form, change)
+        facets.apply_change(
+            facets.facet_values(*before) if before else None,
+            facets.facet_values(obj.category.name, obj.added_from, obj.status),
+        )
+        tags.sync_tags(obj.pk, obj.documents_required, obj.security_flags)
+
+
+@admin.register(ScholarshipCategory)
+class ScholarshipCategoryAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        old_name = ScholarshipCategory.objects.filter(pk=obj.pk).values_list('name', flat=True).first() if change else None
+        super().save_model(request, obj, form, change)
+        if old_name is not None and old_name != obj.name:
+            # A rename moves every scholarship of the category to the new facet value
+            facets.move('category', old_name, obj.name, n=obj.scholarships.count())
 
-admin.site.register(ScholarshipCategory)
 @admin.register(ScholarshipLead)
 class LeadAdmin(admin.ModelAdmin):
     list_display = ('title', 'status', 'trust_score', 'income_limit')
-    list_filter = ('status',)
\ No newline at end of file
+    list_filter = ('status',)
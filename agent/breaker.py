@@ -0,0 +1,252 @@
+# agent/breaker.py
+import time
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from . import metrics
+from .models import CircuitBreaker
+
+CLOSED = "closed"       # calls go through, outcomes are counted
+OPEN = "open"           # calls are refused, callers use their fallback
+HALF_OPEN = "half_open" # one probe call decides between closed and open
+
+DEFAULT_BREAKER = {
+    'window_seconds': 60,     # outcomes are counted over this window
+    'min_calls': 5,           # don't judge an upstream on fewer calls
+    'error_rate': 0.5,        # trip when this share of calls fail...
+    'slow_rate': 0.5,         # ...or are slower than slow_call_seconds
+    'slow_call_seconds': 5.0,
+    'cooldown_seconds': 30,   # stay open this long before probing
+    'probe_timeout': 30,      # a probe that never reports back is retried after this
+}
+# Per-upstream differences from DEFAULT_BREAKER. Override single values with
+# settings.CIRCUIT_BREAKERS, e.g. {'gemini': {'cooldown_seconds': 60}}.
+DEFAULT_BREAKERS = {
+    'gemini': {'slow_call_seconds': 15.0},      # open -> regex-only URL extraction
+    'twilio': {'slow_call_seconds': 5.0},
+    'google_news': {'slow_call_seconds': 3.0},  # open (with ddgs) -> DB-only search results
+    'ddgs': {'slow_call_seconds': 5.0},
+}
+_configured = getattr(settings, 'CIRCUIT_BREAKERS', {})
+BREAKERS = {
+    name: {**DEFAULT_BREAKER, **DEFAULT_BREAKERS.get(name, {}), **_configured.get(name, {})}
+    for name in {**DEFAULT_BREAKERS, **_configured}
+}
+# How stale this worker's view of a breaker may get, and how long healthy
+# outcomes are counted in memory before they are added to the shared row.
+# Failures and slow calls are written at once, so tripping is not delayed.
+SYNC_SECONDS = getattr(settings, 'CIRCUIT_BREAKER_SYNC_SECONDS', 2.0)
+
+
+class CircuitOpen(Exception):
+    """The upstream's breaker is open: don't call it, use the fallback."""
+
+    def __init__(self, name):
+        super().__init__(f"{name} is temporarily unavailable (circuit open)")
+        self.name = name
+
+
+class _View:
+    """This worker's copy of one breaker row, plus outcomes not yet written to it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.retry_at = 0.0
+        self.window_started_at = 0.0
+        self.read_at = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.last_error = ""
+        self.flushed_at = time.time()
+
+
+# In-process half: one view per upstream in this worker
+_views = {}
+_views_lock = threading.Lock()
+
+
+def _view(name):
+    with _views_lock:
+        return _views.setdefault(name, _View())
+
+
+def _refresh(name, view, now, force=False):
+    """Re-reads the shared row (a plain SELECT) once the local copy is older than SYNC_SECONDS."""
+    if not force and now - view.read_at < SYNC_SECONDS:
+        return
+    breaker, _ = CircuitBreaker.objects.get_or_create(name=name, defaults={'window_started_at': now})
+    view.state, view.retry_at, view.window_started_at = breaker.state, breaker.retry_at, breaker.window_started_at
+    view.read_at = now
+
+
+def _transition(rows, name, view, state, now, **extra):
+    """Conditional UPDATE into `state`; returns True if this caller made the change."""
+    changed = rows.update(state=state, changed_at=now, **extra)
+    if changed:
+        print(f"⚠️ Circuit breaker {name}: -> {state}")
+        metrics.incr(f"breaker.{name}.{state}")
+        view.state, view.retry_at = state, extra.get('retry_at', view.retry_at)
+    return bool(changed)
+
+
+def _flush(name, view, config, now):
+    """Adds this worker's pending outcomes to the shared window and trips the breaker if it is unhealthy."""
+    calls, failures, slow_calls, error = view.calls, view.failures, view.slow_calls, view.last_error
+    view.calls = view.failures = view.slow_calls = 0
+    view.last_error = ""
+    view.flushed_at = now
+    if not calls:
+        return
+
+    if view.window_started_at + config['window_seconds'] <= now:
+        # Fixed window: start counting afresh
+        started_afresh = CircuitBreaker.objects.filter(name=name, window_started_at=view.window_started_at).update(
+            window_started_at=now, calls=0, failures=0, slow_calls=0
+        )
+        if started_afresh:
+            view.window_started_at = now
+        else:
+            view.read_at = 0.0 # another worker did: pick up its window next time
+
+    CircuitBreaker.objects.filter(name=name, state=CLOSED).update(
+        calls=F('calls') + calls,
+        failures=F('failures') + failures,
+        slow_calls=F('slow_calls') + slow_calls,
+        **({'last_error': error[:255]} if error else {}),
+    )
+    # Trip atomically: only a closed breaker over a threshold opens, and only once
+    unhealthy = (CircuitBreaker.objects
+                 .filter(name=name, state=CLOSED, calls__gte=config['min_calls'])
+                 .filter(Q(failures__gte=F('calls') * config['error_rate']) | Q(slow_calls__gte=F('calls') * config['slow_rate'])))
+    _transition(unhealthy, name, view, OPEN, now, retry_at=now + config['cooldown_seconds'])
+
+
+# ==========================================
+#  ALLOW / RECORD (shared by all gunicorn workers)
+# ==========================================
+def allow(name):
+    """
+    True if the call may go ahead. While open, exactly one caller (across all
+    workers) is let through as the half-open probe once the cooldown is over.
+    """
+    config = BREAKERS[name]
+    view = _view(name)
+    with view.lock:
+        now = time.time()
+        _refresh(name, view, now)
+        if view.state == CLOSED:
+            return True
+
+        if view.retry_at <= now:
+            # Cooldown over in this worker's copy: check the shared row, another worker may have probed already
+            _refresh(name, view, now, force=True)
+            if view.state == CLOSED:
+                return True
+            if view.retry_at <= now:
+                # Claim the probe: the conditional UPDATE only succeeds for one worker
+                probe = CircuitBreaker.objects.filter(name=name, state=view.state, retry_at=view.retry_at)
+                if _transition(probe, name, view, HALF_OPEN, now, retry_at=now + config['probe_timeout']):
+                    return True
+
+    metrics.incr(f"breaker.{name}.rejected")
+    return False
+
+
+def record(name, ok, elapsed, error=""):
+    """
+    Counts one call's outcome and moves the breaker between states. Healthy
+    outcomes are batched in memory; the shared row is written at most every
+    SYNC_SECONDS per worker, or at once for a failure or a probe's result.
+    """
+    config = BREAKERS[name]
+    slow = elapsed > config['slow_call_seconds']
+    view = _view(name)
+    with view.lock:
+        now = time.time()
+        _refresh(name, view, now)
+
+        if view.state == HALF_OPEN:
+            probe = CircuitBreaker.objects.filter(name=name, state=HALF_OPEN)
+            if ok and not slow:
+                _transition(probe, name, view, CLOSED, now, window_started_at=now, calls=0, failures=0, slow_calls=0, last_error="")
+                view.window_started_at = now
+            else:
+                _transition(probe, name, view, OPEN, now, retry_at=now + config['cooldown_seconds'], last_error=error[:255])
+            view.calls = view.failures = view.slow_calls = 0
+            view.last_error = ""
+            return
+
+        if view.state != CLOSED:
+            return # a straggler finishing after the breaker opened
+
+        view.calls += 1
+        view.failures += 0 if ok else 1
+        view.slow_calls += 1 if slow else 0
+        view.last_error = error or view.last_error
+        if not ok or slow or now - view.flushed_at >= SYNC_SECONDS:
+            _flush(name, view, config, now)
+
+
+class _Call:
+    def __init__(self):
+        self.ok = True
+        self.error = ""
+
+    def fail(self, error=""):
+        """Marks the call failed without raising (e.g. an HTTP 5xx response)."""
+        self.ok = False
+        self.error = str(error)
+
+
+@contextmanager
+def guard(name):
+    """
+    Wraps one upstream call:
+
+        with breaker.guard('gemini') as call:
+            ...                      # exceptions count as failures and propagate
+            call.fail("HTTP 503")    # or mark a failure explicitly
+
+    Raises CircuitOpen (before running the block) while the breaker is open.
+    """
+    if not allow(name):
+        raise CircuitOpen(name)
+    call = _Call()
+    started = time.monotonic()
+    try:
+        yield call
+    except Exception as e:
+        call.fail(e)
+        raise
+    finally:
+        record(name, call.ok, time.monotonic() - started, call.error)
+
+
+def is_open(name):
+    """True while calls are being refused (open, or half-open with a probe in flight)."""
+    view = _view(name)
+    with view.lock:
+        now = time.time()
+        _refresh(name, view, now)
+        return view.state != CLOSED and view.retry_at > now
+
+
+def breaker_snapshot():
+    now = time.time()
+    return [
+        {
+            "upstream": b.name,
+            "state": b.state,
+            "calls_in_window": b.calls,
+            "failures_in_window": b.failures,
+            "slow_calls_in_window": b.slow_calls,
+            "retry_in": round(max(0.0, b.retry_at - now), 1) if b.state != CLOSED else 0,
+            "last_error": b.last_error,
+        }
+        for b in CircuitBreaker.objects.order_by('name')
+    ]
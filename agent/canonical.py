@@ -0,0 +1,52 @@
+# agent/canonical.py
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query params that only track where a click came from, never what the page is
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'oc', 'ocid', 'cmpid', 'spm', '_ga',
+}
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def canonicalize_url(url):
+    """
+    Reduces a link to the key we use to decide "is this the same scholarship page?".
+
+    - http/https are treated as the same page (stored as https)
+    - host is lower-cased, 'www.' and default ports are dropped
+    - utm_* and other tracking params are removed, the rest are sorted
+    - fragments and trailing slashes are dropped
+
+    The original URL is still what we score and show; this is only the identity.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port # raises on "https://x.gov.in:99999/" or a non-numeric port
+    except ValueError:
+        return url
+
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and str(port) in DEFAULT_PORTS.values():
+        port = None
+    netloc = f"{host}:{port}" if port else host
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query_pairs = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    query = urlencode(sorted(query_pairs))
+
+    return urlunsplit(('https', netloc, path, query, ''))
@@ -0,0 +1,450 @@
+# agent/crawler.py
+import re
+import time
+import hashlib
+from collections import Counter, defaultdict, deque
+from datetime import timedelta
+from urllib import robotparser
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from lxml import etree, html as lxml_html
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+
+from . import metrics
+from .landing import LandingPageScanner
+from .models import CrawlFrontier, VerifiedScholarship
+from .trust import verify_url_authenticity
+from .utils import extract_rich_metadata, save_scholarship_to_db
+
+SEED_PORTALS = getattr(settings, 'CRAWL_SEED_PORTALS', [])
+USER_AGENT = getattr(settings, 'CRAWL_USER_AGENT', 'AUTHIC-PortalCrawler/1.0')
+MAX_DEPTH = getattr(settings, 'CRAWL_MAX_DEPTH', 2)
+MAX_PAGES_PER_RUN = getattr(settings, 'CRAWL_MAX_PAGES_PER_RUN', 200)
+CONCURRENCY = getattr(settings, 'CRAWL_CONCURRENCY', 4)
+HOST_CONCURRENCY = getattr(settings, 'CRAWL_HOST_CONCURRENCY', 2)
+HOST_DELAY = getattr(settings, 'CRAWL_HOST_DELAY_SECONDS', 1.0)
+RECRAWL_AFTER = timedelta(seconds=getattr(settings, 'CRAWL_RECRAWL_SECONDS', 24 * 60 * 60))
+MAX_PAGE_BYTES = getattr(settings, 'CRAWL_MAX_PAGE_BYTES', 1024 * 1024)
+PORTAL_RESULTS = getattr(settings, 'CRAWL_PORTAL_RESULTS', 5)
+DEFAULT_CATEGORY = 'official portals'
+FETCH_TIMEOUT = 10
+CLAIM_LEASE = timedelta(minutes=10) # a crashed run's claimed pages come due again after this
+MAX_LINKS_PER_PAGE = 200
+MIN_TRUST_SCORE = 30 # same bar as refresh_category_from_web
+CHUNK_SIZE = 16 * 1024
+
+SKIP_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.zip', '.rar',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.css', '.js', '.xml', '.mp3', '.mp4',
+)
+# Title / heading of a page that describes one scheme (English + Marathi transliterations)
+SCHEME_HINTS = re.compile(r'scholarship|scheme|yojana|fellowship|stipend|freeship|fee (?:reimbursement|waiver)|shishyavrutti', re.I)
+
+
+# ==========================================
+#  URLS + SEEDS
+# ==========================================
+def normalize_link(base_url, href):
+    """Absolute http(s) URL without fragment, or None for links we never follow."""
+    try:
+        parts = urlsplit(urljoin(base_url, (href or '').strip()))
+    except ValueError:
+        return None
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    if parts.path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+
+def same_site(host, seed_host):
+    """mahadbt.maharashtra.gov.in covers www. and its own subdomains, nothing else."""
+    host, seed_host = host.removeprefix('www.'), seed_host.removeprefix('www.')
+    return host == seed_host or host.endswith('.' + seed_host)
+
+
+def configured_seeds(seeds=None):
+    """{normalized seed URL: seed dict} for CRAWL_SEED_PORTALS (or the given list)."""
+    result = {}
+    for seed in seeds if seeds is not None else SEED_PORTALS:
+        url = normalize_link(seed['url'], seed['url'])
+        if url:
+            result[url] = {'category': DEFAULT_CATEGORY, **seed, 'url': url, 'host': urlsplit(url).hostname}
+    return result
+
+
+def official_portal_scholarships(query, limit=PORTAL_RESULTS):
+    """
+    Crawled scheme pages to list next to a keyword's own results. They are
+    stored under the seeds' categories ('official portals'), which nobody
+    searches for, so the search views add them here: pages that mention the
+    keyword first, then the most trusted.
+    """
+    categories = {seed['category'] for seed in configured_seeds().values()} or {DEFAULT_CATEGORY}
+    mentions = Q(title__icontains=query) | Q(info_paragraph__icontains=query)
+    return (VerifiedScholarship.objects
+            .filter(category__name__in=categories, added_from="Crawler")
+            .annotate(mentions_query=ExpressionWrapper(mentions, output_field=BooleanField()))
+            .order_by('-mentions_query', '-trust_score', '-created_at')[:limit])
+
+
+# ==========================================
+#  ROBOTS.TXT
+# ==========================================
+class RobotsRules:
+    """robots.txt per host, fetched once per run."""
+    ALLOWED, BLOCKED, UNREACHABLE = 'allowed', 'blocked', 'unreachable'
+
+    def __init__(self, session):
+        self.session = session
+        self.rules = {} # netloc -> RobotFileParser, or None if it could not be read
+
+    def _load(self, url):
+        parts = urlsplit(url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        try:
+            response = self.session.get(robots_url, headers={'User-Agent': USER_AGENT}, timeout=FETCH_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"⚠️ robots.txt unreachable for {parts.netloc}, not crawling it this run: {e}")
+            return None
+        if response.status_code >= 500 or response.status_code == 429:
+            print(f"⚠️ robots.txt for {parts.netloc} answered HTTP {response.status_code}, not crawling it this run")
+            return None
+
+        parser = robotparser.RobotFileParser(robots_url)
+        if response.status_code in (401, 403):
+            parser.disallow_all = True # the site asked us to stay away
+        elif response.status_code >= 400:
+            parser.allow_all = True    # no robots.txt: everything is allowed
+        else:
+            parser.parse(response.text.splitlines())
+        return parser
+
+    def rules_for(self, url):
+        netloc = urlsplit(url).netloc
+        if netloc not in self.rules:
+            self.rules[netloc] = self._load(url)
+        return self.rules[netloc]
+
+    def verdict(self, url):
+        rules = self.rules_for(url)
+        if rules is None:
+            return self.UNREACHABLE
+        return self.ALLOWED if rules.can_fetch(USER_AGENT, url) else self.BLOCKED
+
+    def crawl_delay(self, url):
+        rules = self.rules_for(url)
+        return (rules.crawl_delay(USER_AGENT) if rules else None) or 0
+
+
+# ==========================================
+#  FETCH + PARSE (sender threads, no DB access)
+# ==========================================
+def parse_page(body, base_url):
+    """Title, heading, description, outgoing links and landing-page metadata of one HTML page."""
+    scanner = LandingPageScanner()
+    scanner.feed(body)
+    scanner.close()
+    page = {
+        'title': '', 'heading': '', 'description': '', 'links': [],
+        'deadline': scanner.deadline, 'eligibility': scanner.eligibility, 'documents': scanner.documents,
+    }
+    try:
+        doc = lxml_html.document_fromstring(body)
+    except (etree.ParserError, ValueError):
+        return page
+
+    page['title'] = " ".join((doc.findtext('.//title') or '').split())
+    heading = doc.find('.//h1')
+    page['heading'] = " ".join(heading.text_content().split()) if heading is not None else ''
+    for meta in doc.iter('meta'):
+        if (meta.get('name') or '').lower() == 'description' and meta.get('content'):
+            page['description'] = meta.get('content').strip()
+            break
+    else:
+        for paragraph in doc.iter('p'):
+            text = " ".join(paragraph.text_content().split())
+            if len(text) > 60:
+                page['description'] = text
+                break
+
+    seen = set()
+    for anchor in doc.iter('a'):
+        link = normalize_link(base_url, anchor.get('href'))
+        if link and link not in seen and (anchor.get('rel') or '').lower() != 'nofollow':
+            seen.add(link)
+            page['links'].append(link)
+            if len(seen) >= MAX_LINKS_PER_PAGE:
+                break
+    return page
+
+
+def fetch_page(session, url, etag, last_modified, known_hash):
+    """
+    One conditional GET. The body is capped at CRAWL_MAX_PAGE_BYTES, hashed, and
+    only parsed when the hash differs from the last crawl.
+    """
+    headers = {'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    result = {'status': None, 'error': '', 'retry_after': None, 'page': None, 'hash': '', 'final_url': url}
+    started = time.monotonic()
+    try:
+        with session.get(url, headers=headers, stream=True, timeout=FETCH_TIMEOUT) as response:
+            result.update(
+                status=response.status_code,
+                final_url=response.url,
+                etag=response.headers.get('ETag', '')[:255],
+                last_modified=response.headers.get('Last-Modified', '')[:64],
+                retry_after=response.headers.get('Retry-After'),
+                is_html='html' in response.headers.get('Content-Type', '').lower(),
+            )
+            if response.status_code != 200 or not result['is_html']:
+                return result
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                body += chunk
+                if len(body) >= MAX_PAGE_BYTES:
+                    del body[MAX_PAGE_BYTES:]
+                    break
+    except requests.RequestException as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        result['elapsed'] = time.monotonic() - started
+
+    result['hash'] = hashlib.sha256(body).hexdigest()
+    if result['hash'] != known_hash:
+        result['page'] = parse_page(bytes(body), result['final_url'])
+    return result
+
+
+# ==========================================
+#  CRAWL RUN
+# ==========================================
+class CrawlRun:
+    """
+    Crawls the seed portals breadth-first from the persistent frontier. At most
+    `concurrency` fetches run at once, at most HOST_CONCURRENCY per host, and
+    requests to one host start at least HOST_DELAY seconds apart (or robots.txt's
+    Crawl-delay). Pages not due for a recrawl are not requested at all; due
+    pages are re-checked with a conditional GET, and a body whose hash did not
+    change is neither parsed nor saved. All DB writes stay on the calling thread.
+    """
+
+    def __init__(self, seeds=None, max_pages=None, concurrency=None, host_delay=None, min_trust_score=None, log=print):
+        self.seeds = configured_seeds(seeds)
+        self.min_trust_score = MIN_TRUST_SCORE if min_trust_score is None else min_trust_score
+        self.max_pages = MAX_PAGES_PER_RUN if max_pages is None else max_pages
+        self.concurrency = concurrency or CONCURRENCY
+        self.host_delay = HOST_DELAY if host_delay is None else host_delay
+        self.log = log
+        self.stats = Counter()
+        self.ready = deque()           # claimed rows waiting for a host slot
+        self.in_flight = {}            # future -> CrawlFrontier row
+        self.host_active = Counter()
+        self.host_next_at = defaultdict(float)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.robots = RobotsRules(self.session)
+
+    def enqueue_seeds(self):
+        now = timezone.now()
+        CrawlFrontier.objects.bulk_create(
+            [CrawlFrontier(url=url, host=seed['host'], seed=url, depth=0, next_fetch_at=now) for url, seed in self.seeds.items()],
+            ignore_conflicts=True
+        )
+
+    def claim(self, limit):
+        """Takes up to `limit` due pages by pushing their next_fetch_at past the lease."""
+        now = timezone.now()
+        due = list(CrawlFrontier.objects
+                   .filter(seed__in=list(self.seeds), next_fetch_at__lte=now)
+                   .order_by('depth', 'next_fetch_at')
+                   .values_list('pk', flat=True)[:limit])
+        if not due:
+            return []
+        lease_until = now + CLAIM_LEASE
+        CrawlFrontier.objects.filter(pk__in=due, next_fetch_at__lte=now).update(next_fetch_at=lease_until)
+        return list(CrawlFrontier.objects.filter(pk__in=due, next_fetch_at=lease_until).order_by('depth', 'pk'))
+
+    def run(self):
+        if not self.seeds:
+            self.log("⚠️ No seed portals configured (CRAWL_SEED_PORTALS).")
+            return self.stats
+        self.enqueue_seeds()
+        submitted = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawl') as pool:
+            while True:
+                if len(self.ready) < self.concurrency and submitted + len(self.ready) < self.max_pages:
+                    self.ready.extend(self.claim(min(self.concurrency * 4, self.max_pages - submitted - len(self.ready))))
+                submitted += self.dispatch(pool, self.max_pages - submitted)
+                if submitted >= self.max_pages and self.ready:
+                    self.release(self.ready) # budget spent: the next run starts with these
+                    self.ready.clear()
+                if not self.ready and not self.in_flight:
+                    break # nothing due (or the page budget is spent)
+                self.wait_for_results()
+        self.stats['pages_budget'] = self.max_pages
+        return self.stats
+
+    def dispatch(self, pool, budget):
+        """Submits ready pages whose host has a free slot, up to `budget`. Returns how many."""
+        started = 0
+        now = time.monotonic()
+        for _ in range(len(self.ready)):
+            row = self.ready.popleft()
+            if started >= budget:
+                self.ready.append(row)
+                continue
+            verdict = self.robots.verdict(row.url)
+            if verdict != RobotsRules.ALLOWED:
+                self.record_not_fetched(row, verdict)
+                continue
+            if self.host_active[row.host] >= HOST_CONCURRENCY or self.host_next_at[row.host] > now:
+                self.ready.append(row) # host busy: try again after the next result / delay
+                continue
+            delay = max(self.host_delay, self.robots.crawl_delay(row.url))
+            self.host_active[row.host] += 1
+            self.host_next_at[row.host] = now + delay
+            future = pool.submit(fetch_page, self.session, row.url, row.etag, row.last_modified, row.content_hash)
+            self.in_flight[future] = row
+            started += 1
+        return started
+
+    def wait_for_results(self):
+        # Wake up for the first finished fetch or when a waiting host's delay is over
+        waiting_hosts = {row.host for row in self.ready if self.host_active[row.host] < HOST_CONCURRENCY}
+        waits = [self.host_next_at[host] - time.monotonic() for host in waiting_hosts]
+        timeout = max(0.01, min(waits)) if waits else None
+        if not self.in_flight:
+            time.sleep(timeout or 0.01)
+            return
+        done, _ = wait(self.in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            row = self.in_flight.pop(future)
+            self.host_active[row.host] -= 1
+            self.record(row, future.result())
+
+    def release(self, rows):
+        """Pages claimed but not fetched (budget spent) are due again right away."""
+        if rows:
+            CrawlFrontier.objects.filter(pk__in=[row.pk for row in rows]).update(next_fetch_at=timezone.now())
+
+    # ==========================================
+    #  RESULTS (calling thread: all DB writes)
+    # ==========================================
+    def record_not_fetched(self, row, verdict):
+        now = timezone.now()
+        if verdict == RobotsRules.BLOCKED:
+            self.stats['blocked'] += 1
+            CrawlFrontier.objects.filter(pk=row.pk).update(state='blocked', next_fetch_at=now + RECRAWL_AFTER)
+        else:
+            # robots.txt could not be read: try again soon, the page itself is not at fault
+            self.stats['deferred'] += 1
+            CrawlFrontier.objects.filter(pk=row.pk).update(next_fetch_at=now + timedelta(minutes=15))
+
+    def record(self, row, result):
+        now = timezone.now()
+        status = result['status']
+        metrics.observe("crawler.fetch_seconds", result['elapsed'])
+        updates = {'last_fetched_at': now, 'next_fetch_at': now + RECRAWL_AFTER, 'failures': 0}
+
+        if status == 304:
+            self.stats['not_modified'] += 1
+            updates['state'] = 'ok'
+        elif status == 200:
+            updates.update(state='ok', etag=result['etag'], last_modified=result['last_modified'])
+            if not result['is_html']:
+                self.stats['not_html'] += 1
+            elif result['page'] is None:
+                self.stats['unchanged'] += 1 # same bytes as last time (server sent no validators)
+            else:
+                self.stats['changed'] += 1
+                updates.update(content_hash=result['hash'], last_changed_at=now)
+                self.enqueue_links(row, result['page']['links'])
+                updates['is_scheme_page'] = self.save_page(row, result['final_url'], result['page'])
+        elif status in (404, 410):
+            self.stats['gone'] += 1
+            updates.update(state='gone', next_fetch_at=now + RECRAWL_AFTER * 7)
+        else:
+            # 429 / 5xx / network error: back off this page and slow down for the host
+            self.stats['failed'] += 1
+            failures = row.failures + 1
+            updates.update(state='failed', failures=failures,
+                           # capped: 5 min * 2**failures overflows timedelta after ~39 failures
+                           next_fetch_at=now + min(RECRAWL_AFTER, timedelta(minutes=5) * 2 ** min(failures, 8)))
+            try:
+                pause = float(result['retry_after'] or 0)
+            except ValueError:
+                pause = 0
+            self.host_next_at[row.host] = time.monotonic() + max(pause, self.host_delay * 10)
+            self.log(f"⚠️ Crawl failed for {row.url}: {result['error'] or f'HTTP {status}'}")
+
+        CrawlFrontier.objects.filter(pk=row.pk).update(**updates)
+        self.stats['fetched'] += 1
+        metrics.incr("crawler.fetched")
+
+    def enqueue_links(self, row, links):
+        if row.depth >= MAX_DEPTH:
+            return
+        seed_host = self.seeds[row.seed]['host']
+        now = timezone.now()
+        new_rows = [
+            CrawlFrontier(url=link, host=urlsplit(link).hostname, seed=row.seed, depth=row.depth + 1, next_fetch_at=now)
+            for link in links if len(link) <= 500 and same_site(urlsplit(link).hostname, seed_host)
+        ]
+        if new_rows:
+            before = CrawlFrontier.objects.filter(seed=row.seed).count()
+            CrawlFrontier.objects.bulk_create(new_rows, ignore_conflicts=True)
+            self.stats['discovered'] += CrawlFrontier.objects.filter(seed=row.seed).count() - before
+
+    def save_page(self, row, url, page):
+        """
+        The seed page itself (only if the seed has a title: a portal that is
+        not a scholarship, e.g. a certificates portal, is just crawled) and
+        every page that names and describes a scheme go through the Trust
+        Engine into VerifiedScholarship. Returns True if the page was saved.
+        """
+        seed = self.seeds[row.seed]
+        is_seed = row.url == row.seed
+        if is_seed and seed.get('title'):
+            title = seed['title']
+        elif (SCHEME_HINTS.search(f"{page['title']} {page['heading']}")
+              and (page['deadline'] or page['documents'])):
+            # Named like a scheme and describes one (listing pages only link to them)
+            title = page['heading'] or page['title']
+        else:
+            return False
+
+        score, flags, status = verify_url_authenticity(url, title)
+        if score < self.min_trust_score:
+            self.stats['low_trust'] += 1
+            return False
+
+        # The page is already in hand: no second download through the landing-page cache
+        metadata = extract_rich_metadata(title, (seed.get('summary') if is_seed else None) or page['description'])
+        created = save_scholarship_to_db(seed['category'], {
+            "title": title,
+            "url": url,
+            "source": seed.get('source') or seed['host'],
+            "trust_score": score,
+            "status": status,
+            "security_flags": flags,
+            "deadline": page['deadline'],
+            "info_paragraph": metadata['info'],
+            "eligibility": page['eligibility'],
+            "documents_required": page['documents'] or metadata['documents_required'],
+        }, added_from="Crawler")
+        self.stats['saved_new' if created else 'saved_updated'] += 1
+        metrics.incr("crawler.scheme_pages_saved")
+        return True
@@ -0,0 +1,57 @@
+# agent/dates.py
+import re
+from datetime import date, datetime
+
+MONTHS = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE_PATTERNS = [
+    # 31 March 2026 / 31st Mar, 2026
+    (re.compile(rf'\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({MONTHS}),?\s+(\d{{4}})\b', re.I), 'dmy_text'),
+    # March 31, 2026
+    (re.compile(rf'\b({MONTHS})\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b', re.I), 'mdy_text'),
+    # 2026-03-31
+    (re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b'), 'ymd'),
+    # 31/03/2026 or 31-03-2026 or 31.03.2026 (Indian portals are day-first)
+    (re.compile(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b'), 'dmy'),
+]
+
+
+def _month_number(token):
+    try:
+        return datetime.strptime(token.strip('.')[:3].title(), "%b").month
+    except ValueError:
+        return None
+
+
+def parse_date_in_text(text):
+    """Returns the first calendar date found in a block of text, or None."""
+    for pattern, kind in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            a, b, c = match.groups()
+            try:
+                if kind == 'dmy_text':
+                    day, month, year = int(a), _month_number(b), int(c)
+                elif kind == 'mdy_text':
+                    day, month, year = int(b), _month_number(a), int(c)
+                elif kind == 'ymd':
+                    day, month, year = int(c), int(b), int(a)
+                else:
+                    day, month, year = int(a), int(b), int(c)
+                if month:
+                    return datetime(year, month, day).date()
+            except ValueError:
+                continue
+    return None
+
+
+def coerce_deadline(value):
+    """
+    Turns whatever a caller has for a deadline (date, "03 Nov 2026", "2026-11-03",
+    "", None) into a date or None.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    return parse_date_in_text(str(value))
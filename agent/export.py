@@ -0,0 +1,195 @@
+# agent/export.py
+import io
+import csv
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import VerifiedScholarship
+
+CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+FORMATS = ('ndjson', 'csv', 'parquet')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Column name -> queryset lookup
+COLUMNS = {
+    'id': 'pk',
+    'title': 'title',
+    'url': 'url',
+    'canonical_url': 'canonical_url',
+    'source': 'source',
+    'category': 'category__name',
+    'trust_score': 'trust_score',
+    'status': 'status',
+    'security_flags': 'security_flags',
+    'deadline': 'deadline',
+    'info_paragraph': 'info_paragraph',
+    'eligibility': 'eligibility',
+    'documents_required': 'documents_required',
+    'added_from': 'added_from',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+LIST_COLUMNS = ('security_flags', 'documents_required')
+
+
+def parse_since(value):
+    """'2026-10-01' or an ISO timestamp -> aware datetime. Raises ValueError."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError("'since' must be an ISO date or timestamp, e.g. 2026-10-01T00:00:00Z")
+        moment = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+# ==========================================
+#  ROW SOURCE (keyset pagination, constant memory)
+# ==========================================
+def iter_chunks(since=None, chunk_size=CHUNK_SIZE):
+    """
+    Walks VerifiedScholarship in primary-key order, one short query per chunk
+    (WHERE id > last_id LIMIT n). Nothing holds the table open between chunks,
+    so writers are never blocked by a long export. Yields lists of row dicts.
+
+    `since` only selects rows inserted or updated since then: there are no
+    tombstones, so rows removed in between (archive_expired, admin deletes)
+    are not reported. Consumers should replace their copy with a full export
+    from time to time.
+    """
+    rows = VerifiedScholarship.objects.order_by('pk')
+    if since is not None:
+        rows = rows.filter(updated_at__gte=since)
+    lookups = list(COLUMNS.values())
+    last_pk = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last_pk).values_list(*lookups)[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        yield [dict(zip(COLUMNS, row)) for row in chunk]
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+# ==========================================
+#  WRITERS: each yields bytes, chunk by chunk
+# ==========================================
+def ndjson_stream(chunks):
+    for chunk in chunks:
+        yield "".join(
+            json.dumps({k: _plain(v) for k, v in row.items()}, ensure_ascii=False) + "\n" for row in chunk
+        ).encode()
+
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in chunks:
+        for row in chunk:
+            writer.writerow([
+                json.dumps(row[col], ensure_ascii=False) if col in LIST_COLUMNS else _plain(row[col])
+                for col in COLUMNS
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain()."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def parquet_stream(chunks):
+    """One Parquet row group per chunk; the footer is written last."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs the `pyarrow` package (pip install -r requirements.txt)")
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('url', pa.string()),
+        ('canonical_url', pa.string()),
+        ('source', pa.string()),
+        ('category', pa.string()),
+        ('trust_score', pa.int32()),
+        ('status', pa.string()),
+        ('security_flags', pa.list_(pa.string())),
+        ('deadline', pa.date32()),
+        ('info_paragraph', pa.string()),
+        ('eligibility', pa.string()),
+        ('documents_required', pa.list_(pa.string())),
+        ('added_from', pa.string()),
+        ('created_at', pa.timestamp('us', tz='UTC')),
+        ('updated_at', pa.timestamp('us', tz='UTC')),
+    ])
+    sink = _ByteSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    for chunk in chunks:
+        columns = {name: [row[name] for row in chunk] for name in COLUMNS}
+        for name in LIST_COLUMNS:
+            columns[name] = [[str(item) for item in value or []] for value in columns[name]]
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    'ndjson': ndjson_stream,
+    'csv': csv_stream,
+    'parquet': parquet_stream,
+}
+
+
+def export_stream(fmt, since=None, chunk_size=CHUNK_SIZE):
+    """Bytes of a full (or since-filtered) export in `fmt`, produced chunk by chunk."""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}', choose one of: {', '.join(FORMATS)}")
+    if fmt == 'parquet':
+        try:
+            import pyarrow # noqa: F401  (fail before the response starts)
+        except ImportError:
+            raise ValueError("Parquet export needs the `pyarrow` package on the server (see requirements.txt)")
+    return WRITERS[fmt](iter_chunks(since, chunk_size))
@@ -0,0 +1,59 @@
+# agent/facets.py
+from django.db.models import Count, F
+
+from .models import FacetCount, VerifiedScholarship
+
+# facet name -> how to read it from a VerifiedScholarship queryset
+FACETS = {
+    'category': 'category__name',
+    'added_from': 'added_from',
+    'status': 'status',
+}
+
+
+def facet_values(category_name, added_from, status):
+    return {'category': category_name, 'added_from': added_from, 'status': status}
+
+
+def _adjust(facet, value, delta):
+    updated = FacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+    if not updated:
+        FacetCount.objects.get_or_create(facet=facet, value=value, defaults={'count': 0})
+        FacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def move(facet, old, new, n=1):
+    """Moves n rows from one bucket of a facet to another (None = not counted)."""
+    if old == new:
+        return
+    if old is not None:
+        _adjust(facet, old, -n)
+    if new is not None:
+        _adjust(facet, new, +n)
+
+
+def apply_change(before, after):
+    """
+    Moves one scholarship between facet buckets. `before`/`after` are dicts from
+    facet_values() (None for a created / deleted row). Call it inside the same
+    transaction as the row write so the counters never drift.
+    """
+    for facet in FACETS:
+        move(facet, before[facet] if before else None, after[facet] if after else None)
+
+
+def current_facets():
+    """Counters as {facet: {value: count}}; cost depends on distinct values, not on rows."""
+    facets = {facet: {} for facet in FACETS}
+    for facet, value, count in FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        facets.setdefault(facet, {})[value] = count
+    return facets
+
+
+def recount_facets():
+    """The ground truth, straight from VerifiedScholarship (one GROUP BY per facet)."""
+    actual = {}
+    for facet, column in FACETS.items():
+        rows = VerifiedScholarship.objects.values_list(column).annotate(n=Count('pk')).order_by()
+        actual[facet] = {value: n for value, n in rows if value is not None}
+    return actual
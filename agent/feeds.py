@@ -0,0 +1,228 @@
+# agent/feeds.py
+import time
+import threading
+from datetime import timedelta
+
+import requests
+from lxml import etree
+from feedparser import FeedParserDict
+from django.conf import settings
+from django.utils import timezone
+
+from . import breaker, metrics, ratelimit
+from .landing import BROWSER_HEADERS
+from .models import FeedState, SeenFeedEntry
+
+POLL_INTERVAL = getattr(settings, 'RSS_POLL_INTERVAL_SECONDS', 15 * 60)
+MAX_POLL_INTERVAL = getattr(settings, 'RSS_POLL_MAX_INTERVAL_SECONDS', 60 * 60)
+SEEN_ENTRY_TTL = timedelta(days=getattr(settings, 'RSS_SEEN_ENTRY_TTL_DAYS', 30))
+FETCH_TIMEOUT = 5
+SEEN_LOOKUP_BATCH = 10 # entries parsed ahead of the consumer per "already seen?" query
+
+
+def entry_guid(entry):
+    """Google News gives every item a stable <guid>; fall back to the link."""
+    return (entry.get('id') or entry.get('link') or '')[:500]
+
+
+# ==========================================
+#  INCREMENTAL PARSER
+# ==========================================
+def _entry_from_item(item):
+    """<item> element -> the feedparser-style entry the rest of the code expects."""
+    entry = FeedParserDict(
+        title=(item.findtext('title') or '').strip(),
+        link=(item.findtext('link') or '').strip(),
+        id=(item.findtext('guid') or '').strip(),
+        summary=item.findtext('description') or '',
+        published=item.findtext('pubDate') or '',
+    )
+    source = item.find('source')
+    if source is not None:
+        entry['source'] = FeedParserDict(title=(source.text or '').strip(), href=source.get('url', ''))
+    return entry
+
+
+def iter_feed_entries(stream):
+    """
+    Yields RSS 2.0 entries one at a time while `stream` (any file-like object) is
+    still being read. Each <item> is cleared once converted, so memory stays flat
+    however long the feed is, and the caller can stop at any point without the
+    rest of the document being downloaded or parsed.
+    """
+    items = etree.iterparse(stream, events=('end',), tag='item', resolve_entities=False, no_network=True)
+    for _, item in items:
+        yield _entry_from_item(item)
+        item.clear()
+        # Drop the already-processed siblings the parser still links from <channel>
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+
+
+class FeedPoll:
+    """
+    Result of polling one feed: only the entries we have never processed.
+    `entries` is lazy: the feed is parsed as it downloads, so a caller that
+    stops early never reads the rest. The caller marks an entry with
+    mark_seen() once it is saved or deliberately rejected; entries it did not
+    get to (quota reached) or has not settled yet stay unseen and come back on
+    the next poll. commit() saves both; marks made after it are written at once.
+    The consumer may mark entries from another thread than the one reading
+    and committing the poll.
+    """
+
+    def __init__(self, state, status, response=None, now=None):
+        self.state = state
+        self.status = status # "fetched", "not_modified", "not_due", "breaker_open", "over_budget", "error"
+        self.now = now
+        self.new_entries = 0
+        self.exhausted = response is None # read to the end of the feed
+        self._response = response
+        self._seen = []
+        self._handed_out = set() # GUIDs yielded to the consumer and not marked seen yet
+        self._committed = False
+        self._lock = threading.Lock()
+        self.entries = self._new_entries(response) if response is not None else iter(())
+
+    def _new_entries(self, response):
+        response.raw.decode_content = True # undo gzip/deflate transfer encoding
+        parsed = iter_feed_entries(response.raw)
+        try:
+            while True:
+                # Only parse a few entries ahead of the consumer, one "already seen?" query each
+                batch = [entry for _, entry in zip(range(SEEN_LOOKUP_BATCH), parsed)]
+                if not batch:
+                    break
+                guids = [entry_guid(entry) for entry in batch]
+                already_seen = set(
+                    SeenFeedEntry.objects.filter(feed=self.state, guid__in=guids).values_list('guid', flat=True)
+                )
+                metrics.incr("rss.entries.total", len(batch))
+                for entry, guid in zip(batch, guids):
+                    if guid not in already_seen:
+                        self.new_entries += 1
+                        metrics.incr("rss.entries.new")
+                        with self._lock:
+                            self._handed_out.add(guid)
+                        yield entry
+            self.exhausted = True
+        except etree.XMLSyntaxError as e:
+            metrics.incr("rss.parse_errors")
+            print(f"⚠️ RSS parse failed for {self.state.feed_url}: {e}")
+            self.exhausted = True # nothing more to read from this copy of the feed
+        except requests.RequestException as e:
+            print(f"⚠️ RSS download broke off for {self.state.feed_url}: {e}")
+        finally:
+            response.close()
+
+    def mark_seen(self, entry):
+        guid = entry_guid(entry)
+        with self._lock:
+            self._handed_out.discard(guid)
+            self._seen.append(guid)
+            if self._committed:
+                self._save_seen()
+
+    def _save_seen(self):
+        if self._seen:
+            SeenFeedEntry.objects.bulk_create(
+                [SeenFeedEntry(feed=self.state, guid=guid) for guid in self._seen],
+                ignore_conflicts=True
+            )
+            self._seen = []
+
+    def close(self):
+        """Stops reading: the rest of the feed is neither downloaded nor parsed."""
+        if self._response is not None:
+            self.entries.close()
+            self._response.close() # entries may never have been started
+            if not self.exhausted:
+                metrics.incr("rss.stopped_early")
+
+    def commit(self):
+        with self._lock:
+            self._save_seen()
+            if self._response is None or self._committed:
+                return
+            self._committed = True
+            settled = self.exhausted and not self._handed_out
+
+        state = self.state
+        if settled:
+            state.etag = self._response.headers.get('ETag', '')[:255]
+            state.last_modified = self._response.headers.get('Last-Modified', '')[:64]
+        else:
+            # Stopped early, or entries still unsettled: a 304 next time would hide them
+            state.etag = state.last_modified = ""
+        _schedule_next_poll(state, self.now, found_new=bool(self.new_entries))
+        state.save()
+
+        # Google News feeds only hold ~100 recent items; old GUIDs can go
+        SeenFeedEntry.objects.filter(feed=state, seen_at__lt=self.now - SEEN_ENTRY_TTL).delete()
+
+
+def _schedule_next_poll(state, now, found_new):
+    # Quiet feeds are polled less often, busy ones go back to the base interval
+    if found_new:
+        state.poll_interval_seconds = POLL_INTERVAL
+    else:
+        state.poll_interval_seconds = min(MAX_POLL_INTERVAL, int(state.poll_interval_seconds * 1.5))
+    state.last_polled_at = now
+    state.next_poll_at = now + timedelta(seconds=state.poll_interval_seconds)
+
+
+def poll_feed(feed_url, force=False):
+    """
+    Fetches an RSS feed incrementally:
+      - skips the request entirely until the feed's next_poll_at (unless force=True)
+      - sends If-None-Match / If-Modified-Since, a 304 costs no parsing
+      - filters out entry GUIDs we have already processed
+      - parses the body as it streams in, only as far as the caller reads
+    """
+    now = timezone.now()
+    state, _ = FeedState.objects.get_or_create(feed_url=feed_url, defaults={'poll_interval_seconds': POLL_INTERVAL})
+
+    if not force and state.next_poll_at and state.next_poll_at > now:
+        metrics.incr("rss.poll.not_due")
+        return FeedPoll(state, "not_due")
+
+    # Google News failing or slow: don't wait on it, callers serve what is already in the DB
+    if not breaker.allow('google_news'):
+        return FeedPoll(state, "breaker_open")
+
+    # Over budget: don't hammer Google News, callers serve what is already in the DB
+    if not ratelimit.acquire('google_news_rss', on_limit=ratelimit.SERVE_CACHED):
+        return FeedPoll(state, "over_budget")
+
+    headers = dict(BROWSER_HEADERS)
+    if state.etag:
+        headers['If-None-Match'] = state.etag
+    if state.last_modified:
+        headers['If-Modified-Since'] = state.last_modified
+
+    started = time.monotonic()
+    try:
+        response = requests.get(feed_url, headers=headers, timeout=FETCH_TIMEOUT, stream=True)
+    except requests.RequestException as e:
+        breaker.record('google_news', False, time.monotonic() - started, str(e))
+        print(f"⚠️ RSS fetch failed for {feed_url}: {e}")
+        return FeedPoll(state, "error")
+    healthy = response.status_code < 500 and response.status_code not in ratelimit.THROTTLED_STATUSES
+    breaker.record('google_news', healthy, time.monotonic() - started, "" if healthy else f"HTTP {response.status_code}")
+    ratelimit.report_response('google_news_rss', response.status_code, response.headers.get('Retry-After'))
+    state.last_status = response.status_code
+
+    if response.status_code == 304:
+        response.close()
+        metrics.incr("rss.poll.not_modified")
+        _schedule_next_poll(state, now, found_new=False)
+        state.save()
+        return FeedPoll(state, "not_modified")
+
+    if response.status_code != 200:
+        response.close()
+        state.save(update_fields=['last_status'])
+        return FeedPoll(state, "error")
+
+    # Entries are parsed as the consumer asks for them; commit() stores the poll
+    return FeedPoll(state, "fetched", response=response, now=now)
@@ -0,0 +1,117 @@
+# agent/fingerprint.py
+import re
+import hashlib
+
+# Two titles whose 64-bit SimHash differ in at most this many bits are the same story
+MAX_HAMMING_DISTANCE = 3
+# 4 bands x 16 bits: any pair within 3 bits is guaranteed to share at least one band exactly,
+# so a near-duplicate lookup is an indexed equality query on the four band columns.
+BAND_COUNT = 4
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'to', 'in', 'on', 'at', 'by', 'with', 'from',
+    'is', 'are', 'be', 'this', 'that', 'its', 'it', 'as', 'how', 'here', 'your', 'you', 'now',
+    'all', 'check', 'details', 'know', 'latest', 'news', 'update', 'updates',
+}
+
+
+def _tokens(text):
+    return [t for t in re.findall(r'[a-z0-9]+', text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def normalize_text(title, summary=""):
+    """
+    Lower-cases, strips HTML and the " - Publisher" suffix Google News appends to
+    every title, and drops punctuation and filler words so syndicated copies of
+    one announcement reduce to (nearly) the same token list.
+    """
+    title_tokens = _tokens(re.sub(r'\s+[-|–]\s+[^-|–]+$', '', title or ''))
+    summary_tokens = _tokens(re.sub('<[^<]+>', ' ', summary or ''))[:60]
+
+    # Google News summaries just echo the title followed by the outlet name,
+    # which would make every outlet's copy look different. Ignore those.
+    if title_tokens and summary_tokens[:len(title_tokens)] == title_tokens:
+        summary_tokens = []
+    return title_tokens + summary_tokens
+
+
+def _hash64(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(title, summary=""):
+    """Returns the unsigned 64-bit SimHash of word unigrams + bigrams, or None for empty text."""
+    tokens = normalize_text(title, summary)
+    if not tokens:
+        return None
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    weights = [0] * 64
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def is_near_duplicate(a, b):
+    return a is not None and b is not None and hamming_distance(a, b) <= MAX_HAMMING_DISTANCE
+
+
+def split_bands(value):
+    return [(value >> (band * BAND_BITS)) & BAND_MASK for band in range(BAND_COUNT)]
+
+
+def to_signed(value):
+    """SQLite/Django BigIntegerField is signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def fingerprint_fields(value):
+    """Model field values for a SimHash (or all None)."""
+    if value is None:
+        return {'simhash': None, **{f'simhash_band{i}': None for i in range(BAND_COUNT)}}
+    return {
+        'simhash': to_signed(value),
+        **{f'simhash_band{i}': band for i, band in enumerate(split_bands(value))},
+    }
+
+
+# ==========================================
+#  IN-MEMORY CLUSTER INDEX (one ingest batch)
+# ==========================================
+class NearDuplicateIndex:
+    """Band-bucketed lookup so clustering a batch stays O(n) instead of all-pairs."""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def find(self, value):
+        if value is None:
+            return None
+        for band_no, band in enumerate(split_bands(value)):
+            for other_value, key in self.buckets.get((band_no, band), ()):
+                if hamming_distance(value, other_value) <= MAX_HAMMING_DISTANCE:
+                    return key
+        return None
+
+    def add(self, value, key):
+        if value is None:
+            return
+        for band_no, band in enumerate(split_bands(value)):
+            self.buckets.setdefault((band_no, band), []).append((value, key))
@@ -0,0 +1,111 @@
+# agent/gnews.py
+import re
+import base64
+import binascii
+from urllib.parse import urlsplit
+
+# news.google.com/rss/articles/<id>, /articles/<id>, /read/<id>
+ARTICLE_PATH = re.compile(r'^/(?:rss/)?(?:articles|read)/([A-Za-z0-9_-]+)')
+GOOGLE_NEWS_HOSTS = {'news.google.com'}
+# Newer IDs carry an opaque token instead of the URL; only Google can resolve those
+OPAQUE_PREFIX = b'AU_yqL'
+
+
+def article_id(url):
+    """The article ID of a Google News link, or None for any other URL."""
+    try:
+        parts = urlsplit(url or "")
+    except ValueError:
+        return None
+    if (parts.hostname or '').lower() not in GOOGLE_NEWS_HOSTS:
+        return None
+    match = ARTICLE_PATH.match(parts.path)
+    return match.group(1) if match else None
+
+
+def _b64decode(text):
+    try:
+        return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _varint(data, pos):
+    result = shift = 0
+    while True:
+        if pos >= len(data) or shift > 63:
+            raise ValueError("truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _length_delimited_fields(data):
+    """Every length-delimited (bytes/string) field of a protobuf message, in order."""
+    pos = 0
+    while pos < len(data):
+        key, pos = _varint(data, pos)
+        wire_type = key & 0x7
+        if wire_type == 0:
+            _, pos = _varint(data, pos)
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 5:
+            pos += 4
+        elif wire_type == 2:
+            length, pos = _varint(data, pos)
+            if pos + length > len(data):
+                raise ValueError("truncated field")
+            yield data[pos:pos + length]
+            pos += length
+        else:
+            raise ValueError(f"unsupported wire type {wire_type}")
+
+
+def _as_url(value):
+    try:
+        text = value.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    if not text.startswith(('http://', 'https://')) or any(c.isspace() for c in text):
+        return None
+    try:
+        return text if urlsplit(text).hostname else None
+    except ValueError:
+        return None
+
+
+def _article_strings(google_url):
+    """String fields of the article ID's payload ([] if it can't be read)."""
+    encoded = article_id(google_url)
+    payload = _b64decode(encoded) if encoded else None
+    if not payload:
+        return []
+    try:
+        return list(_length_delimited_fields(payload))
+    except ValueError:
+        return []
+
+
+def decode_article_url(google_url):
+    """
+    Publisher URL encoded in a Google News article link, without any request.
+
+    Classic IDs are a base64url protobuf whose first string field is the
+    article URL (an AMP URL may follow as a second field). Returns None when
+    the link is not a Google News article, the ID is an opaque "AU_yqL..."
+    token, or the payload cannot be read; callers then follow the redirect.
+    """
+    for field in _article_strings(google_url):
+        url = _as_url(field)
+        if url:
+            return url
+    return None
+
+
+def is_opaque_article(google_url):
+    """True for newer article IDs that can only be resolved by Google."""
+    return any(field.startswith(OPAQUE_PREFIX) for field in _article_strings(google_url))
@@ -0,0 +1,83 @@
+# agent/idempotency.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import metrics
+from .models import WebhookReceipt
+
+RECEIPT_TTL = timedelta(seconds=getattr(settings, 'WEBHOOK_RECEIPT_TTL_SECONDS', 24 * 60 * 60))
+WAIT_TIMEOUT = getattr(settings, 'WEBHOOK_DUPLICATE_WAIT_SECONDS', 10)
+LEASE_SECONDS = getattr(settings, 'WEBHOOK_PROCESSING_LEASE_SECONDS', 120)
+POLL_INTERVAL = 0.25
+
+FRESH = "fresh"       # first delivery: the handler ran here
+REPLAYED = "replayed" # duplicate: stored reply returned
+JOINED = "joined"     # duplicate: waited for the in-flight delivery's reply
+TIMEOUT = "timeout"   # duplicate: the first delivery is still running
+
+
+def _claim(message_sid):
+    """True if this request owns the message (new, expired, or abandoned by a crashed worker)."""
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            WebhookReceipt.objects.create(message_sid=message_sid, lease_until=now + timedelta(seconds=LEASE_SECONDS))
+        # Cheap housekeeping on the indexed created_at column
+        WebhookReceipt.objects.filter(created_at__lt=now - RECEIPT_TTL).delete()
+        return True
+    except IntegrityError:
+        pass
+    # Take over a receipt past its TTL, or one whose worker died mid-processing
+    stale = WebhookReceipt.objects.filter(message_sid=message_sid).filter(
+        Q(created_at__lt=now - RECEIPT_TTL) | Q(state='processing', lease_until__lt=now)
+    )
+    return bool(stale.update(state='processing', reply="", lease_until=now + timedelta(seconds=LEASE_SECONDS), created_at=now))
+
+
+def _release(message_sid):
+    # Let Twilio's retry start over instead of waiting for the lease to expire
+    WebhookReceipt.objects.filter(message_sid=message_sid, state='processing').delete()
+
+
+def handle_once(message_sid, handler):
+    """
+    Runs handler() -> (reply string, ok) at most once per Twilio MessageSid (across
+    workers). Only successful replies are stored: after an exception or ok=False the
+    receipt is released, so a retry runs the handler again. Duplicates get the stored
+    reply, or wait up to WEBHOOK_DUPLICATE_WAIT_SECONDS for the in-flight one.
+    Returns (status, reply); reply is None on TIMEOUT.
+    """
+    if _claim(message_sid):
+        try:
+            reply, ok = handler()
+        except Exception:
+            _release(message_sid)
+            raise
+        if not ok:
+            _release(message_sid)
+            metrics.incr("webhook.failed_not_stored")
+            return FRESH, reply
+        WebhookReceipt.objects.filter(message_sid=message_sid).update(state='done', reply=reply)
+        return FRESH, reply
+
+    metrics.incr("webhook.duplicates")
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    waited = False
+    while True:
+        receipt = WebhookReceipt.objects.filter(message_sid=message_sid).values_list('state', 'reply').first()
+        if receipt is None:
+            break # the first delivery failed and released it: Twilio's next retry starts over
+        if receipt[0] == 'done':
+            metrics.incr(f"webhook.duplicates.{JOINED if waited else REPLAYED}")
+            return (JOINED if waited else REPLAYED), receipt[1]
+        if time.monotonic() >= deadline:
+            break
+        waited = True
+        time.sleep(POLL_INTERVAL)
+    metrics.incr(f"webhook.duplicates.{TIMEOUT}")
+    return TIMEOUT, None
@@ -0,0 +1,220 @@
+# agent/landing.py
+import re
+import time
+from datetime import timedelta
+
+import requests
+from lxml import etree
+from django.conf import settings
+from django.utils import timezone
+
+from .models import LandingPageCache
+from .canonical import canonicalize_url
+from .dates import parse_date_in_text
+from . import metrics
+
+# Disguise the Python script as Google Chrome (shared with the URL unwrapper)
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+MAX_PAGE_BYTES = getattr(settings, 'LANDING_PAGE_MAX_BYTES', 512 * 1024)
+FETCH_TIMEOUT = getattr(settings, 'LANDING_PAGE_TIMEOUT', 3.5)
+FETCH_DEADLINE = getattr(settings, 'LANDING_PAGE_FETCH_DEADLINE', 6.0)
+REQUEST_BUDGET = getattr(settings, 'LANDING_PAGE_REQUEST_BUDGET', 12.0)
+REFRESH_AFTER = timedelta(seconds=getattr(settings, 'LANDING_PAGE_REFRESH_SECONDS', 6 * 60 * 60))
+CHUNK_SIZE = 16 * 1024
+
+# Only these elements are read as text blocks (divs would repeat their children)
+TEXT_BLOCK_TAGS = {'title', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'td', 'th', 'dt', 'dd'}
+SKIP_TAGS = {'script', 'style', 'noscript'}
+
+# ==========================================
+#  PAGE TEXT PATTERNS
+# ==========================================
+DEADLINE_HINTS = re.compile(r'last date|deadline|closing date|apply (?:by|before)|due date|closes on|\btill\b|on or before', re.I)
+
+# Canonical document names (kept identical to the keyword fallback in utils.py)
+DOCUMENT_PATTERNS = {
+    "Aadhaar Card": ['aadhaar', 'aadhar'],
+    "Bank Passbook": ['passbook', 'bank account details', 'bank details', 'cancelled cheque'],
+    "Previous Year Marksheet": ['marksheet', 'mark sheet', 'marks memo', 'mark list'],
+    "Passport Photo": ['passport size photo', 'passport-size photo', 'photograph'],
+    "Caste/Category Certificate": ['caste certificate', 'caste validity', 'category certificate'],
+    "Income Certificate (Below 2.5 LPA)": ['income certificate', 'income proof'],
+    "Disability Certificate": ['disability certificate', 'udid'],
+    "Current Year Fee Receipt / Bonafide Certificate": ['fee receipt', 'bonafide'],
+    "Domicile Certificate": ['domicile certificate', 'residence certificate'],
+    "Leaving Certificate": ['leaving certificate', 'transfer certificate'],
+}
+
+
+# ==========================================
+#  INCREMENTAL HTML SCANNER
+# ==========================================
+class LandingPageScanner:
+    """
+    Consumes HTML chunks as they arrive and keeps only what we need:
+    the deadline, an eligibility paragraph and the list of documents.
+    Processed elements are cleared so memory stays flat on long pages.
+    """
+
+    def __init__(self):
+        self.parser = etree.HTMLPullParser(events=('end',), recover=True)
+        self.deadline = None
+        self.eligibility_parts = []
+        self.documents = []
+        self._in_eligibility_section = False
+
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+        self._drain()
+
+    def close(self):
+        try:
+            self.parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        self._drain()
+
+    def _drain(self):
+        for _, element in self.parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ''
+            if tag in SKIP_TAGS:
+                element.clear()
+            elif tag in TEXT_BLOCK_TAGS:
+                text = " ".join(" ".join(element.itertext()).split())
+                element.clear()
+                if text:
+                    self._scan_block(tag, text)
+
+    def _scan_block(self, tag, text):
+        lower = text.lower()
+
+        # 1. DEADLINE: a date that sits next to a "last date" style phrase
+        if self.deadline is None and DEADLINE_HINTS.search(text):
+            self.deadline = parse_date_in_text(text)
+
+        # 2. ELIGIBILITY: the heading's following blocks, or a self-describing paragraph
+        if tag.startswith('h'):
+            self._in_eligibility_section = 'eligib' in lower
+        elif self._in_eligibility_section or ('eligib' in lower and len(text) > 40):
+            if sum(len(p) for p in self.eligibility_parts) < 500:
+                self.eligibility_parts.append(text)
+
+        # 3. DOCUMENTS: canonical names for anything the page lists
+        for doc_name, needles in DOCUMENT_PATTERNS.items():
+            if doc_name not in self.documents and any(n in lower for n in needles):
+                self.documents.append(doc_name)
+
+    @property
+    def eligibility(self):
+        return " ".join(self.eligibility_parts)[:500]
+
+
+class LandingBudget:
+    """
+    Wall-clock seconds one caller (a web request, a category scrape) may spend
+    on landing-page fetches in total. Once spent, pages are served from the
+    cache (even if stale) or left to the keyword fallback.
+    """
+
+    def __init__(self, seconds=None):
+        self.ends_at = time.monotonic() + (REQUEST_BUDGET if seconds is None else seconds)
+
+    def remaining(self):
+        return max(0.0, self.ends_at - time.monotonic())
+
+
+def _scan_response(response, deadline):
+    """Streams the body through the scanner, stopping at MAX_PAGE_BYTES or the deadline."""
+    scanner = LandingPageScanner()
+    received = 0
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if time.monotonic() >= deadline:
+            metrics.incr("landing.deadline_exceeded")
+            raise requests.Timeout("page not read before the fetch deadline")
+        if not chunk:
+            continue
+        remaining = MAX_PAGE_BYTES - received
+        scanner.feed(chunk[:remaining])
+        received += len(chunk)
+        if received >= MAX_PAGE_BYTES:
+            break
+    scanner.close()
+    return scanner
+
+
+# ==========================================
+#  CACHED + CONDITIONAL FETCH
+# ==========================================
+def _cached_result(cached):
+    return {
+        "deadline": cached.deadline,
+        "eligibility": cached.eligibility,
+        "documents_required": list(cached.documents_required),
+    }
+
+
+def fetch_landing_metadata(url, budget=None):
+    """
+    Returns {"deadline", "eligibility", "documents_required"} read from the
+    actual scholarship page, or None if the page could not be read.
+
+    Results are cached per canonical URL (utm_* / www. variants share one entry)
+    with the ETag/Last-Modified validators, so a refresh is a conditional GET
+    and a 304 skips the download and parse.
+    One fetch takes at most FETCH_DEADLINE seconds in total (the requests
+    timeout only bounds each socket read), and never more than what is left
+    of the caller's LandingBudget.
+    """
+    cache_key = canonicalize_url(url)[:500]
+    cached = LandingPageCache.objects.filter(url=cache_key).first()
+    now = timezone.now()
+
+    if cached and cached.checked_at >= now - REFRESH_AFTER:
+        return _cached_result(cached)
+
+    allowed = min(FETCH_DEADLINE, budget.remaining()) if budget else FETCH_DEADLINE
+    if allowed <= 0:
+        metrics.incr("landing.budget_spent")
+        return _cached_result(cached) if cached else None
+    deadline = time.monotonic() + allowed
+
+    headers = dict(BROWSER_HEADERS)
+    if cached and cached.etag:
+        headers['If-None-Match'] = cached.etag
+    if cached and cached.last_modified:
+        headers['If-Modified-Since'] = cached.last_modified
+
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=min(FETCH_TIMEOUT, allowed)) as response:
+            if response.status_code == 304 and cached:
+                cached.checked_at = now
+                cached.save(update_fields=['checked_at'])
+                return _cached_result(cached)
+
+            content_type = response.headers.get('Content-Type', '')
+            if response.status_code != 200 or 'html' not in content_type.lower():
+                return _cached_result(cached) if cached else None
+
+            scanner = _scan_response(response, deadline)
+            etag = response.headers.get('ETag', '')
+            last_modified = response.headers.get('Last-Modified', '')
+    except Exception as e:
+        print(f"⚠️ Landing page fetch failed for {url}: {e}")
+        return _cached_result(cached) if cached else None
+
+    cached, _ = LandingPageCache.objects.update_or_create(
+        url=cache_key,
+        defaults={
+            'etag': etag[:255],
+            'last_modified': last_modified[:64],
+            'deadline': scanner.deadline,
+            'eligibility': scanner.eligibility,
+            'documents_required': scanner.documents,
+            'fetched_at': now,
+            'checked_at': now,
+        }
+    )
+    return _cached_result(cached)
@@ -0,0 +1,58 @@
+# agent/management/commands/archive_expired.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from agent.models import VerifiedScholarship, ArchivedScholarship
+
+ARCHIVED_FIELDS = [
+    'title', 'url', 'canonical_url', 'source', 'trust_score', 'status', 'security_flags',
+    'deadline', 'info_paragraph', 'eligibility', 'documents_required', 'added_from', 'created_at',
+]
+
+
+class Command(BaseCommand):
+    help = "Moves scholarships whose deadline has passed into the archive table (run daily from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-days', type=int, default=7,
+                            help="Keep expired rows this many days after the deadline (default 7)")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Rows moved per transaction, keeps the write lock short (default 500)")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would move")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.localdate() - timedelta(days=options['grace_days'])
+        expired = VerifiedScholarship.objects.filter(deadline__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} scholarships expired before {cutoff} would be archived.")
+            return
+
+        moved = 0
+        while True:
+            # Small transactions so web workers can still write between batches
+            with transaction.atomic():
+                batch = list(expired.select_related('category').order_by('pk')[:options['batch_size']])
+                if not batch:
+                    break
+                ArchivedScholarship.objects.bulk_create(
+                    [
+                        ArchivedScholarship(
+                            category_name=sch.category.name,
+                            **{field: getattr(sch, field) for field in ARCHIVED_FIELDS}
+                        )
+                        for sch in batch
+                    ],
+                    # Archived once before (re-scraped, expired again): refresh the copy
+                    update_conflicts=True,
+                    unique_fields=['canonical_url'],
+                    update_fields=['category_name'] + [f for f in ARCHIVED_FIELDS if f != 'canonical_url'],
+                )
+                # Per-row pre_delete signals take the rows out of the facet counters
+                VerifiedScholarship.objects.filter(pk__in=[sch.pk for sch in batch]).delete()
+            moved += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} scholarships expired before {cutoff}."))
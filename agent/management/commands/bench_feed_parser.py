@@ -0,0 +1,104 @@
+# agent/management/commands/bench_feed_parser.py
+import io
+import glob
+import os
+import time
+import statistics
+import tracemalloc
+from itertools import islice
+
+import feedparser
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from agent.feeds import entry_guid, iter_feed_entries
+from agent.landing import BROWSER_HEADERS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'fixtures', 'feeds')
+
+
+def parse_feedparser(data, take=None):
+    return list(islice(feedparser.parse(data).entries, take))
+
+
+def parse_incremental(data, take=None):
+    return list(islice(iter_feed_entries(io.BytesIO(data)), take))
+
+
+def comparable(entry):
+    return (entry.title, entry.link, entry_guid(entry), entry.source.title if hasattr(entry, 'source') else None)
+
+
+def record_feed(url):
+    """Saves the live feed body as agent/fixtures/feeds/recorded-<timestamp>.xml and returns the path."""
+    response = requests.get(url, headers=BROWSER_HEADERS, timeout=15)
+    response.raise_for_status()
+    path = os.path.join(FIXTURE_DIR, f"recorded-{timezone.now():%Y%m%dT%H%M%SZ}.xml")
+    with open(path, 'wb') as f:
+        f.write(response.content)
+    return path
+
+
+class Command(BaseCommand):
+    help = ("Benchmarks the incremental lxml feed parser against feedparser.parse on RSS files "
+            "(agent/fixtures/feeds/*.xml by default): time and peak memory, full read and early stop. "
+            "The shipped fixture is synthetic; use --record to capture a real Google News feed first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('feeds', nargs='*', help="RSS files to parse (default: every fixture)")
+        parser.add_argument('--record', metavar='URL',
+                            help="Download this feed into agent/fixtures/feeds/recorded-<time>.xml and benchmark it, "
+                                 "e.g. 'https://news.google.com/rss/search?q=scholarship&hl=en-IN&gl=IN&ceid=IN:en'")
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--take', type=int, default=4, help="Entries the consumer needs before it stops (default 4)")
+
+    def handle(self, *args, **options):
+        paths = list(options['feeds'])
+        if options['record']:
+            try:
+                paths.append(record_feed(options['record']))
+            except requests.RequestException as e:
+                raise CommandError(f"Could not record {options['record']}: {e}")
+            self.stdout.write(f"Recorded {paths[-1]}")
+        paths = paths or sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.xml')))
+        if not paths:
+            raise CommandError(f"No feeds given and no fixtures in {FIXTURE_DIR}")
+
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            label = " - SYNTHETIC, not representative of the live feed" if os.path.basename(path).startswith('synthetic') else ""
+            self.stdout.write(f"\n{os.path.basename(path)} ({len(data) / 1024:.0f} KiB){label}")
+
+            expected = [comparable(e) for e in parse_feedparser(data)]
+            got = [comparable(e) for e in parse_incremental(data)]
+            if expected != got:
+                mismatches = sum(a != b for a, b in zip(expected, got)) + abs(len(expected) - len(got))
+                self.stdout.write(self.style.WARNING(f"  {mismatches} of {len(expected)} entries differ from feedparser"))
+            else:
+                self.stdout.write(f"  {len(got)} entries, identical title/link/guid/source to feedparser")
+
+            runs = [
+                ("feedparser.parse", parse_feedparser, None),
+                ("incremental, full", parse_incremental, None),
+                (f"incremental, first {options['take']}", parse_incremental, options['take']),
+            ]
+            baseline = None
+            for label, parse, take in runs:
+                timings = []
+                for _ in range(options['iterations']):
+                    started = time.perf_counter()
+                    parse(data, take)
+                    timings.append(time.perf_counter() - started)
+                median = statistics.median(timings) * 1000
+
+                tracemalloc.start()
+                parse(data, take)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                baseline = baseline or median
+                self.stdout.write(
+                    f"  {label:<24} {median:8.2f} ms  (x{baseline / median:5.1f})   peak {peak / 1024:8.0f} KiB"
+                )
@@ -0,0 +1,129 @@
+# agent/management/commands/check_gnews_decoder.py
+import os
+import io
+import json
+import time
+from collections import Counter
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from agent.canonical import canonicalize_url
+from agent.feeds import iter_feed_entries
+from agent.gnews import article_id, decode_article_url, is_opaque_article
+from agent.landing import BROWSER_HEADERS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'fixtures')
+DEFAULT_CORPUS = os.path.join(FIXTURE_DIR, 'gnews_synthetic_cases.json')
+
+
+def follow_redirect(link):
+    """Where Google sends a browser for this article link (None if it stays on Google)."""
+    response = requests.get(link, headers=BROWSER_HEADERS, allow_redirects=True, timeout=10)
+    return None if article_id(response.url) else response.url
+
+
+def record_corpus(feed_url, delay, log):
+    """
+    Captures a real corpus: every article link of the live feed, with the target
+    its redirect resolves to. Opaque IDs often resolve only through JavaScript;
+    those keep expected=None (target unknown) and are only counted.
+    """
+    feed = requests.get(feed_url, headers=BROWSER_HEADERS, timeout=15)
+    feed.raise_for_status()
+    cases = []
+    for entry in iter_feed_entries(io.BytesIO(feed.content)):
+        try:
+            expected = follow_redirect(entry.link)
+        except requests.RequestException as e:
+            log(f"  redirect failed for {entry.link}: {e}")
+            expected = None
+        cases.append({'kind': 'captured', 'link': entry.link, 'expected': expected})
+        time.sleep(delay) # one redirect at a time: this runs against the live site
+    return {
+        "_comment": f"Captured from {feed_url} by `manage.py check_gnews_decoder --record`; "
+                    "expected is the redirect target (null: the redirect did not leave Google).",
+        "synthetic": False,
+        "feed_url": feed_url,
+        "captured_at": timezone.now().isoformat(),
+        "cases": cases,
+    }
+
+
+class Command(BaseCommand):
+    help = ("Runs the offline Google News link decoder over a corpus of article links and reports how many "
+            "resolve without a redirect request. The shipped corpus is synthetic (format coverage only); "
+            "use --record to capture a real one from a live feed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="JSON file with a 'cases' list of {link, expected}")
+        parser.add_argument('--record', metavar='FEED_URL',
+                            help="Capture a corpus from this live feed (following each link's redirect), "
+                                 "save it to --corpus-out and check it")
+        parser.add_argument('--corpus-out', default=None,
+                            help="Where --record writes (default agent/fixtures/gnews_captured-<time>.json)")
+        parser.add_argument('--delay', type=float, default=1.0, help="Seconds between redirect requests in --record")
+
+    def handle(self, *args, **options):
+        if options['record']:
+            try:
+                corpus = record_corpus(options['record'], options['delay'], self.stdout.write)
+            except requests.RequestException as e:
+                raise CommandError(f"Could not record {options['record']}: {e}")
+            path = options['corpus_out'] or os.path.join(
+                FIXTURE_DIR, f"gnews_captured-{timezone.now():%Y%m%dT%H%M%SZ}.json")
+            with open(path, 'w') as f:
+                json.dump(corpus, f, indent=1)
+            self.stdout.write(f"Recorded {len(corpus['cases'])} links into {path}")
+        else:
+            with open(options['corpus']) as f:
+                corpus = json.load(f)
+        cases = corpus['cases']
+
+        outcomes = Counter()
+        by_kind = Counter()
+        hits_by_kind = Counter()
+        mismatches = []
+        started = time.perf_counter()
+        for case in cases:
+            decoded = decode_article_url(case['link'])
+            kind = case.get('kind', 'unknown')
+            by_kind[kind] += 1
+            if corpus.get('synthetic', True):
+                if decoded != case['expected']:
+                    mismatches.append((case['link'], case['expected'], decoded))
+            elif decoded and case['expected'] and canonicalize_url(decoded) != canonicalize_url(case['expected']):
+                # Captured links: undecoded ones just need the fallback, and an unknown target can't be checked
+                mismatches.append((case['link'], case['expected'], decoded))
+            if decoded:
+                outcomes['decoded'] += 1
+                hits_by_kind[kind] += 1
+            elif not article_id(case['link']):
+                outcomes['not_google'] += 1
+            elif is_opaque_article(case['link']):
+                outcomes['opaque_id'] += 1
+            else:
+                outcomes['undecodable'] += 1
+        elapsed = time.perf_counter() - started
+
+        google_links = len(cases) - outcomes['not_google']
+        if corpus.get('synthetic', True):
+            self.stdout.write(self.style.WARNING(
+                "Synthetic corpus: the rates below show format coverage, not the live offline hit rate."))
+        else:
+            self.stdout.write(f"Captured from {corpus.get('feed_url')} at {corpus.get('captured_at')}")
+        self.stdout.write(f"{len(cases)} links ({google_links} Google News articles), decoded in {elapsed * 1000:.1f} ms")
+        for kind, total in sorted(by_kind.items()):
+            self.stdout.write(f"  {kind:<12} {hits_by_kind[kind]:>4}/{total:<4} resolved offline")
+        self.stdout.write(
+            f"Offline hit rate: {outcomes['decoded'] / max(google_links, 1):.1%}; "
+            f"opaque IDs: {outcomes['opaque_id'] / max(google_links, 1):.1%} "
+            f"({outcomes['opaque_id']} opaque and {outcomes['undecodable']} undecodable need the network fallback)"
+        )
+
+        for link, expected, decoded in mismatches:
+            self.stdout.write(self.style.ERROR(f"  {link}\n    expected {expected}\n    got      {decoded}"))
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} of {len(cases)} links decoded differently than expected")
+        self.stdout.write(self.style.SUCCESS("Every link with a known target decoded as expected."))
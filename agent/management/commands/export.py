@@ -0,0 +1,49 @@
+# agent/management/commands/export.py
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from agent import export
+
+
+class Command(BaseCommand):
+    help = ("Exports verified scholarships as NDJSON, CSV or Parquet, chunk by chunk. "
+            "--since limits the export to rows inserted or updated after a previous export "
+            "(deleted or archived rows are not reported; run a full export to catch those).")
+    # stdout is the export itself: don't import the URLconf (and the views' startup output) for checks
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=export.FORMATS, default='ndjson')
+        parser.add_argument('--since', help="ISO date/timestamp; use the high-water mark printed by the previous export")
+        parser.add_argument('--output', '-o', default='-', help="File to write (default: stdout)")
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        high_water_mark = timezone.now()
+        try:
+            since = export.parse_since(options['since'])
+            stream = export.export_stream(options['format'], since=since, chunk_size=options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        to_stdout = options['output'] == '-'
+        target = sys.stdout.buffer if to_stdout else open(options['output'], 'wb')
+        started = time.monotonic()
+        written = 0
+        try:
+            for data in stream:
+                target.write(data)
+                written += len(data)
+        finally:
+            if to_stdout:
+                target.flush()
+            else:
+                target.close()
+
+        # Progress goes to stderr so stdout stays a clean export
+        report = self.stderr if to_stdout else self.stdout
+        report.write(f"Exported {written} bytes of {options['format']} in {time.monotonic() - started:.1f}s.")
+        report.write(f"Next incremental export: --since {high_water_mark.isoformat()}")
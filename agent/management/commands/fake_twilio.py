@@ -0,0 +1,81 @@
+# agent/management/commands/fake_twilio.py
+import json
+import time
+import uuid
+import random
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+def fake_twilio_server(port=8799, latency=0.2, fail_rate=0.0, log=None):
+    """
+    The stand-in Messages API, not yet serving (call serve_forever(), e.g. in a thread).
+    Accepted messages are kept in server.received as {'to', 'body', 'sid'} dicts.
+    """
+    lock = threading.Lock()
+    received = []
+    first = []
+
+    class MessagesHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not self.path.endswith('/Messages.json'):
+                self.send_error(404)
+                return
+            form = parse_qs(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode())
+            time.sleep(latency)
+
+            if random.random() < fail_rate:
+                self.reply(500, {"code": 20500, "message": "Simulated Twilio failure"})
+                return
+
+            message = {'to': form.get('To', [''])[0], 'body': form.get('Body', [''])[0], 'sid': f"SM{uuid.uuid4().hex}"}
+            with lock:
+                received.append(message)
+                first[:] = first or [time.monotonic()]
+                count, started = len(received), first[0]
+            if log:
+                log(f"#{count} -> {message['to']} ({count / max(time.monotonic() - started, 1e-6):.1f}/s)")
+            self.reply(201, {"sid": message['sid'], "status": "queued", "to": message['to'], "body": message['body']})
+
+        def reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # one line per message is printed above
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), MessagesHandler)
+    server.received = received
+    return server
+
+
+class Command(BaseCommand):
+    help = ("Runs a local stand-in for Twilio's Messages API so reminder runs can be tested "
+            "without sending real WhatsApp messages (use with TWILIO_API_BASE or --api-base).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8799)
+        parser.add_argument('--latency', type=float, default=0.2, help="Seconds each request takes (default 0.2)")
+        parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of requests answered with HTTP 500")
+        parser.add_argument('--quiet', action='store_true', help="Don't print every message")
+
+    def handle(self, *args, **options):
+        server = fake_twilio_server(
+            port=options['port'], latency=options['latency'], fail_rate=options['fail_rate'],
+            log=None if options['quiet'] else self.stdout.write,
+        )
+        self.stdout.write(f"Fake Twilio Messages API on http://127.0.0.1:{options['port']} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Received {len(server.received)} messages.")
@@ -0,0 +1,134 @@
+# agent/management/commands/rescore.py
+import os
+import json
+import time
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from agent import facets, tags
+from agent.models import VerifiedScholarship
+from agent.trust import verify_url_authenticity
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, '.rescore_checkpoint.json')
+
+
+def score_chunk(rows):
+    """Runs in a worker process: [(pk, url, title)] -> [(pk, score, flags, status)]."""
+    results = []
+    for pk, url, title in rows:
+        score, flags, status = verify_url_authenticity(url, title)
+        results.append((pk, score, flags, status))
+    return results
+
+
+class Command(BaseCommand):
+    help = "Re-runs the Trust Engine over every stored scholarship and writes back rows whose verdict changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per work unit (default 1000)")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Scoring processes")
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Progress file used to resume")
+        parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+        parser.add_argument('--dry-run', action='store_true', help="Score and report, but don't write")
+
+    # ==========================================
+    #  CHECKPOINT
+    # ==========================================
+    def load_checkpoint(self, path, restart):
+        if restart or not os.path.exists(path):
+            return {"last_pk": 0, "scanned": 0, "changed": 0, "transitions": {}}
+        with open(path) as f:
+            state = json.load(f)
+        self.stdout.write(f"Resuming after id {state['last_pk']} ({state['scanned']} rows already scored).")
+        return state
+
+    def save_checkpoint(self, path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path) # atomic: a crash never leaves half a checkpoint
+
+    # ==========================================
+    #  MAIN LOOP
+    # ==========================================
+    def handle(self, *args, **options):
+        state = self.load_checkpoint(options['checkpoint'], options['restart'])
+        transitions = Counter({tuple(k.split(' -> ')): v for k, v in state['transitions'].items()})
+        started = time.monotonic()
+
+        rows = (VerifiedScholarship.objects
+                .filter(pk__gt=state['last_pk'])
+                .order_by('pk')
+                .values_list('pk', 'url', 'title', 'trust_score', 'status', 'security_flags'))
+
+        def chunks():
+            chunk = []
+            for row in rows.iterator(chunk_size=options['chunk_size']):
+                chunk.append(row)
+                if len(chunk) >= options['chunk_size']:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        # Workers only run the pure Trust Engine (agent.trust); they never touch the DB
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+            in_flight = deque()
+            for chunk in chunks():
+                in_flight.append((chunk, pool.submit(score_chunk, [(pk, url, title) for pk, url, title, *_ in chunk])))
+                # Bounded look-ahead keeps memory flat; results are applied in id order
+                # so the checkpoint is always "everything up to last_pk is done"
+                if len(in_flight) >= options['workers'] * 2:
+                    self.apply(*in_flight.popleft(), state, transitions, options)
+            while in_flight:
+                self.apply(*in_flight.popleft(), state, transitions, options)
+
+        self.report(state, transitions, time.monotonic() - started, options['dry_run'])
+        if not options['dry_run'] and os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint']) # finished: next run starts from the top
+
+    def apply(self, chunk, future, state, transitions, options):
+        previous = {pk: (score, status, flags) for pk, _, _, score, status, flags in chunk}
+        changed = []
+        moves = Counter()
+        now = timezone.now() # bulk_update skips auto_now; incremental exports rely on updated_at
+        for pk, score, flags, status in future.result():
+            old_score, old_status, old_flags = previous[pk]
+            if (score, status, flags) != (old_score, old_status, old_flags):
+                changed.append(VerifiedScholarship(pk=pk, trust_score=score, status=status, security_flags=flags, updated_at=now))
+                if status != old_status:
+                    transitions[(old_status, status)] += 1
+                    moves[(old_status, status)] += 1
+
+        if changed and not options['dry_run']:
+            with transaction.atomic():
+                VerifiedScholarship.objects.bulk_update(changed, ['trust_score', 'status', 'security_flags', 'updated_at'], batch_size=500)
+                # bulk_update sends no signals: move the status facet counters and flag tags ourselves
+                for (old_status, status), count in moves.items():
+                    facets.move('status', old_status, status, count)
+                tags.replace_flag_tags({sch.pk: sch.security_flags for sch in changed})
+
+        state['last_pk'] = chunk[-1][0]
+        state['scanned'] += len(chunk)
+        state['changed'] += len(changed)
+        state['transitions'] = {f"{old} -> {new}": count for (old, new), count in transitions.items()}
+        if not options['dry_run']:
+            self.save_checkpoint(options['checkpoint'], state)
+        self.stdout.write(f"  scored up to id {state['last_pk']}: {state['scanned']} rows, {state['changed']} changed")
+
+    def report(self, state, transitions, elapsed, dry_run):
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[dry run] ' if dry_run else ''}Rescored {state['scanned']} scholarships in {elapsed:.1f}s, "
+            f"{state['changed']} changed."
+        ))
+        if not transitions:
+            self.stdout.write("No scholarship moved between Verified / Caution / Risk.")
+        for (old, new), count in transitions.most_common():
+            self.stdout.write(f"  {old:>10} -> {new:<10} {count}")
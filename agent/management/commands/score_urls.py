@@ -0,0 +1,138 @@
+# agent/management/commands/score_urls.py
+import io
+import os
+import csv
+import sys
+import gzip
+import json
+import time
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from agent.trust import verify_url_authenticity
+
+CSV_COLUMNS = ['line', 'url', 'title', 'trust_score', 'status', 'security_flags', 'error']
+
+
+def parse_line(line):
+    """'url' or 'url<TAB or space>title' -> (url, title)."""
+    url, _, title = line.strip().partition('\t' if '\t' in line else ' ')
+    return url, title.strip()
+
+
+def score_lines(first_line, lines, fmt):
+    """
+    Runs in a worker process: scores a chunk of raw input lines and returns it
+    already serialised, so the parent only reads and writes.
+    Returns (text, Counter of statuses).
+    """
+    statuses = Counter()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    for offset, line in enumerate(lines):
+        url, title = parse_line(line)
+        if not url or url.startswith('#'):
+            continue
+        row = {'line': first_line + offset, 'url': url, 'title': title}
+        if url.startswith(('http://', 'https://')):
+            score, flags, status = verify_url_authenticity(url, title)
+            row.update(trust_score=score, status=status, security_flags=flags)
+            statuses[status or 'Invalid'] += 1
+        else:
+            row['error'] = "URL must start with http:// or https://"
+            statuses['Invalid'] += 1
+
+        if writer:
+            writer.writerow([
+                json.dumps(row[col]) if col == 'security_flags' and col in row else row.get(col, '')
+                for col in CSV_COLUMNS
+            ])
+        else:
+            buffer.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return buffer.getvalue(), statuses
+
+
+def open_text(path, mode):
+    if path == '-':
+        return sys.stdin if 'r' in mode else sys.stdout
+    opener = gzip.open if path.endswith('.gz') else open
+    return opener(path, mode + 't', encoding='utf-8', errors='replace', newline='' if 'w' in mode else None)
+
+
+class Command(BaseCommand):
+    help = ("Scores a large list of URLs (one per line, optionally followed by a tab and a title) "
+            "with the Trust Engine in a process pool, streaming NDJSON or CSV verdicts.")
+    # stdout carries the verdicts: don't import the URLconf (and the views' startup output) for checks
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Text file of URLs (.gz is fine), or - for stdin")
+        parser.add_argument('--output', '-o', default='-', help="Where to write verdicts (default: stdout)")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Scoring processes")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Lines per work unit (default 5000)")
+        parser.add_argument('--progress-every', type=float, default=5.0, help="Seconds between throughput lines")
+
+    def handle(self, *args, **options):
+        # Progress goes to stderr when verdicts go to stdout
+        self.report = self.stderr if options['output'] == '-' else self.stdout
+        source = open_text(options['input'], 'r')
+        target = open_text(options['output'], 'w')
+        self.statuses = Counter()
+        self.started = self.last_report = time.monotonic()
+        self.progress_every = options['progress_every']
+
+        if options['format'] == 'csv':
+            csv.writer(target).writerow(CSV_COLUMNS)
+
+        def chunks():
+            chunk, first_line = [], 1
+            for line_number, line in enumerate(source, start=1):
+                chunk.append(line)
+                if len(chunk) >= options['chunk_size']:
+                    yield first_line, chunk
+                    chunk, first_line = [], line_number + 1
+            if chunk:
+                yield first_line, chunk
+
+        # Workers only run the pure Trust Engine (agent.trust); nothing to re-initialise
+        context = multiprocessing.get_context('fork')
+        try:
+            with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+                in_flight = deque()
+                for first_line, chunk in chunks():
+                    in_flight.append(pool.submit(score_lines, first_line, chunk, options['format']))
+                    # Bounded look-ahead keeps memory flat; output keeps input order
+                    if len(in_flight) >= options['workers'] * 2:
+                        self.write(in_flight.popleft(), target)
+                while in_flight:
+                    self.write(in_flight.popleft(), target)
+        finally:
+            if options['input'] != '-':
+                source.close()
+            if options['output'] == '-':
+                target.flush()
+            else:
+                target.close()
+
+        elapsed = time.monotonic() - self.started
+        total = sum(self.statuses.values())
+        self.report.write(self.style.SUCCESS(
+            f"Scored {total} URLs in {elapsed:.1f}s ({total / max(elapsed, 1e-6):,.0f} URLs/s, {options['workers']} workers)."
+        ))
+        for status, count in self.statuses.most_common():
+            self.report.write(f"  {status:<10} {count}")
+
+    def write(self, future, target):
+        text, statuses = future.result()
+        target.write(text)
+        self.statuses.update(statuses)
+
+        now = time.monotonic()
+        if now - self.last_report >= self.progress_every:
+            total = sum(self.statuses.values())
+            self.report.write(f"  {total:,} URLs scored, {total / (now - self.started):,.0f} URLs/s")
+            self.last_report = now
@@ -0,0 +1,38 @@
+# agent/management/commands/send_deadline_reminders.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from agent.reminders import ReminderRun
+
+
+class Command(BaseCommand):
+    help = "Sends WhatsApp reminders to subscribers for scholarships in their category that close soon (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days-before', type=int, default=None,
+                            help="Remind when the deadline is at most this many days away (default REMINDER_DAYS_BEFORE)")
+        parser.add_argument('--concurrency', type=int, default=None, help="Sender threads (default REMINDER_SEND_CONCURRENCY)")
+        parser.add_argument('--api-base', default=None,
+                            help="Messaging API base URL, e.g. http://127.0.0.1:8799 for `manage.py fake_twilio`")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the reminders that are due")
+
+    def handle(self, *args, **options):
+        run = ReminderRun(
+            days_before=options['days_before'],
+            concurrency=options['concurrency'],
+            api_base=options['api_base'],
+            log=self.stdout.write,
+        )
+        if options['dry_run']:
+            self.stdout.write(f"{run.due().count()} reminders due (deadline on or before {run.today} + {run.days_before} days).")
+            return
+
+        started = time.monotonic()
+        stats = run.run()
+        elapsed = time.monotonic() - started
+        rate = stats['sent'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {stats['sent']} reminders in {elapsed:.1f}s ({rate:.1f}/s): "
+            f"{stats['failed']} failed, {stats['deferred']} deferred, {stats['skipped']} claimed by another run."
+        ))
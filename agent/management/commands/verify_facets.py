@@ -0,0 +1,43 @@
+# agent/management/commands/verify_facets.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from agent.facets import FACETS, recount_facets
+from agent.models import FacetCount
+
+
+class Command(BaseCommand):
+    help = "Recomputes facet counts from VerifiedScholarship and corrects any drift in the counters table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report drift, don't fix it")
+
+    def handle(self, *args, **options):
+        # One transaction: the recount and the counters are compared at the same instant
+        with transaction.atomic():
+            actual = recount_facets()
+            stored = {
+                (facet, value): (pk, count)
+                for pk, facet, value, count in FacetCount.objects.values_list('pk', 'facet', 'value', 'count')
+            }
+
+            drift = []
+            for facet in FACETS:
+                for value, count in actual[facet].items():
+                    pk, stored_count = stored.pop((facet, value), (None, 0))
+                    if stored_count != count:
+                        drift.append((facet, value, stored_count, count))
+            # Counters for values no row carries any more
+            drift += [(facet, value, count, 0) for (facet, value), (_, count) in stored.items() if count]
+
+            for facet, value, stored_count, count in drift:
+                self.stdout.write(f"  {facet}={value!r}: counter {stored_count}, actual {count}")
+                if not options['dry_run']:
+                    FacetCount.objects.update_or_create(facet=facet, value=value, defaults={'count': count})
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Facet counters match the scholarship table."))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"[dry run] {len(drift)} facet counters have drifted."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Corrected {len(drift)} drifted facet counters."))
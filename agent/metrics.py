@@ -0,0 +1,34 @@
+# agent/metrics.py
+import threading
+from collections import defaultdict
+
+# Per-worker counters and timings. Cheap enough to call on every request;
+# read them back through /api/metrics/.
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_timings = {} # name -> [count, total, max]
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def observe(name, value):
+    """Records one sample (seconds, rows, ...) for a timing/size metric."""
+    with _lock:
+        stats = _timings.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += value
+        stats[2] = max(stats[2], value)
+
+
+def snapshot():
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timings": {
+                name: {"count": count, "avg": round(total / count, 4) if count else 0, "max": round(peak, 4)}
+                for name, (count, total, peak) in _timings.items()
+            },
+        }
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-19 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0002_scholarshipcategory_verifiedscholarship'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LandingPageCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('deadline', models.CharField(blank=True, max_length=50, null=True)),
+                ('eligibility', models.TextField(blank=True, default='')),
+                ('documents_required', models.JSONField(default=list)),
+                ('fetched_at', models.DateTimeField()),
+                ('checked_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='eligibility',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
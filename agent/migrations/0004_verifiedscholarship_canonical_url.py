@@ -0,0 +1,97 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:05
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from django.db import migrations, models
+
+# Frozen copy of agent/canonical.py as of this migration: the backfill must keep
+# producing the same keys even if the live helper changes later.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'oc', 'ocid', 'cmpid', 'spm', '_ga',
+}
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def canonicalize_url(url):
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and str(port) in DEFAULT_PORTS.values():
+        port = None
+    netloc = f"{host}:{port}" if port else host
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query_pairs = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    query = urlencode(sorted(query_pairs))
+
+    return urlunsplit(('https', netloc, path, query, ''))
+
+
+def backfill_canonical_urls(apps, schema_editor):
+    """
+    Fills canonical_url for every row. Rows that collapse onto the same
+    canonical URL are merged: the highest trust score wins (oldest row on a tie)
+    and the other copies are deleted.
+    """
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+
+    keepers = {}
+    duplicates = []
+    rows = VerifiedScholarship.objects.order_by('created_at', 'pk').only('pk', 'url', 'trust_score')
+    for row in rows.iterator(chunk_size=500):
+        canonical = canonicalize_url(row.url)
+        keeper = keepers.get(canonical)
+        if keeper is None:
+            keepers[canonical] = row
+        elif row.trust_score > keeper.trust_score:
+            duplicates.append(keeper.pk)
+            keepers[canonical] = row
+        else:
+            duplicates.append(row.pk)
+
+    for start in range(0, len(duplicates), 500):
+        VerifiedScholarship.objects.filter(pk__in=duplicates[start:start + 500]).delete()
+
+    for canonical, keeper in keepers.items():
+        keeper.canonical_url = canonical
+    VerifiedScholarship.objects.bulk_update(keepers.values(), ['canonical_url'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0003_landingpagecache_verifiedscholarship_eligibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='canonical_url',
+            field=models.CharField(editable=False, max_length=500, null=True),
+        ),
+        migrations.RunPython(backfill_canonical_urls, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='verifiedscholarship',
+            name='canonical_url',
+            field=models.CharField(editable=False, max_length=500, unique=True),
+        ),
+    ]
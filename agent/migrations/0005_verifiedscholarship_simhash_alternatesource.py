@@ -0,0 +1,117 @@
+# Generated by Django 5.2.10 on 2026-10-19 09:56
+
+import re
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of agent/fingerprint.py as of this migration: the backfill must keep
+# producing the same fingerprints even if the live helper changes later.
+BAND_COUNT = 4
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'to', 'in', 'on', 'at', 'by', 'with', 'from',
+    'is', 'are', 'be', 'this', 'that', 'its', 'it', 'as', 'how', 'here', 'your', 'you', 'now',
+    'all', 'check', 'details', 'know', 'latest', 'news', 'update', 'updates',
+}
+
+
+def _tokens(text):
+    return [t for t in re.findall(r'[a-z0-9]+', text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def simhash(title):
+    tokens = _tokens(re.sub(r'\s+[-|–]\s+[^-|–]+$', '', title or ''))
+    if not tokens:
+        return None
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def fingerprint_fields(value):
+    if value is None:
+        return {'simhash': None, **{f'simhash_band{i}': None for i in range(BAND_COUNT)}}
+    signed = value - (1 << 64) if value >= (1 << 63) else value
+    return {
+        'simhash': signed,
+        **{f'simhash_band{band}': (value >> (band * BAND_BITS)) & BAND_MASK for band in range(BAND_COUNT)},
+    }
+
+
+def backfill_fingerprints(apps, schema_editor):
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    batch = []
+    rows = VerifiedScholarship.objects.only('pk', 'title').order_by('pk')
+    for row in rows.iterator(chunk_size=500):
+        for field, value in fingerprint_fields(simhash(row.title)).items():
+            setattr(row, field, value)
+        batch.append(row)
+        if len(batch) >= 500:
+            VerifiedScholarship.objects.bulk_update(batch, ['simhash', 'simhash_band0', 'simhash_band1', 'simhash_band2', 'simhash_band3'])
+            batch = []
+    if batch:
+        VerifiedScholarship.objects.bulk_update(batch, ['simhash', 'simhash_band0', 'simhash_band1', 'simhash_band2', 'simhash_band3'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0004_verifiedscholarship_canonical_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='simhash_band0',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='simhash_band1',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='simhash_band2',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='simhash_band3',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='AlternateSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('title', models.CharField(max_length=255)),
+                ('source', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('scholarship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alternate_sources', to='agent.verifiedscholarship')),
+            ],
+            options={
+                'unique_together': {('scholarship', 'url')},
+            },
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
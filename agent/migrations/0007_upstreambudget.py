@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-19 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0006_singleflightlease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpstreamBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('tokens', models.FloatField()),
+                ('capacity', models.FloatField()),
+                ('refill_per_second', models.FloatField()),
+                ('updated_at', models.FloatField()),
+                ('backoff_until', models.FloatField(default=0)),
+                ('backoff_seconds', models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.10 on 2026-10-19 11:20
+
+import re
+from datetime import datetime
+
+from django.db import migrations, models
+
+# Frozen copy of agent/dates.py as of this migration: the backfill must keep
+# parsing the old strings the same way even if the live helper changes later.
+MONTHS = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE_PATTERNS = [
+    (re.compile(rf'\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({MONTHS}),?\s+(\d{{4}})\b', re.I), 'dmy_text'),
+    (re.compile(rf'\b({MONTHS})\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b', re.I), 'mdy_text'),
+    (re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b'), 'ymd'),
+    (re.compile(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b'), 'dmy'),
+]
+
+
+def _month_number(token):
+    try:
+        return datetime.strptime(token.strip('.')[:3].title(), "%b").month
+    except ValueError:
+        return None
+
+
+def coerce_deadline(value):
+    """The old CharField only ever held strings."""
+    for pattern, kind in DATE_PATTERNS:
+        for match in pattern.finditer(str(value)):
+            a, b, c = match.groups()
+            try:
+                if kind == 'dmy_text':
+                    day, month, year = int(a), _month_number(b), int(c)
+                elif kind == 'mdy_text':
+                    day, month, year = int(b), _month_number(a), int(c)
+                elif kind == 'ymd':
+                    day, month, year = int(c), int(b), int(a)
+                else:
+                    day, month, year = int(a), int(b), int(c)
+                if month:
+                    return datetime(year, month, day).date()
+            except ValueError:
+                continue
+    return None
+
+
+def parse_existing_deadlines(apps, schema_editor):
+    """Copies the free-form deadline strings ("03 Nov 2026") into the new DateField."""
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    batch = []
+    rows = VerifiedScholarship.objects.exclude(deadline__isnull=True).exclude(deadline='').only('pk', 'deadline')
+    for row in rows.iterator(chunk_size=500):
+        row.deadline_date = coerce_deadline(row.deadline)
+        batch.append(row)
+        if len(batch) >= 500:
+            VerifiedScholarship.objects.bulk_update(batch, ['deadline_date'])
+            batch = []
+    if batch:
+        VerifiedScholarship.objects.bulk_update(batch, ['deadline_date'])
+
+
+def clear_landing_page_deadlines(apps, schema_editor):
+    # It's a cache: forget the old string deadlines, the next refresh re-reads them
+    LandingPageCache = apps.get_model('agent', 'LandingPageCache')
+    LandingPageCache.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0007_upstreambudget'),
+    ]
+
+    operations = [
+        # 1. VerifiedScholarship.deadline: CharField -> indexed DateField
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='deadline_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(parse_existing_deadlines, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='verifiedscholarship',
+            name='deadline',
+        ),
+        migrations.RenameField(
+            model_name='verifiedscholarship',
+            old_name='deadline_date',
+            new_name='deadline',
+        ),
+        migrations.AlterField(
+            model_name='verifiedscholarship',
+            name='deadline',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+
+        # 2. LandingPageCache.deadline: same type change (cache rows are dropped)
+        migrations.RunPython(clear_landing_page_deadlines, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='landingpagecache',
+            name='deadline',
+            field=models.DateField(blank=True, null=True),
+        ),
+
+        # 3. Archive table for expired scholarships
+        migrations.CreateModel(
+            name='ArchivedScholarship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_name', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=255)),
+                ('url', models.URLField(max_length=500)),
+                ('canonical_url', models.CharField(max_length=500, unique=True)),
+                ('source', models.CharField(blank=True, max_length=100, null=True)),
+                ('trust_score', models.IntegerField()),
+                ('status', models.CharField(max_length=50)),
+                ('security_flags', models.JSONField(default=list)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('info_paragraph', models.TextField()),
+                ('eligibility', models.TextField(blank=True, default='')),
+                ('documents_required', models.JSONField(default=list)),
+                ('added_from', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
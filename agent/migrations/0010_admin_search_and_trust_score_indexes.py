@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:04
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0009_feedstate_seenfeedentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='verifiedscholarship',
+            name='trust_score',
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='verifiedscholarship',
+            index=models.Index(django.db.models.functions.comparison.Collate('title', 'NOCASE'), name='scholarship_title_nocase'),
+        ),
+    ]
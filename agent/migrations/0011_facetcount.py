@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:06
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_facet_counts(apps, schema_editor):
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    FacetCount = apps.get_model('agent', 'FacetCount')
+    counts = []
+    for facet, column in (('category', 'category__name'), ('added_from', 'added_from'), ('status', 'status')):
+        for value, n in VerifiedScholarship.objects.values_list(column).annotate(n=Count('pk')).order_by():
+            if value is not None:
+                counts.append(FacetCount(facet=facet, value=value, count=n))
+    FacetCount.objects.bulk_create(counts)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0010_admin_search_and_trust_score_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
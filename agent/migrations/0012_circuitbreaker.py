@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0011_facetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CircuitBreaker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('state', models.CharField(choices=[('closed', 'Closed'), ('open', 'Open'), ('half_open', 'Half-open')], default='closed', max_length=10)),
+                ('window_started_at', models.FloatField(default=0)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('slow_calls', models.PositiveIntegerField(default=0)),
+                ('retry_at', models.FloatField(default=0)),
+                ('changed_at', models.FloatField(default=0)),
+                ('last_error', models.CharField(blank=True, default='', max_length=255)),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of agent/tags.py as of this migration: the backfill must keep
+# producing the same tags even if the live helper changes later.
+def normalize_tag(value):
+    return str(value).split(':', 1)[0].strip().lower()[:100]
+
+
+def tag_values(documents, flags):
+    pairs = {('document', normalize_tag(doc)) for doc in documents or [] if normalize_tag(doc)}
+    pairs |= {('flag', normalize_tag(flag)) for flag in flags or [] if normalize_tag(flag)}
+    return pairs
+
+
+def backfill_tags(apps, schema_editor):
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    ScholarshipTag = apps.get_model('agent', 'ScholarshipTag')
+    batch = []
+    rows = VerifiedScholarship.objects.only('pk', 'documents_required', 'security_flags').order_by('pk')
+    for row in rows.iterator(chunk_size=500):
+        for kind, value in tag_values(row.documents_required, row.security_flags):
+            batch.append(ScholarshipTag(scholarship_id=row.pk, kind=kind, value=value))
+        if len(batch) >= 1000:
+            ScholarshipTag.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        ScholarshipTag.objects.bulk_create(batch, ignore_conflicts=True)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0012_circuitbreaker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScholarshipTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('document', 'Document required'), ('flag', 'Security flag')], max_length=10)),
+                ('value', models.CharField(max_length=100)),
+                ('scholarship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='agent.verifiedscholarship')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'value'], name='scholarship_tag_kind_value')],
+                'unique_together': {('scholarship', 'kind', 'value')},
+            },
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
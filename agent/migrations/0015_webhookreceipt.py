@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0014_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_sid', models.CharField(max_length=64, unique=True)),
+                ('state', models.CharField(choices=[('processing', 'Processing'), ('done', 'Done')], default='processing', max_length=10)),
+                ('reply', models.TextField(blank=True, default='')),
+                ('lease_until', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-19 11:20
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created_at(apps, schema_editor):
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    VerifiedScholarship.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0015_webhookreceipt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verifiedscholarship',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-19 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0016_verifiedscholarship_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlFrontier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('host', models.CharField(max_length=255)),
+                ('seed', models.URLField(max_length=500)),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('state', models.CharField(choices=[('new', 'Not fetched yet'), ('ok', 'Fetched'), ('gone', 'Gone (404/410)'), ('blocked', 'Disallowed by robots.txt'), ('failed', 'Failing')], default='new', max_length=10)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('content_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('is_scheme_page', models.BooleanField(default=False)),
+                ('failures', models.PositiveSmallIntegerField(default=0)),
+                ('next_fetch_at', models.DateTimeField()),
+                ('last_fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('last_changed_at', models.DateTimeField(blank=True, null=True)),
+                ('discovered_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seed', 'next_fetch_at'], name='crawl_frontier_due')],
+            },
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.10 on 2026-10-19 15:40
+
+from django.db import migrations
+from django.db.models import Count
+from django.utils import timezone
+
+RESTORED_FIELDS = [
+    'title', 'url', 'canonical_url', 'source', 'trust_score', 'status', 'security_flags',
+    'info_paragraph', 'eligibility', 'documents_required', 'added_from',
+]
+
+
+# Frozen copy of agent/tags.py as of this migration (0019 rebuilds every tag with the later keys)
+def normalize_tag(value):
+    return str(value).split(':', 1)[0].strip().lower()[:100]
+
+
+def tag_values(documents, flags):
+    pairs = {('document', normalize_tag(doc)) for doc in documents or [] if normalize_tag(doc)}
+    pairs |= {('flag', normalize_tag(flag)) for flag in flags or [] if normalize_tag(flag)}
+    return pairs
+
+
+def stated_deadlines(apps):
+    """url -> deadline for every landing page that actually printed one."""
+    LandingPageCache = apps.get_model('agent', 'LandingPageCache')
+    return dict(LandingPageCache.objects.exclude(deadline__isnull=True).values_list('url', 'deadline'))
+
+
+def is_synthetic(row, stated):
+    # The crawler reads its deadlines from the page itself
+    return row.added_from != 'Crawler' and stated.get(row.url) != row.deadline
+
+
+def clear_synthetic_deadlines(apps, schema_editor):
+    """
+    The original extractor stamped every row with a random "today + 15-45 days"
+    deadline, which 0008 parsed into real dates. Keep a deadline only where a
+    page stated it; the rest become NULL (unknown), like any page without one.
+    """
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    stated = stated_deadlines(apps)
+    rows = VerifiedScholarship.objects.exclude(deadline__isnull=True).only('pk', 'url', 'deadline', 'added_from')
+    synthetic = [row.pk for row in rows.iterator(chunk_size=500) if is_synthetic(row, stated)]
+    now = timezone.now()
+    for start in range(0, len(synthetic), 500):
+        # updated_at moves too, so incremental exports pick the change up
+        VerifiedScholarship.objects.filter(pk__in=synthetic[start:start + 500]).update(deadline=None, updated_at=now)
+
+
+def restore_wrongly_archived(apps, schema_editor):
+    """Rows archive_expired moved away because their made-up deadline passed go back live."""
+    ArchivedScholarship = apps.get_model('agent', 'ArchivedScholarship')
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    ScholarshipCategory = apps.get_model('agent', 'ScholarshipCategory')
+    ScholarshipTag = apps.get_model('agent', 'ScholarshipTag')
+    stated = stated_deadlines(apps)
+
+    for archived in list(ArchivedScholarship.objects.exclude(deadline__isnull=True).order_by('pk')):
+        if not is_synthetic(archived, stated):
+            continue
+        if VerifiedScholarship.objects.filter(canonical_url=archived.canonical_url).exists() or \
+                VerifiedScholarship.objects.filter(url=archived.url).exists():
+            # Scraped again since: the live row wins
+            archived.delete()
+            continue
+        category, _ = ScholarshipCategory.objects.get_or_create(name=archived.category_name)
+        row = VerifiedScholarship.objects.create(
+            category=category, deadline=None,
+            **{field: getattr(archived, field) for field in RESTORED_FIELDS}
+        )
+        VerifiedScholarship.objects.filter(pk=row.pk).update(created_at=archived.created_at)
+        ScholarshipTag.objects.bulk_create(
+            [ScholarshipTag(scholarship_id=row.pk, kind=kind, value=value)
+             for kind, value in tag_values(row.documents_required, row.security_flags)],
+            ignore_conflicts=True
+        )
+        archived.delete()
+
+
+def recount_facets(apps, schema_editor):
+    # Restored rows bypassed the facet counters: rebuild them (as in 0011)
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    FacetCount = apps.get_model('agent', 'FacetCount')
+    FacetCount.objects.all().delete()
+    counts = []
+    for facet, column in (('category', 'category__name'), ('added_from', 'added_from'), ('status', 'status')):
+        for value, n in VerifiedScholarship.objects.values_list(column).annotate(n=Count('pk')).order_by():
+            if value is not None:
+                counts.append(FacetCount(facet=facet, value=value, count=n))
+    FacetCount.objects.bulk_create(counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0017_crawlfrontier'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_synthetic_deadlines, migrations.RunPython.noop),
+        migrations.RunPython(restore_wrongly_archived, migrations.RunPython.noop),
+        migrations.RunPython(recount_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:05
+
+import re
+
+from django.db import migrations
+
+# Frozen copy of agent/tags.py as of this migration: the rebuild must keep
+# producing the same keys even if the live helper changes later.
+QUALIFIER = re.compile(r'\s*[(\[][^)\]]*[)\]]')
+
+
+def normalize_tag(value):
+    name = QUALIFIER.sub('', str(value).split(':', 1)[0])
+    name = re.sub(r'\s*/\s*', '/', name)
+    return " ".join(name.split()).lower()[:100]
+
+
+def tag_values(documents, flags):
+    pairs = {('document', normalize_tag(doc)) for doc in documents or [] if normalize_tag(doc)}
+    pairs |= {('flag', normalize_tag(flag)) for flag in flags or [] if normalize_tag(flag)}
+    return pairs
+
+
+def rebuild_tags(apps, schema_editor):
+    """Tags are derived data: rebuild them with the canonical keys ("income certificate", not "... (below 2.5 lpa)")."""
+    VerifiedScholarship = apps.get_model('agent', 'VerifiedScholarship')
+    ScholarshipTag = apps.get_model('agent', 'ScholarshipTag')
+    ScholarshipTag.objects.all().delete()
+    batch = []
+    rows = VerifiedScholarship.objects.only('pk', 'documents_required', 'security_flags').order_by('pk')
+    for row in rows.iterator(chunk_size=500):
+        for kind, value in tag_values(row.documents_required, row.security_flags):
+            batch.append(ScholarshipTag(scholarship_id=row.pk, kind=kind, value=value))
+        if len(batch) >= 1000:
+            ScholarshipTag.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        ScholarshipTag.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0018_clear_synthetic_deadlines'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-19 17:10
+
+from django.db import migrations
+
+
+def clear_landing_page_cache(apps, schema_editor):
+    # It's a cache keyed on raw URLs: forget it, the next refresh stores canonical keys
+    LandingPageCache = apps.get_model('agent', 'LandingPageCache')
+    LandingPageCache.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0019_canonical_tag_values'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_landing_page_cache, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 # agent/models.py
 from django.db import models
+from django.db.models.functions import Collate
 
 class ScholarshipCategory(models.Model):
     name = models.CharField(max_length=100, unique=True) # e.g., "msbte", "medical"
@@ -13,24 +14,291 @@ class VerifiedScholarship(models.Model):
     title = models.CharField(max_length=255)
     # UNIQUE=TRUE is the magic bullet that prevents duplicate scholarships!
     url = models.URLField(unique=True, max_length=500) 
+    # Same page, different spelling (utm_*, www., http, trailing slash) -> same key. See canonical.py
+    canonical_url = models.CharField(unique=True, max_length=500, editable=False)
     source = models.CharField(max_length=100, blank=True, null=True)
     
     # Trust Engine Data
-    trust_score = models.IntegerField()
+    trust_score = models.IntegerField(db_index=True)
     status = models.CharField(max_length=50)
     security_flags = models.JSONField(default=list)
     
     # Rich Extracted Data
-    deadline = models.CharField(max_length=50, blank=True, null=True)
+    deadline = models.DateField(blank=True, null=True, db_index=True) # None = not stated on the page
     info_paragraph = models.TextField()
+    eligibility = models.TextField(blank=True, default="")
     documents_required = models.JSONField(default=list)
     
+    # Near-duplicate detection (SimHash of title + summary, split into 4 indexed bands). See fingerprint.py
+    simhash = models.BigIntegerField(blank=True, null=True)
+    simhash_band0 = models.IntegerField(blank=True, null=True, db_index=True)
+    simhash_band1 = models.IntegerField(blank=True, null=True, db_index=True)
+    simhash_band2 = models.IntegerField(blank=True, null=True, db_index=True)
+    simhash_band3 = models.IntegerField(blank=True, null=True, db_index=True)
+
     # Tracking
     added_from = models.CharField(max_length=50, default="RSS") # e.g., "WhatsApp", "RSS", "Manual"
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True) # incremental exports (?since=)
+
+    class Meta:
+        indexes = [
+            # Admin title search is a case-insensitive prefix match (LIKE 'abc%'),
+            # which SQLite can only answer from an index with NOCASE collation.
+            models.Index(Collate('title', 'NOCASE'), name='scholarship_title_nocase'),
+        ]
 
     def __str__(self):
         return f"[{self.trust_score}] {self.title}"
+
+class ArchivedScholarship(models.Model):
+    # Cold storage for scholarships whose deadline has passed (see `manage.py archive_expired`).
+    # Plain copies of the VerifiedScholarship columns, so hot queries never touch them.
+    category_name = models.CharField(max_length=100)
+    title = models.CharField(max_length=255)
+    url = models.URLField(max_length=500)
+    canonical_url = models.CharField(unique=True, max_length=500)
+    source = models.CharField(max_length=100, blank=True, null=True)
+
+    trust_score = models.IntegerField()
+    status = models.CharField(max_length=50)
+    security_flags = models.JSONField(default=list)
+
+    deadline = models.DateField(blank=True, null=True)
+    info_paragraph = models.TextField()
+    eligibility = models.TextField(blank=True, default="")
+    documents_required = models.JSONField(default=list)
+
+    added_from = models.CharField(max_length=50)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"[archived {self.deadline}] {self.title}"
+
+class AlternateSource(models.Model):
+    # Syndicated copies of a stored scholarship (same story, another outlet).
+    # They are attached here instead of being unwrapped, scored and saved again.
+    scholarship = models.ForeignKey(VerifiedScholarship, on_delete=models.CASCADE, related_name='alternate_sources')
+    url = models.URLField(max_length=500)
+    title = models.CharField(max_length=255)
+    source = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('scholarship', 'url')
+
+    def __str__(self):
+        return f"{self.source}: {self.title}"
+
+class ScholarshipTag(models.Model):
+    # documents_required / security_flags as rows, so profile matching is an indexed
+    # set query instead of decoding every JSON list. Values are normalised (see tags.py).
+    KIND_CHOICES = [
+        ('document', 'Document required'),
+        ('flag', 'Security flag'),
+    ]
+
+    scholarship = models.ForeignKey(VerifiedScholarship, on_delete=models.CASCADE, related_name='tags')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('scholarship', 'kind', 'value')
+        indexes = [models.Index(fields=['kind', 'value'], name='scholarship_tag_kind_value')]
+
+    def __str__(self):
+        return f"{self.kind}: {self.value}"
+
+class ReminderSubscription(models.Model):
+    # A WhatsApp number that wants deadline reminders for one category ("SUBSCRIBE msbte")
+    phone = models.CharField(max_length=32) # E.164, without the "whatsapp:" prefix
+    category = models.ForeignKey(ScholarshipCategory, on_delete=models.CASCADE, related_name='subscriptions')
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('phone', 'category')
+
+    def __str__(self):
+        return f"{self.phone} -> {self.category}"
+
+class ReminderDelivery(models.Model):
+    # One reminder per subscriber and scholarship: the unique pair is the dedup key,
+    # claimed before sending so overlapping runs never message anyone twice.
+    STATUS_CHOICES = [
+        ('pending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subscription = models.ForeignKey(ReminderSubscription, on_delete=models.CASCADE, related_name='deliveries')
+    scholarship = models.ForeignKey(VerifiedScholarship, on_delete=models.CASCADE, related_name='reminder_deliveries')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    run_id = models.CharField(max_length=32, blank=True, default="") # which run claimed it
+    attempts = models.PositiveSmallIntegerField(default=0)
+    message_sid = models.CharField(max_length=64, blank=True, default="")
+    error = models.CharField(max_length=255, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('subscription', 'scholarship')
+
+    def __str__(self):
+        return f"[{self.status}] {self.subscription} / {self.scholarship_id}"
+
+class WebhookReceipt(models.Model):
+    # Idempotency record per Twilio MessageSid: Twilio retries slow webhooks, and a retry
+    # must get the reply we already computed instead of a second Gemini + Trust Engine run.
+    STATE_CHOICES = [
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+    ]
+
+    message_sid = models.CharField(max_length=64, unique=True)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='processing')
+    reply = models.TextField(blank=True, default="") # TwiML sent back to Twilio
+    lease_until = models.DateTimeField() # a crashed worker's "processing" row expires
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.message_sid} [{self.state}]"
+
+class LandingPageCache(models.Model):
+    # What we last read from the real scholarship page, plus the HTTP validators
+    # needed to re-check it with a conditional GET.
+    url = models.URLField(unique=True, max_length=500) # canonical form (canonical.py), not the link as found
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+
+    deadline = models.DateField(blank=True, null=True)
+    eligibility = models.TextField(blank=True, default="")
+    documents_required = models.JSONField(default=list)
+
+    fetched_at = models.DateTimeField() # Last full download + parse
+    checked_at = models.DateTimeField() # Last time the server was asked (200 or 304)
+
+    def __str__(self):
+        return self.url
+
+class SingleFlightLease(models.Model):
+    # "Someone is already scraping this category" marker shared by all gunicorn workers.
+    # The row is deleted when the scrape finishes; expires_at covers crashed workers.
+    key = models.CharField(max_length=200, unique=True)
+    owner = models.CharField(max_length=100)
+    acquired_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key} ({self.owner})"
+
+class UpstreamBudget(models.Model):
+    # Token bucket per upstream service (news.google.com, Gemini, ...), shared by all workers.
+    # Times are epoch seconds so the refill can be computed inside a single UPDATE.
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField()
+    capacity = models.FloatField()
+    refill_per_second = models.FloatField()
+    updated_at = models.FloatField()
+    backoff_until = models.FloatField(default=0) # set after a 429/503
+    backoff_seconds = models.FloatField(default=0)
+
+    def __str__(self):
+        return self.name
+
+class CircuitBreaker(models.Model):
+    # Health of one upstream (Gemini, Twilio, Google News, ...), shared by all workers.
+    # Counts cover the current window; times are epoch seconds like UpstreamBudget.
+    STATE_CHOICES = [
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half-open'),
+    ]
+
+    name = models.CharField(max_length=50, unique=True)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='closed')
+    window_started_at = models.FloatField(default=0)
+    calls = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    slow_calls = models.PositiveIntegerField(default=0)
+    retry_at = models.FloatField(default=0) # open: when to let a probe through; half-open: probe lease expiry
+    changed_at = models.FloatField(default=0)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+
+    def __str__(self):
+        return f"{self.name} [{self.state}]"
+
+class CrawlFrontier(models.Model):
+    # One page the portal crawler knows about (see crawler.py). next_fetch_at is both the
+    # schedule and the claim: a run pushes it forward before fetching, so pages a crashed
+    # run was holding simply come due again.
+    STATE_CHOICES = [
+        ('new', 'Not fetched yet'),
+        ('ok', 'Fetched'),
+        ('gone', 'Gone (404/410)'),
+        ('blocked', 'Disallowed by robots.txt'),
+        ('failed', 'Failing'),
+    ]
+
+    url = models.URLField(unique=True, max_length=500)
+    host = models.CharField(max_length=255)
+    seed = models.URLField(max_length=500) # portal (CRAWL_SEED_PORTALS) it was found under
+    depth = models.PositiveSmallIntegerField(default=0)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='new')
+
+    # Change detection: HTTP validators for conditional GETs + a hash of the body
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
+    is_scheme_page = models.BooleanField(default=False) # saved as a VerifiedScholarship
+    failures = models.PositiveSmallIntegerField(default=0)
+    next_fetch_at = models.DateTimeField()
+    last_fetched_at = models.DateTimeField(blank=True, null=True)
+    last_changed_at = models.DateTimeField(blank=True, null=True)
+    discovered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['seed', 'next_fetch_at'], name='crawl_frontier_due')]
+
+    def __str__(self):
+        return f"[{self.state}] {self.url}"
+
+class FeedState(models.Model):
+    # Incremental polling state for one RSS search feed (one per search intent)
+    feed_url = models.URLField(unique=True, max_length=500)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    poll_interval_seconds = models.PositiveIntegerField(default=900) # expected time between polls
+    last_polled_at = models.DateTimeField(blank=True, null=True)
+    next_poll_at = models.DateTimeField(blank=True, null=True)
+    last_status = models.PositiveSmallIntegerField(blank=True, null=True)
+
+    def __str__(self):
+        return self.feed_url
+
+class SeenFeedEntry(models.Model):
+    # GUIDs of feed entries already unwrapped/verified, so re-polls skip them
+    feed = models.ForeignKey(FeedState, on_delete=models.CASCADE, related_name='seen_entries')
+    guid = models.CharField(max_length=500)
+    seen_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('feed', 'guid')
+
+class FacetCount(models.Model):
+    # Running totals per facet value (category / added_from / status) for the facet API,
+    # kept in step with VerifiedScholarship writes instead of COUNT(*) ... GROUP BY per request
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('facet', 'value')
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
 class ScholarshipLead(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending Analysis'),
@@ -0,0 +1,256 @@
+# agent/providers.py
+import time
+import queue
+import importlib.util
+import threading
+import urllib.parse
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from . import breaker, metrics, ratelimit
+from .feeds import poll_feed
+from .te import search_with_duckduckgo
+
+SEARCH_PROVIDERS = getattr(settings, 'SEARCH_PROVIDERS', ['google_news_rss', 'ddgs'])
+HEDGE_DELAY = getattr(settings, 'SEARCH_HEDGE_DELAY_SECONDS', 1.0)
+SEARCH_TIMEOUT = getattr(settings, 'SEARCH_TIMEOUT_SECONDS', 15.0)
+DDGS_MAX_RESULTS = 20
+
+_DONE = object() # a provider ran dry
+
+
+# ==========================================
+#  PROVIDERS
+# ==========================================
+class SearchProvider:
+    """
+    One discovery backend. search() runs in a worker thread and yields candidate
+    dicts; it should check `stop` between items so a lost race ends early.
+    finish() runs afterwards in the same thread, once search() has returned or
+    been closed, even if hedged_search() itself has already returned.
+    """
+    name = None
+    breaker_name = None  # circuit breaker guarding the upstream (see breaker.py)
+    needs_unwrap = False # links are news.google.com redirects
+
+    def available(self):
+        return self.breaker_name is None or not breaker.is_open(self.breaker_name)
+
+    def search(self, query, stop):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+    def candidate(self, title, link, source, summary, mark_seen=None):
+        return {
+            'title': title,
+            'link': link,
+            'source': source,
+            'summary': summary,
+            'provider': self.name,
+            'needs_unwrap': self.needs_unwrap,
+            'mark_seen': mark_seen, # called once the entry is rejected, or saved by the caller
+        }
+
+
+class GoogleNewsRSS(SearchProvider):
+    name = 'google_news_rss'
+    breaker_name = 'google_news' # checked inside poll_feed
+    needs_unwrap = True
+
+    def __init__(self):
+        self.polls = []
+
+    def search(self, query, stop):
+        encoded_query = urllib.parse.quote(query)
+        rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-IN&gl=IN&ceid=IN:en"
+
+        # Incremental poll: conditional GET + only entries we have never processed
+        poll = poll_feed(rss_url)
+        self.polls.append(poll)
+        try:
+            for entry in poll.entries:
+                if stop.is_set():
+                    return
+                yield self.candidate(
+                    entry.title,
+                    entry.link,
+                    entry.source.title if hasattr(entry, 'source') else 'Web Search',
+                    entry.summary if hasattr(entry, 'summary') else '',
+                    mark_seen=lambda entry=entry, poll=poll: poll.mark_seen(entry),
+                )
+        finally:
+            poll.close() # quota filled: the rest of the feed is never downloaded or parsed
+
+    def finish(self):
+        for poll in self.polls:
+            poll.commit()
+
+
+class DuckDuckGo(SearchProvider):
+    name = 'ddgs'
+    breaker_name = 'ddgs'
+
+    def available(self):
+        # Optional dependency: without the `ddgs` package the provider sits out
+        return importlib.util.find_spec('ddgs') is not None and super().available()
+
+    def search(self, query, stop):
+        if not ratelimit.acquire('ddgs', on_limit=ratelimit.SKIP):
+            return
+        try:
+            with breaker.guard('ddgs'):
+                hits = search_with_duckduckgo(query, max_results=DDGS_MAX_RESULTS)
+        except breaker.CircuitOpen:
+            return
+        except Exception as e:
+            if 'ratelimit' in type(e).__name__.lower():
+                ratelimit.report_response('ddgs', 429, None)
+            print(f"⚠️ DuckDuckGo search failed: {e}")
+            return
+
+        for hit in hits:
+            if stop.is_set():
+                return
+            link = hit.get('href') or ''
+            if not link:
+                continue
+            yield self.candidate(
+                hit.get('title') or '',
+                link,
+                (urlparse(link).hostname or 'Web Search').removeprefix('www.'),
+                hit.get('body') or '',
+            )
+
+
+PROVIDERS = {
+    GoogleNewsRSS.name: GoogleNewsRSS,
+    DuckDuckGo.name: DuckDuckGo,
+}
+
+
+def _available_providers(provider_names=None):
+    providers = [PROVIDERS[name]() for name in (provider_names or SEARCH_PROVIDERS) if name in PROVIDERS]
+    return [provider for provider in providers if provider.available()]
+
+
+def live_search_available(provider_names=None):
+    """False when no search provider can be used (breakers open): serve from the DB instead."""
+    return bool(_available_providers(provider_names))
+
+
+# ==========================================
+#  HEDGED FAN-OUT
+# ==========================================
+def _put(results, item, stop):
+    """Blocks while the consumer is behind (bounded queue); gives up once the race is over."""
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _run_provider(provider, query, stop, results):
+    try:
+        candidates = provider.search(query, stop)
+        for candidate in candidates:
+            if not _put(results, candidate, stop):
+                break
+        candidates.close() # runs the provider's cleanup now, in this thread
+    except Exception as e:
+        print(f"⚠️ Search provider {provider.name} failed: {e}")
+        metrics.incr(f"search.{provider.name}.errors")
+    finally:
+        try:
+            # Here rather than in hedged_search: the consumer does not wait for
+            # stragglers, and only this thread knows when search() has stopped
+            provider.finish()
+        except Exception as e:
+            print(f"⚠️ Search provider {provider.name} could not save its state: {e}")
+        _put(results, (_DONE, provider.name), stop)
+        connection.close() # this thread's DB connection (feed state, rate limits)
+
+
+def hedged_search(query, want, accept, provider_names=None):
+    """
+    Fans `query` out to the search providers and feeds every candidate to
+    accept(candidate), which returns True when the caller kept it. Rejected
+    feed entries are marked seen here; for kept ones the caller must call
+    candidate['mark_seen']() (when set) after saving or discarding them.
+
+    The first provider starts immediately; the others are hedges, started after
+    SEARCH_HEDGE_DELAY_SECONDS (or as soon as an earlier provider runs dry).
+    Once `want` candidates are accepted the race is over: hedges that have not
+    started are never launched and running ones stop at their next item.
+    Returns the number of accepted candidates.
+    """
+    providers = _available_providers(provider_names)
+    if not providers:
+        metrics.incr("search.no_provider_available")
+        return 0
+
+    started = time.monotonic()
+    deadline = started + SEARCH_TIMEOUT
+    stop = threading.Event()
+    # Bounded: providers only run a few candidates ahead of accept(), so once
+    # the quota is filled they have not parsed (or downloaded) much more
+    results = queue.Queue(maxsize=max(want, 1))
+    waiting = list(providers)
+    running = 0
+    accepted = 0
+    pool = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix='search')
+
+    def launch():
+        nonlocal running
+        provider = waiting.pop(0)
+        pool.submit(_run_provider, provider, query, stop, results)
+        running += 1
+        return provider
+
+    try:
+        launch()
+        next_hedge_at = started + HEDGE_DELAY
+        while accepted < want and (running or waiting):
+            now = time.monotonic()
+            if now >= deadline:
+                metrics.incr("search.timeouts")
+                break
+            if waiting and (now >= next_hedge_at or not running):
+                provider = launch()
+                metrics.incr(f"search.{provider.name}.hedged")
+                next_hedge_at = now + HEDGE_DELAY
+                continue
+
+            timeout = deadline - now
+            if waiting:
+                timeout = min(timeout, max(0.0, next_hedge_at - now))
+            try:
+                item = results.get(timeout=timeout)
+            except queue.Empty:
+                continue
+
+            if isinstance(item, tuple) and item[0] is _DONE:
+                running -= 1
+                continue
+            if accept(item):
+                accepted += 1
+                metrics.incr(f"search.{item['provider']}.accepted")
+            elif item['mark_seen']:
+                # Deliberately rejected: never offer it again. Accepted entries are
+                # marked by the caller once they are saved (or fail verification).
+                item['mark_seen']()
+    finally:
+        # Quota filled (or timed out): stragglers stop at their next item
+        stop.set()
+        if waiting:
+            metrics.incr("search.hedges_not_launched", len(waiting))
+        pool.shutdown(wait=False, cancel_futures=True)
+        metrics.observe("search.latency", time.monotonic() - started)
+    return accepted
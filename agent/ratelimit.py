@@ -0,0 +1,196 @@
+# agent/ratelimit.py
+import time
+import threading
+
+from django.conf import settings
+
+from . import metrics
+from .models import UpstreamBudget
+
+# What a caller wants when an upstream is over budget
+WAIT = "wait"           # block until a token frees up (bounded by max_wait)
+SERVE_CACHED = "cached" # don't call, caller serves what it already has
+SKIP = "skip"           # don't call, caller continues without it
+
+# Tokens/second and bucket size per upstream. Override single values with
+# settings.UPSTREAM_RATE_LIMITS, e.g. {'gemini': {'rate': 1.0}}.
+DEFAULT_LIMITS = {
+    'google_news_rss': {'rate': 1.0, 'burst': 5},      # RSS search feeds
+    'google_news_redirect': {'rate': 3.0, 'burst': 10}, # article link unwrapping
+    'twilio_media': {'rate': 5.0, 'burst': 10},         # WhatsApp media downloads
+    'twilio_messages': {'rate': 10.0, 'burst': 10},     # outbound WhatsApp: the per-second send budget for reminders
+    'gemini': {'rate': 0.5, 'burst': 5},                # Gemini Vision calls
+    'ddgs': {'rate': 0.5, 'burst': 3},                  # DuckDuckGo text search
+}
+_configured = getattr(settings, 'UPSTREAM_RATE_LIMITS', {})
+LIMITS = {
+    name: {**DEFAULT_LIMITS.get(name, {}), **_configured.get(name, {})}
+    for name in {**DEFAULT_LIMITS, **_configured}
+}
+
+BACKOFF_BASE = getattr(settings, 'UPSTREAM_BACKOFF_BASE_SECONDS', 2.0)
+BACKOFF_MAX = getattr(settings, 'UPSTREAM_BACKOFF_MAX_SECONDS', 300.0)
+# A worker claims up to this many seconds' worth of refill per UPDATE and spends
+# it from memory; unspent tokens lapse after the same time (never handed back).
+TOKEN_LEASE_SECONDS = getattr(settings, 'UPSTREAM_TOKEN_LEASE_SECONDS', 1.0)
+THROTTLED_STATUSES = {429, 503}
+
+
+class _Lease:
+    """This worker's share of one upstream's bucket, plus what it last saw of the shared row."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.backoff_until = 0.0
+        self.backoff_seconds = 0.0
+
+
+# In-process half: one lease per upstream in this worker
+_leases = {}
+_leases_lock = threading.Lock()
+
+
+def _lease(name):
+    with _leases_lock:
+        return _leases.setdefault(name, _Lease())
+
+
+def _ensure_budget(name):
+    limit = LIMITS[name]
+    budget, _ = UpstreamBudget.objects.get_or_create(
+        name=name,
+        defaults={
+            'capacity': limit['burst'],
+            'tokens': limit['burst'],
+            'refill_per_second': limit['rate'],
+            'updated_at': time.time(),
+        }
+    )
+    # Settings changed since the bucket was created
+    if budget.capacity != limit['burst'] or budget.refill_per_second != limit['rate']:
+        budget.capacity, budget.refill_per_second = limit['burst'], limit['rate']
+        UpstreamBudget.objects.filter(pk=budget.pk).update(capacity=budget.capacity, refill_per_second=budget.refill_per_second)
+    return budget
+
+
+def _available(budget, now):
+    return min(budget.capacity, budget.tokens + (now - budget.updated_at) * budget.refill_per_second)
+
+
+def _claim(name, lease, now):
+    """
+    Moves a batch of tokens from the shared bucket into this worker's lease.
+    The row is read first (no lock under WAL) and written with a conditional
+    UPDATE, so there is one write per batch instead of one per call, and two
+    workers can never claim the same tokens. Returns seconds until a token frees up.
+    """
+    limit = LIMITS[name]
+    batch = max(1, int(limit['rate'] * TOKEN_LEASE_SECONDS))
+    for _ in range(3):
+        budget = _ensure_budget(name)
+        lease.backoff_until, lease.backoff_seconds = budget.backoff_until, budget.backoff_seconds
+        if budget.backoff_until > now:
+            return budget.backoff_until - now
+        available = _available(budget, now)
+        claim = min(batch, int(available))
+        if claim < 1:
+            return (1 - available) / budget.refill_per_second
+        claimed = (UpstreamBudget.objects
+                   .filter(pk=budget.pk, tokens=budget.tokens, updated_at=budget.updated_at, backoff_until=budget.backoff_until)
+                   .update(tokens=available - claim, updated_at=now))
+        if claimed:
+            lease.tokens, lease.expires_at = claim, now + TOKEN_LEASE_SECONDS
+            metrics.incr(f"ratelimit.{name}.claims")
+            return 0.0
+        # Another worker claimed in between: re-read and try again
+    return 0.05
+
+
+# ==========================================
+#  TOKEN BUCKET (shared by all gunicorn workers)
+# ==========================================
+def try_acquire(name):
+    """
+    Takes one token for the upstream. Returns (acquired, seconds_until_next_token).
+    Served from this worker's lease; the shared row is only written to claim a new batch.
+    """
+    lease = _lease(name)
+    with lease.lock:
+        now = time.time()
+        if lease.backoff_until > now:
+            return False, lease.backoff_until - now
+        if lease.tokens < 1 or lease.expires_at <= now:
+            lease.tokens = 0
+            wait = _claim(name, lease, now)
+            if lease.tokens < 1:
+                return False, wait
+        lease.tokens -= 1
+        return True, 0.0
+
+
+def acquire(name, on_limit=WAIT, max_wait=10.0):
+    """
+    Asks permission to call an upstream. Returns True if the call may go ahead.
+
+    With on_limit=WAIT it sleeps until a token is free (or max_wait runs out);
+    with SERVE_CACHED / SKIP it returns False straight away and the caller
+    decides what "cached" or "skip" means for it.
+    """
+    started = time.monotonic()
+    while True:
+        acquired, wait = try_acquire(name)
+        if acquired:
+            metrics.observe(f"ratelimit.{name}.queue_delay", time.monotonic() - started)
+            return True
+
+        waited = time.monotonic() - started
+        if on_limit != WAIT or waited + wait > max_wait:
+            metrics.incr(f"ratelimit.{name}.over_budget.{on_limit}")
+            return False
+        time.sleep(min(max(wait, 0.05), 1.0))
+
+
+def report_response(name, status_code, retry_after=None):
+    """
+    Feeds the upstream's answer back into its bucket: 429/503 empties the bucket
+    (this worker's lease too) and pauses it (Retry-After, or exponential backoff);
+    a success clears the backoff. Other workers see the pause at their next claim.
+    """
+    now = time.time()
+    lease = _lease(name)
+    if status_code in THROTTLED_STATUSES:
+        budget = _ensure_budget(name)
+        try:
+            hinted = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            hinted = 0.0
+        backoff = max(hinted, min(BACKOFF_MAX, max(BACKOFF_BASE, budget.backoff_seconds * 2)))
+        UpstreamBudget.objects.filter(name=name).update(
+            tokens=0, updated_at=now, backoff_until=now + backoff, backoff_seconds=backoff
+        )
+        with lease.lock:
+            lease.tokens = 0
+            lease.backoff_until, lease.backoff_seconds = now + backoff, backoff
+        metrics.incr(f"ratelimit.{name}.throttled")
+        print(f"⚠️ {name} throttled us (HTTP {status_code}), backing off {backoff:.0f}s")
+    elif status_code < 400 and lease.backoff_seconds > 0:
+        # Only written after a backoff: successes are the common case and must not take the write lock
+        UpstreamBudget.objects.filter(name=name, backoff_seconds__gt=0).update(backoff_seconds=0)
+        with lease.lock:
+            lease.backoff_seconds = 0.0
+
+
+def budget_snapshot():
+    now = time.time()
+    return [
+        {
+            "upstream": b.name,
+            "tokens": round(min(b.capacity, b.tokens + (now - b.updated_at) * b.refill_per_second), 2),
+            "capacity": b.capacity,
+            "refill_per_second": b.refill_per_second,
+            "backing_off_for": round(max(0.0, b.backoff_until - now), 1),
+        }
+        for b in UpstreamBudget.objects.order_by('name')
+    ]
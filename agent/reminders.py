@@ -0,0 +1,210 @@
+# agent/reminders.py
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from . import breaker, metrics, ratelimit
+from .models import ScholarshipCategory, VerifiedScholarship, ReminderSubscription, ReminderDelivery
+
+TWILIO_API_BASE = getattr(settings, 'TWILIO_API_BASE', 'https://api.twilio.com').rstrip('/')
+TWILIO_WHATSAPP_FROM = getattr(settings, 'TWILIO_WHATSAPP_FROM', '+14155238886')
+DAYS_BEFORE = getattr(settings, 'REMINDER_DAYS_BEFORE', 3)
+SEND_CONCURRENCY = getattr(settings, 'REMINDER_SEND_CONCURRENCY', 8)
+MAX_ATTEMPTS = getattr(settings, 'REMINDER_MAX_ATTEMPTS', 3)
+STALE_CLAIM = timedelta(hours=1) # a "pending" row older than this belongs to a crashed run
+CHUNK_SIZE = 500
+SEND_TIMEOUT = 10
+
+
+# ==========================================
+#  SUBSCRIPTIONS (WhatsApp "SUBSCRIBE msbte")
+# ==========================================
+def subscribe(phone, category_name):
+    category, _ = ScholarshipCategory.objects.get_or_create(name=category_name.lower().strip())
+    subscription, created = ReminderSubscription.objects.get_or_create(phone=phone, category=category)
+    if not created and not subscription.active:
+        ReminderSubscription.objects.filter(pk=subscription.pk).update(active=True)
+    return category.name
+
+
+def unsubscribe(phone, category_name):
+    """Returns how many subscriptions were switched off."""
+    return ReminderSubscription.objects.filter(
+        phone=phone, category__name=category_name.lower().strip(), active=True
+    ).update(active=False)
+
+
+# ==========================================
+#  DUE REMINDERS
+# ==========================================
+def due_reminders(today, horizon, run_id=None):
+    """
+    Every (subscriber, scholarship) pair that needs a reminder, in one query:
+    scholarships closing between today and the horizon (deadline index) joined to
+    the active subscriptions of their category, minus pairs already delivered
+    (or in flight, given up on, or already tried by this run).
+    """
+    stale = timezone.now() - STALE_CLAIM
+    handled = ReminderDelivery.objects.filter(
+        scholarship=OuterRef('pk'), subscription=OuterRef('subscription_id')
+    ).filter(
+        Q(status='sent') | Q(status='pending', updated_at__gte=stale) | Q(attempts__gte=MAX_ATTEMPTS) | Q(run_id=run_id or '-')
+    )
+    return (VerifiedScholarship.objects
+            .filter(deadline__range=(today, horizon), category__subscriptions__active=True)
+            .alias(subscription_id=F('category__subscriptions__id'))
+            .filter(~Exists(handled))
+            .order_by('deadline', 'pk')
+            .values_list('pk', 'title', 'url', 'deadline', 'category__name',
+                         'category__subscriptions__id', 'category__subscriptions__phone', named=True))
+
+
+def claim(rows, run_id):
+    """
+    Takes ownership of the pairs before anything is sent: new pairs are inserted,
+    failed / stale ones are re-claimed with a conditional UPDATE. Returns
+    {(subscription_id, scholarship_id): delivery_pk} for the pairs this run owns.
+    """
+    pairs = {(row.category__subscriptions__id, row.pk) for row in rows}
+    ReminderDelivery.objects.bulk_create(
+        [ReminderDelivery(subscription_id=sub, scholarship_id=sch, run_id=run_id) for sub, sch in pairs],
+        ignore_conflicts=True
+    )
+    existing = ReminderDelivery.objects.filter(
+        subscription_id__in={sub for sub, _ in pairs}, scholarship_id__in={sch for _, sch in pairs}
+    ).values_list('pk', 'subscription_id', 'scholarship_id', 'run_id', 'status', 'updated_at')
+
+    stale = timezone.now() - STALE_CLAIM
+    owned = {}
+    for pk, sub, sch, owner, status, updated_at in existing:
+        if (sub, sch) not in pairs:
+            continue
+        if owner == run_id and status == 'pending':
+            owned[(sub, sch)] = pk
+        elif status == 'failed' or (status == 'pending' and updated_at < stale):
+            retry = ReminderDelivery.objects.filter(pk=pk, run_id=owner, status=status)
+            if retry.update(status='pending', run_id=run_id, updated_at=timezone.now()):
+                owned[(sub, sch)] = pk
+    return owned
+
+
+def reminder_text(row, today):
+    days_left = (row.deadline - today).days
+    when = "today" if days_left == 0 else "tomorrow" if days_left == 1 else f"in {days_left} days"
+    return (f"⏰ *DEADLINE REMINDER*\n\n"
+            f"🎓 *{row.title}*\n"
+            f"📅 *Closes:* {row.deadline.strftime('%d %b %Y')} ({when})\n"
+            f"🔗 {row.url}\n\n"
+            f"_Reply UNSUBSCRIBE {row.category__name} to stop these reminders._")
+
+
+# ==========================================
+#  SENDER
+# ==========================================
+def send_whatsapp(session, api_base, phone, body):
+    """
+    One Twilio Messages API call (runs in a sender thread, no DB access).
+    Returns (ok, message_sid_or_error, status_code, retry_after, elapsed).
+    """
+    sid = os.getenv("TWILIO_ACCOUNT_SID", "")
+    url = f"{api_base}/2010-04-01/Accounts/{sid}/Messages.json"
+    payload = {'From': f"whatsapp:{TWILIO_WHATSAPP_FROM}", 'To': f"whatsapp:{phone}", 'Body': body}
+    started = time.monotonic()
+    try:
+        response = session.post(url, data=payload, auth=(sid, os.getenv("TWILIO_AUTH_TOKEN", "")), timeout=SEND_TIMEOUT)
+    except requests.RequestException as e:
+        return False, str(e), None, None, time.monotonic() - started
+    elapsed = time.monotonic() - started
+    if response.status_code in (200, 201):
+        return True, response.json().get('sid', ''), response.status_code, None, elapsed
+    return False, f"HTTP {response.status_code}: {response.text[:200]}", response.status_code, response.headers.get('Retry-After'), elapsed
+
+
+class ReminderRun:
+    """
+    Fans due reminders out over `concurrency` sender threads. Sends are paced by
+    the shared 'twilio_messages' token bucket (the per-second budget) and the run
+    stops early if the Twilio circuit breaker opens. All DB writes stay on the
+    calling thread; sender threads only talk HTTP.
+    """
+
+    def __init__(self, days_before=None, concurrency=None, api_base=None, log=print):
+        self.days_before = DAYS_BEFORE if days_before is None else days_before
+        self.concurrency = concurrency or SEND_CONCURRENCY
+        self.api_base = (api_base or TWILIO_API_BASE).rstrip('/')
+        self.log = log
+        self.run_id = uuid.uuid4().hex
+        self.today = timezone.localdate()
+        self.stats = Counter()
+        self.in_flight = {} # future -> ReminderDelivery pk
+
+    def due(self):
+        return due_reminders(self.today, self.today + timedelta(days=self.days_before), run_id=self.run_id)
+
+    def run(self):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='reminder') as pool:
+            while True:
+                # Re-querying is the cursor: claimed pairs drop out of due()
+                chunk = list(self.due()[:CHUNK_SIZE])
+                if not chunk or not self.send_chunk(chunk, pool, session):
+                    break
+            self.drain(0)
+        return self.stats
+
+    def send_chunk(self, chunk, pool, session):
+        """Returns False if the run had to stop early."""
+        owned = claim(chunk, self.run_id)
+        self.stats['skipped'] += len(chunk) - len(owned)
+        pending = [(row, owned[(row.category__subscriptions__id, row.pk)])
+                   for row in chunk if (row.category__subscriptions__id, row.pk) in owned]
+
+        for position, (row, delivery_pk) in enumerate(pending):
+            if not ratelimit.acquire('twilio_messages', on_limit=ratelimit.WAIT, max_wait=60) or not breaker.allow('twilio'):
+                # Give back what this run claimed but never sent: the next run picks it up
+                unsent = [pk for _, pk in pending[position:]]
+                ReminderDelivery.objects.filter(pk__in=unsent, status='pending').update(
+                    status='failed', error="Twilio unavailable (circuit open or over budget)"
+                )
+                self.stats['deferred'] += len(unsent)
+                self.log("⚠️ Stopping early: Twilio is over budget or its circuit breaker is open.")
+                return False
+            body = reminder_text(row, self.today)
+            future = pool.submit(send_whatsapp, session, self.api_base, row.category__subscriptions__phone, body)
+            self.in_flight[future] = delivery_pk
+            self.drain(self.concurrency * 2) # bounded look-ahead
+        return True
+
+    def drain(self, until):
+        while len(self.in_flight) > until:
+            done, _ = wait(self.in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                self.record(self.in_flight.pop(future), future.result())
+
+    def record(self, delivery_pk, result):
+        ok, detail, status_code, retry_after, elapsed = result
+        if status_code is not None:
+            ratelimit.report_response('twilio_messages', status_code, retry_after)
+        # Client errors (bad number, ...) say nothing about Twilio's health
+        healthy = ok or (status_code is not None and status_code < 500 and status_code not in ratelimit.THROTTLED_STATUSES)
+        breaker.record('twilio', healthy, elapsed, "" if healthy else detail)
+        metrics.observe("reminders.send_seconds", elapsed)
+
+        if ok:
+            ReminderDelivery.objects.filter(pk=delivery_pk).update(status='sent', message_sid=detail[:64], error="")
+            self.stats['sent'] += 1
+        else:
+            ReminderDelivery.objects.filter(pk=delivery_pk).update(status='failed', attempts=F('attempts') + 1, error=detail[:255])
+            self.stats['failed'] += 1
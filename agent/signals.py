@@ -0,0 +1,18 @@
+# agent/signals.py
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from . import facets
+from .models import ScholarshipCategory, VerifiedScholarship
+
+
+@receiver(pre_delete, sender=VerifiedScholarship)
+def remove_from_facet_counts(sender, instance, **kwargs):
+    # pre_delete (not post_delete): during a category cascade the category row
+    # still exists here. Runs inside the delete's transaction, so a rollback
+    # restores the counters too. QuerySet.delete() also sends this per row.
+    try:
+        category_name = instance.category.name
+    except ScholarshipCategory.DoesNotExist:
+        category_name = None
+    facets.apply_change(facets.facet_values(category_name, instance.added_from, instance.status), None)
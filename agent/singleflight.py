@@ -0,0 +1,126 @@
+# agent/singleflight.py
+import os
+import time
+import uuid
+import threading
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import SingleFlightLease
+
+LEADER = "leader"   # this call did the work
+JOINED = "joined"   # another thread/worker did the work and finished in time
+TIMEOUT = "timeout" # gave up waiting, caller falls back to what is in the DB
+
+POLL_INTERVAL = 0.25
+
+# In-process half: one entry per key currently being worked on in this worker
+_calls = {}
+_calls_lock = threading.Lock()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.status = TIMEOUT
+        self.result = None
+
+
+# ==========================================
+#  CROSS-PROCESS LEASE (shared SQLite row)
+# ==========================================
+def _acquire_lease(key, owner, lease_seconds):
+    now = timezone.now()
+    # A crashed worker's lease simply expires
+    SingleFlightLease.objects.filter(key=key, expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            SingleFlightLease.objects.create(key=key, owner=owner, expires_at=now + timedelta(seconds=lease_seconds))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _release_lease(key, owner):
+    SingleFlightLease.objects.filter(key=key, owner=owner).delete()
+
+
+def _renew_lease(key, owner, lease_seconds, stop):
+    """
+    Heartbeat thread: pushes expires_at forward every third of the lease while
+    the leader is still working, so a long scrape never loses its lease and a
+    crashed worker's lease still expires within lease_seconds.
+    """
+    try:
+        while not stop.wait(lease_seconds / 3):
+            renewed = (SingleFlightLease.objects
+                       .filter(key=key, owner=owner)
+                       .update(expires_at=timezone.now() + timedelta(seconds=lease_seconds)))
+            if not renewed:
+                return
+    finally:
+        connection.close() # this thread's own DB connection
+
+
+def _wait_for_lease(key, deadline):
+    while time.monotonic() < deadline:
+        if not SingleFlightLease.objects.filter(key=key, expires_at__gte=timezone.now()).exists():
+            return JOINED
+        time.sleep(POLL_INTERVAL)
+    return TIMEOUT
+
+
+# ==========================================
+#  PUBLIC API
+# ==========================================
+def single_flight(key, fn, timeout=20, lease_seconds=120):
+    """
+    Runs fn() at most once at a time per key, across threads AND gunicorn workers.
+    The leader's lease is renewed while fn() runs; lease_seconds only bounds
+    how long a crashed worker can block the key.
+
+    Returns (status, result):
+      LEADER  -> fn ran here, result is its return value
+      JOINED  -> someone else ran it; in-process waiters get the leader's result,
+                 waiters in other workers get None (the result is in the DB)
+      TIMEOUT -> still running elsewhere after `timeout` seconds; result is None
+    """
+    with _calls_lock:
+        call = _calls.get(key)
+        is_local_leader = call is None
+        if is_local_leader:
+            call = _calls[key] = _Call()
+
+    # Another thread in this worker is already on it: just wait for its result
+    if not is_local_leader:
+        if call.done.wait(timeout):
+            return (JOINED if call.status == LEADER else call.status), call.result
+        return TIMEOUT, None
+
+    deadline = time.monotonic() + timeout
+    owner = f"{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex[:8]}"
+    try:
+        if _acquire_lease(key, owner, lease_seconds):
+            stop_renewing = threading.Event()
+            heartbeat = threading.Thread(
+                target=_renew_lease, args=(key, owner, lease_seconds, stop_renewing),
+                name=f"lease-{key}", daemon=True,
+            )
+            heartbeat.start()
+            try:
+                call.result = fn()
+                call.status = LEADER
+            finally:
+                stop_renewing.set()
+                heartbeat.join()
+                _release_lease(key, owner)
+        else:
+            # Another worker process holds the lease
+            call.status = _wait_for_lease(key, deadline)
+        return call.status, call.result
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.done.set()
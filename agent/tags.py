@@ -0,0 +1,62 @@
+# agent/tags.py
+import re
+
+from .models import ScholarshipTag
+
+DOCUMENT = 'document'
+FLAG = 'flag'
+
+
+QUALIFIER = re.compile(r'\s*[(\[][^)\]]*[)\]]') # "(Below 2.5 LPA)", "[optional]"
+
+
+def normalize_tag(value):
+    """
+    Canonical key for a document or flag name, used for stored tags and query
+    parameters alike:
+      'Pushy Tone Detected: urgent, hurry'  -> 'pushy tone detected' (details after ':' vary per row)
+      'Income Certificate (Below 2.5 LPA)'  -> 'income certificate'  (qualifiers are dropped)
+      'Fee Receipt / Bonafide Certificate'  -> 'fee receipt/bonafide certificate'
+    """
+    name = QUALIFIER.sub('', str(value).split(':', 1)[0])
+    name = re.sub(r'\s*/\s*', '/', name)
+    return " ".join(name.split()).lower()[:100]
+
+
+def parse_tag_list(raw):
+    """Comma-separated query parameter -> set of normalised tag values."""
+    return {normalize_tag(part) for part in (raw or '').split(',') if part.strip()}
+
+
+def tag_values(documents, flags):
+    """The (kind, value) pairs a row with these JSON lists should carry."""
+    pairs = {(DOCUMENT, normalize_tag(doc)) for doc in documents or [] if normalize_tag(doc)}
+    pairs |= {(FLAG, normalize_tag(flag)) for flag in flags or [] if normalize_tag(flag)}
+    return pairs
+
+
+def sync_tags(scholarship_id, documents, flags, kinds=(DOCUMENT, FLAG)):
+    """Brings one scholarship's tag rows in line with its lists (only touches what changed)."""
+    wanted = {(kind, value) for kind, value in tag_values(documents, flags) if kind in kinds}
+    existing = set(
+        ScholarshipTag.objects.filter(scholarship_id=scholarship_id, kind__in=kinds).values_list('kind', 'value')
+    )
+    for kind, value in existing - wanted:
+        ScholarshipTag.objects.filter(scholarship_id=scholarship_id, kind=kind, value=value).delete()
+    ScholarshipTag.objects.bulk_create(
+        [ScholarshipTag(scholarship_id=scholarship_id, kind=kind, value=value) for kind, value in wanted - existing],
+        ignore_conflicts=True
+    )
+
+
+def replace_flag_tags(flags_by_scholarship):
+    """Bulk version for rescoring: {scholarship_id: security_flags} -> fresh flag tags."""
+    ScholarshipTag.objects.filter(scholarship_id__in=list(flags_by_scholarship), kind=FLAG).delete()
+    ScholarshipTag.objects.bulk_create(
+        [
+            ScholarshipTag(scholarship_id=pk, kind=kind, value=value)
+            for pk, flags in flags_by_scholarship.items()
+            for kind, value in tag_values([], flags)
+        ],
+        ignore_conflicts=True, batch_size=500
+    )
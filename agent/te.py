@@ -3,34 +3,33 @@ Free Scholarship Search - No API Key Required!
 Uses DuckDuckGo search (completely free)
 """
 
-def search_with_duckduckgo(query):
+def search_with_duckduckgo(query, max_results=10):
     """
     Search using DuckDuckGo (Free, No API Key Needed)
+    Returns a list of {'title', 'href', 'body'} dicts (used by agent/providers.py).
+    Raises ImportError when the `ddgs` package is not installed.
     """
+    from ddgs import DDGS
+
+    return list(DDGS().text(query, max_results=max_results) or [])
+
+def print_results(query, results):
+    print(f"\n{'='*70}")
+    print(f"Search Results for: '{query}'")
+    print(f"{'='*70}\n")
+
+    if results:
+        for i, result in enumerate(results, 1):
+            print(f"{i}. TITLE: {result.get('title', 'No title')}")
+            print(f"   URL: {result.get('href', 'No URL')}")
+            print(f"   DESCRIPTION: {result.get('body', 'No description')}")
+            print()
+    else:
+        print("No results found")
+
+def search_and_print(query):
     try:
-        from ddgs import DDGS
-        import time
-        
-        print(f"\n{'='*70}")
-        print(f"Search Results for: '{query}'")
-        print(f"{'='*70}\n")
-        
-        ddgs = DDGS()
-        results = []
-        
-        # Search and collect results
-        for result in ddgs.text(query, max_results=10):
-            results.append(result)
-        
-        if results:
-            for i, result in enumerate(results, 1):
-                print(f"{i}. TITLE: {result.get('title', 'No title')}")
-                print(f"   URL: {result.get('href', 'No URL')}")
-                print(f"   DESCRIPTION: {result.get('body', 'No description')}")
-                print()
-        else:
-            print("No results found")
-            
+        print_results(query, search_with_duckduckgo(query))
     except ImportError:
         print("❌ Installing required package...")
         import subprocess
@@ -62,7 +61,7 @@ def search_with_bing(query):
             
     except ImportError:
         print("Bing API not available, using DuckDuckGo instead...")
-        search_with_duckduckgo(query)
+        search_and_print(query)
 
 if __name__ == "__main__":
     print("="*70)
@@ -75,7 +74,7 @@ if __name__ == "__main__":
     print(f"\nSearching for: '{query}'")
     print("Using DuckDuckGo (Completely Free)...\n")
     
-    search_with_duckduckgo(query)
+    search_and_print(query)
     
     print("\n" + "="*70)
     print("Try these search terms:")
@@ -1,3 +0,0 @@
-from django.test import TestCase
-
-# Create your tests here
\ No newline at end of file
@@ -0,0 +1,48 @@
+# agent/tests/test_admin.py
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+
+from agent.admin import TrustScoreBucketFilter
+from agent.models import ScholarshipCategory, VerifiedScholarship
+
+
+class VerifiedScholarshipAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = ScholarshipCategory.objects.create(name='general')
+        for score, title, url in [
+            (100, "Post Matric Scholarship for SC Students", "https://scholarships.gov.in/post-matric"),
+            (80, "Pragati Scholarship for Girls", "https://www.aicte-india.org/pragati"),
+            (89, "Saksham Scholarship", "https://timesofindia.com/saksham"),
+            (45, "Merit Scholarship Update", "https://blog.example.com/merit"),
+            (10, "Urgent: claim your scholarship", "http://claim-now.example/"),
+        ]:
+            VerifiedScholarship.objects.create(
+                category=category, title=title, url=url, canonical_url=url.replace('www.', ''),
+                trust_score=score, status="", info_paragraph="",
+            )
+
+    def search(self, term):
+        model_admin = site._registry[VerifiedScholarship]
+        request = RequestFactory().get('/admin/agent/verifiedscholarship/', {'q': term})
+        results, _ = model_admin.get_search_results(request, VerifiedScholarship.objects.all(), term)
+        return sorted(results.values_list('trust_score', flat=True))
+
+    def test_link_finds_its_record_by_canonical_url(self):
+        self.assertEqual(self.search("http://www.aicte-india.org/pragati/?utm_source=x"), [80])
+
+    def test_title_prefix(self):
+        self.assertEqual(self.search("post matric"), [100])
+
+    def test_falls_back_to_substring_search(self):
+        self.assertEqual(self.search("Girls"), [80])
+        self.assertEqual(self.search("claim-now"), [10])
+        self.assertEqual(self.search("nothing like this"), [])
+
+    def test_trust_buckets_do_not_overlap(self):
+        seen = []
+        for key in TrustScoreBucketFilter.BUCKETS:
+            request = RequestFactory().get('/', {'trust_bucket': key})
+            bucket = TrustScoreBucketFilter(request, {'trust_bucket': [key]}, VerifiedScholarship, None)
+            seen += bucket.queryset(request, VerifiedScholarship.objects.all()).values_list('trust_score', flat=True)
+        self.assertEqual(sorted(seen), [10, 45, 80, 89, 100])
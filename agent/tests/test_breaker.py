@@ -0,0 +1,96 @@
+# agent/tests/test_breaker.py
+from unittest import mock
+
+from django.test import TestCase
+
+from agent import breaker
+from agent.models import CircuitBreaker
+
+NAME = 'gemini' # 5 calls minimum, 50% errors trips it, 30s cooldown, calls over 15s are slow
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.now = 1_000_000.0
+        clock = mock.patch.object(breaker, 'time', mock.Mock(time=lambda: self.now, monotonic=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.new_worker()
+
+    def new_worker(self):
+        """Forget the in-process views, as a separate gunicorn worker would start without them."""
+        breaker._views.clear()
+
+    def state(self):
+        return CircuitBreaker.objects.get(name=NAME).state
+
+    def trip(self):
+        for _ in range(5):
+            self.assertTrue(breaker.allow(NAME))
+            breaker.record(NAME, False, 0.1, "HTTP 500")
+
+    def test_healthy_calls_are_batched_in_memory(self):
+        for _ in range(3):
+            breaker.allow(NAME)
+            breaker.record(NAME, True, 0.1)
+        self.assertEqual(CircuitBreaker.objects.get(name=NAME).calls, 0)
+
+        self.now += breaker.SYNC_SECONDS
+        breaker.record(NAME, True, 0.1)
+        self.assertEqual(CircuitBreaker.objects.get(name=NAME).calls, 4)
+
+    def test_failures_trip_it_open(self):
+        self.trip()
+        row = CircuitBreaker.objects.get(name=NAME)
+        self.assertEqual((row.state, row.failures, row.last_error), (breaker.OPEN, 5, "HTTP 500"))
+        self.assertFalse(breaker.allow(NAME))
+        self.assertTrue(breaker.is_open(NAME))
+
+    def test_slow_calls_trip_it_open(self):
+        for _ in range(5):
+            breaker.allow(NAME)
+            breaker.record(NAME, True, 20.0)
+        self.assertEqual(self.state(), breaker.OPEN)
+
+    def test_a_few_failures_among_successes_keep_it_closed(self):
+        for ok in [True] * 8 + [False] * 2:
+            breaker.allow(NAME)
+            breaker.record(NAME, ok, 0.1)
+        self.assertEqual(self.state(), breaker.CLOSED)
+
+    def test_other_workers_see_it_open(self):
+        self.trip()
+        self.new_worker()
+        self.assertFalse(breaker.allow(NAME))
+
+    def test_one_probe_after_the_cooldown_closes_it(self):
+        self.trip()
+        self.now += 31
+        self.assertTrue(breaker.allow(NAME))
+        self.assertEqual(self.state(), breaker.HALF_OPEN)
+        self.assertFalse(breaker.allow(NAME)) # the probe is taken...
+
+        prober = dict(breaker._views)
+        self.new_worker()
+        self.assertFalse(breaker.allow(NAME)) # ...for every worker
+
+        breaker._views.update(prober)
+        breaker.record(NAME, True, 0.1)
+        row = CircuitBreaker.objects.get(name=NAME)
+        self.assertEqual((row.state, row.calls, row.failures), (breaker.CLOSED, 0, 0))
+        self.assertTrue(breaker.allow(NAME))
+
+    def test_a_failed_probe_reopens_it(self):
+        self.trip()
+        self.now += 31
+        self.assertTrue(breaker.allow(NAME))
+        breaker.record(NAME, False, 0.1, "timeout")
+        row = CircuitBreaker.objects.get(name=NAME)
+        self.assertEqual((row.state, row.retry_at, row.last_error), (breaker.OPEN, self.now + 30, "timeout"))
+        self.assertFalse(breaker.allow(NAME))
+
+    def test_guard_raises_while_open(self):
+        self.trip()
+        with self.assertRaises(breaker.CircuitOpen):
+            with breaker.guard(NAME):
+                self.fail("the upstream must not be called")
@@ -0,0 +1,32 @@
+# agent/tests/test_canonical.py
+from django.test import SimpleTestCase
+
+from agent.canonical import canonicalize_url
+
+
+class CanonicalizeUrlTests(SimpleTestCase):
+    def test_variants_of_one_page_share_a_key(self):
+        variants = [
+            "https://mahadbt.maharashtra.gov.in/scheme/",
+            "http://www.mahadbt.maharashtra.gov.in/scheme",
+            "https://MAHADBT.maharashtra.gov.in:443/scheme?utm_source=wa&utm_medium=share",
+            "https://mahadbt.maharashtra.gov.in//scheme/#apply",
+            "https://mahadbt.maharashtra.gov.in/scheme?fbclid=abc",
+        ]
+        self.assertEqual({canonicalize_url(url) for url in variants},
+                         {"https://mahadbt.maharashtra.gov.in/scheme"})
+
+    def test_meaningful_query_params_are_kept_and_sorted(self):
+        self.assertEqual(canonicalize_url("https://x.gov.in/apply?year=2026&id=7&gclid=z"),
+                         "https://x.gov.in/apply?id=7&year=2026")
+
+    def test_non_default_port_is_kept(self):
+        self.assertEqual(canonicalize_url("http://x.gov.in:8080/a/"), "https://x.gov.in:8080/a")
+
+    def test_malformed_port_falls_back_to_the_raw_url(self):
+        for url in ("https://x.gov.in:99999/", "https://x.gov.in:abc/apply"):
+            self.assertEqual(canonicalize_url(url), url)
+
+    def test_non_http_links_are_returned_unchanged(self):
+        self.assertEqual(canonicalize_url("  mailto:help@x.gov.in "), "mailto:help@x.gov.in")
+        self.assertEqual(canonicalize_url(None), "")
@@ -0,0 +1,73 @@
+# agent/tests/test_crawler.py
+import os
+import threading
+from datetime import timedelta
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TestCase
+from django.utils import timezone
+
+from agent.crawler import CrawlRun
+from agent.models import CrawlFrontier, VerifiedScholarship
+
+PORTAL_SITE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'portal_site')
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class PortalCrawlTests(TestCase):
+    """Crawls agent/fixtures/portal_site from a local server (see its README)."""
+
+    def setUp(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=PORTAL_SITE))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def crawl(self):
+        # The Trust Engine heavily penalises plain http, hence the lower score bar
+        run = CrawlRun(seeds=[{'url': f"{self.base}/", 'category': 'official portals'}],
+                       host_delay=0, min_trust_score=-100, log=lambda message: None)
+        return run.run()
+
+    def state(self, path):
+        return CrawlFrontier.objects.get(url=f"{self.base}{path}").state
+
+    def test_first_crawl(self):
+        stats = self.crawl()
+        self.assertEqual((stats['fetched'], stats['saved_new'], stats['blocked'], stats['gone']), (7, 3, 1, 1))
+        self.assertEqual(
+            set(VerifiedScholarship.objects.values_list('url', flat=True)),
+            {f"{self.base}/schemes/{page}.html" for page in ('post-matric', 'shahu-maharaj-merit', 'ebc-freeship')},
+        )
+        self.assertEqual(set(VerifiedScholarship.objects.values_list('added_from', flat=True)), {"Crawler"})
+
+    def test_robots_txt_is_obeyed(self):
+        self.crawl()
+        self.assertEqual(self.state('/private/admin.html'), 'blocked')
+        self.assertIsNone(CrawlFrontier.objects.get(url=f"{self.base}/private/admin.html").last_fetched_at)
+        # Links to other sites and to non-HTML files are never queued
+        self.assertFalse(CrawlFrontier.objects.filter(url__contains='elsewhere.example.org').exists())
+        self.assertFalse(CrawlFrontier.objects.filter(url__endswith='.pdf').exists())
+
+    def test_missing_pages_are_gone_for_a_week(self):
+        self.crawl()
+        gone = CrawlFrontier.objects.get(url=f"{self.base}/schemes/missing-scheme.html")
+        self.assertEqual(gone.state, 'gone')
+        self.assertGreater(gone.next_fetch_at, timezone.now() + timedelta(days=6))
+
+    def test_frontier_persists_between_runs(self):
+        self.crawl()
+        self.assertEqual(self.crawl()['fetched'], 0) # nothing is due yet
+
+        CrawlFrontier.objects.filter(state='ok').update(next_fetch_at=timezone.now())
+        stats = self.crawl()
+        # http.server honours If-Modified-Since: nothing is downloaded or saved again
+        self.assertEqual((stats['fetched'], stats['not_modified'], stats['changed']), (6, 6, 0))
+        self.assertEqual((stats['saved_new'], stats['saved_updated']), (0, 0))
+        self.assertEqual(VerifiedScholarship.objects.count(), 3)
@@ -0,0 +1,33 @@
+# agent/tests/test_dates.py
+from datetime import date, datetime
+
+from django.test import SimpleTestCase
+
+from agent.dates import coerce_deadline, parse_date_in_text
+
+
+class CoerceDeadlineTests(SimpleTestCase):
+    def test_written_formats(self):
+        for text in ["03 Nov 2026", "3rd November, 2026", "Nov 3, 2026", "November 3rd 2026",
+                     "2026-11-03", "03/11/2026", "03-11-2026", "03.11.2026"]:
+            with self.subTest(text=text):
+                self.assertEqual(coerce_deadline(text), date(2026, 11, 3))
+
+    def test_numeric_dates_are_day_first(self):
+        self.assertEqual(coerce_deadline("04/05/2026"), date(2026, 5, 4))
+
+    def test_dates_pass_through(self):
+        self.assertEqual(coerce_deadline(date(2026, 11, 3)), date(2026, 11, 3))
+        self.assertEqual(coerce_deadline(datetime(2026, 11, 3, 23, 59)), date(2026, 11, 3))
+
+    def test_missing_or_unparseable_is_none(self):
+        for value in [None, "", "Rolling", "31/02/2026", "Sept 2026"]:
+            with self.subTest(value=value):
+                self.assertIsNone(coerce_deadline(value))
+
+    def test_first_date_in_a_page_wins(self):
+        text = "Applications open 1 Sept 2026. Last date to apply: 15th October 2026."
+        self.assertEqual(parse_date_in_text(text), date(2026, 9, 1))
+
+    def test_an_impossible_date_does_not_hide_a_later_one(self):
+        self.assertEqual(parse_date_in_text("31/02/2026 (typo), corrected: 28/02/2026"), date(2026, 2, 28))
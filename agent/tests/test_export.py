@@ -0,0 +1,85 @@
+# agent/tests/test_export.py
+import io
+import csv
+import json
+import unittest
+import importlib.util
+from datetime import date, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from agent import export
+from agent.models import ScholarshipCategory, VerifiedScholarship
+
+TOKEN = "test-export-token"
+
+
+@override_settings(EXPORT_API_TOKENS=[TOKEN])
+class ExportApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = ScholarshipCategory.objects.create(name='engineering')
+        for n in range(5):
+            VerifiedScholarship.objects.create(
+                category=category, title=f"Scholarship {n}", url=f"https://a.gov.in/{n}",
+                canonical_url=f"https://a.gov.in/{n}", trust_score=80 + n, status="Verified", info_paragraph="",
+                documents_required=["Aadhaar Card", "Income Certificate"], deadline=date(2026, 11, n + 1),
+            )
+
+    def get(self, token=TOKEN, **params):
+        headers = {'Authorization': f"Bearer {token}"} if token else {}
+        return self.client.get('/api/export/', params, headers=headers)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_requires_a_valid_token(self):
+        self.assertEqual(self.get(token=None).status_code, 401)
+        response = self.get(token="wrong")
+        self.assertEqual((response.status_code, response['WWW-Authenticate']), (401, 'Bearer'))
+        with override_settings(EXPORT_API_TOKENS=[]):
+            self.assertEqual(self.get().status_code, 404)
+
+    def test_ndjson(self):
+        response = self.get()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.body(response).decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f"Scholarship {n}" for n in range(5)])
+        self.assertEqual((rows[0]['category'], rows[0]['deadline']), ('engineering', '2026-11-01'))
+        self.assertEqual(rows[0]['documents_required'], ["Aadhaar Card", "Income Certificate"])
+
+    def test_csv(self):
+        response = self.get(format='csv')
+        self.assertIn('scholarships.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(self.body(response).decode())))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(json.loads(rows[4]['documents_required']), ["Aadhaar Card", "Income Certificate"])
+        self.assertEqual(rows[4]['trust_score'], '84')
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "Parquet export needs pyarrow")
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        table = pq.read_table(io.BytesIO(self.body(self.get(format='parquet'))))
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column('deadline').to_pylist()[0], date(2026, 11, 1))
+
+    def test_since_returns_only_changed_rows(self):
+        first = self.get()
+        self.body(first)
+        VerifiedScholarship.objects.filter(title="Scholarship 3").update(trust_score=99, updated_at=timezone.now())
+
+        rows = self.body(self.get(since=first['X-Export-High-Water-Mark'])).decode().splitlines()
+        self.assertEqual([json.loads(row)['trust_score'] for row in rows], [99])
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        self.assertEqual(self.body(self.get(since=tomorrow)), b"")
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.get(format='xlsx').status_code, 400)
+        self.assertEqual(self.get(since='last week').status_code, 400)
+
+    def test_chunks_walk_the_table_by_primary_key(self):
+        chunks = list(export.iter_chunks(chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        ids = [row['id'] for chunk in chunks for row in chunk]
+        self.assertEqual(ids, sorted(ids))
@@ -0,0 +1,51 @@
+# agent/tests/test_facets.py
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+
+from agent import facets
+from agent.models import ScholarshipCategory, VerifiedScholarship
+from agent.utils import save_scholarship_to_db
+
+
+def scholarship(url, status="Verified", **extra):
+    return {'url': url, 'title': "Scholarship", 'trust_score': 80, 'status': status, **extra}
+
+
+class FacetCountTests(TestCase):
+    def assertCountsMatchTable(self):
+        self.assertEqual(facets.current_facets(), facets.recount_facets())
+
+    def test_upserts_and_deletes_move_the_counters(self):
+        save_scholarship_to_db('Engineering', scholarship("https://a.gov.in/1"), "RSS_API")
+        save_scholarship_to_db('engineering', scholarship("https://a.gov.in/2", "Caution"), "Crawler")
+        save_scholarship_to_db('medical', scholarship("https://www.a.gov.in/2/", "High Trust"), "Crawler")
+        self.assertEqual(facets.current_facets(), {
+            'category': {'engineering': 1, 'medical': 1},
+            'added_from': {'RSS_API': 1, 'Crawler': 1},
+            'status': {'Verified': 1, 'High Trust': 1},
+        })
+
+        VerifiedScholarship.objects.filter(category__name='medical').delete()
+        ScholarshipCategory.objects.get(name='engineering').delete() # cascade
+        self.assertEqual(facets.current_facets(), {'category': {}, 'added_from': {}, 'status': {}})
+
+    def test_admin_edits_move_the_counters(self):
+        save_scholarship_to_db('engineering', scholarship("https://a.gov.in/1"), "RSS_API")
+        request = RequestFactory().post('/admin/')
+        row = VerifiedScholarship.objects.get()
+        row.status = "Official"
+        row.category = ScholarshipCategory.objects.create(name='medical')
+        site._registry[VerifiedScholarship].save_model(request, row, None, change=True)
+        self.assertCountsMatchTable()
+
+        category = row.category
+        category.name = 'medicine'
+        site._registry[ScholarshipCategory].save_model(request, category, None, change=True)
+        self.assertCountsMatchTable()
+        self.assertEqual(facets.current_facets()['category'], {'medicine': 1})
+
+    def test_api_reads_the_counters(self):
+        save_scholarship_to_db('engineering', scholarship("https://a.gov.in/1"), "RSS_API")
+        response = self.client.get('/api/facets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['facets']['category'], {'engineering': 1})
@@ -0,0 +1,71 @@
+# agent/tests/test_feeds.py
+import io
+import os
+
+from django.test import SimpleTestCase
+
+from agent.feeds import entry_guid, iter_feed_entries
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'feeds',
+                       'synthetic_google_news_scholarship.xml')
+
+ITEM = """<item><title> NSP 2026 last date extended - Times of India </title>
+<link>https://news.google.com/rss/articles/CBMiABC?oc=5</link>
+<guid isPermaLink="false">CBMiABC</guid><pubDate>Sun, 18 Oct 2026 12:00:00 GMT</pubDate>
+<description>&lt;a href="https://news.google.com/rss/articles/CBMiABC"&gt;NSP&lt;/a&gt;</description>
+<source url="https://timesofindia.indiatimes.com">Times of India</source></item>"""
+
+
+def feed(*items, prolog=""):
+    return io.BytesIO(f'<?xml version="1.0"?>{prolog}<rss version="2.0"><channel>{"".join(items)}</channel></rss>'.encode())
+
+
+class CountingStream(io.BytesIO):
+    """Records how far the parser has read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.consumed += len(data)
+        return data
+
+
+class IterFeedEntriesTests(SimpleTestCase):
+    def test_entry_fields(self):
+        [entry] = iter_feed_entries(feed(ITEM))
+        self.assertEqual(entry.title, "NSP 2026 last date extended - Times of India")
+        self.assertEqual(entry.link, "https://news.google.com/rss/articles/CBMiABC?oc=5")
+        self.assertEqual(entry_guid(entry), "CBMiABC")
+        self.assertEqual(entry.published, "Sun, 18 Oct 2026 12:00:00 GMT")
+        self.assertEqual(entry.summary, '<a href="https://news.google.com/rss/articles/CBMiABC">NSP</a>')
+        self.assertEqual((entry.source.title, entry.source.href), ("Times of India", "https://timesofindia.indiatimes.com"))
+
+    def test_missing_elements(self):
+        [entry] = iter_feed_entries(feed("<item><link>https://example.org/a</link></item>"))
+        self.assertEqual((entry.title, entry.summary, entry.id), ("", "", ""))
+        self.assertNotIn('source', entry)
+        self.assertEqual(entry_guid(entry), "https://example.org/a") # falls back to the link
+
+    def test_whole_fixture(self):
+        with open(FIXTURE, 'rb') as f:
+            entries = list(iter_feed_entries(f))
+        self.assertEqual(len(entries), 100)
+        self.assertEqual(len({entry_guid(entry) for entry in entries}), 100)
+        self.assertTrue(all(entry.link.startswith("https://news.google.com/") for entry in entries))
+
+    def test_stops_reading_when_the_caller_stops(self):
+        with open(FIXTURE, 'rb') as f:
+            stream = CountingStream(f.read())
+        entries = iter_feed_entries(stream)
+        first = next(entries)
+        self.assertTrue(first.title)
+        self.assertLess(stream.consumed, len(stream.getvalue()) / 2)
+
+    def test_external_entities_are_not_resolved(self):
+        prolog = '<!DOCTYPE rss [<!ENTITY secret SYSTEM "file:///etc/passwd">]>'
+        item = "<item><title>&secret;</title><link>https://example.org/</link></item>"
+        entries = list(iter_feed_entries(feed(item, prolog=prolog)))
+        self.assertNotIn("root:", entries[0].title)
@@ -0,0 +1,84 @@
+# agent/tests/test_fingerprint.py
+from django.test import SimpleTestCase, TestCase
+
+from agent.fingerprint import (
+    BAND_COUNT, NearDuplicateIndex, fingerprint_fields, hamming_distance, is_near_duplicate,
+    simhash, split_bands, to_signed, to_unsigned,
+)
+from agent.models import ScholarshipCategory, VerifiedScholarship
+from agent.utils import find_stored_near_duplicate
+
+TITLE = "NSP Post Matric Scholarship 2026 for SC students opens, apply by 31 October"
+
+
+class SimHashTests(SimpleTestCase):
+    def test_syndicated_copies_hash_the_same(self):
+        copies = [
+            f"{TITLE} - Times of India",
+            f"{TITLE} | NDTV Education",
+            TITLE.upper() + "!",
+        ]
+        self.assertEqual({simhash(title) for title in copies}, {simhash(TITLE)})
+
+    def test_echoed_summary_is_ignored(self):
+        summary = f'<a href="https://news.google.com/x">{TITLE}</a>&nbsp;<font>Times of India</font>'
+        self.assertEqual(simhash(TITLE, summary), simhash(TITLE))
+
+    def test_different_stories_are_far_apart(self):
+        other = simhash("Maharashtra MahaDBT portal adds girls' hostel allowance for 2026")
+        self.assertFalse(is_near_duplicate(simhash(TITLE), other))
+
+    def test_empty_text_has_no_fingerprint(self):
+        self.assertIsNone(simhash("The latest news - Publisher"))
+        self.assertFalse(is_near_duplicate(None, None))
+        self.assertEqual(set(fingerprint_fields(None).values()), {None})
+
+    def test_bands_recompose_the_value(self):
+        value = simhash(TITLE)
+        bands = split_bands(value)
+        self.assertEqual(len(bands), BAND_COUNT)
+        self.assertEqual(sum(band << (16 * i) for i, band in enumerate(bands)), value)
+
+    def test_signed_storage_round_trips(self):
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            self.assertEqual(to_unsigned(to_signed(value)), value)
+            self.assertGreaterEqual(to_signed(value), -(1 << 63))
+            self.assertLess(to_signed(value), 1 << 63)
+
+    def test_near_duplicates_within_three_bits_share_a_band(self):
+        value = simhash(TITLE)
+        # Worst case: each flipped bit lands in a different band, leaving one band intact
+        flipped = value ^ (1 << 0) ^ (1 << 16) ^ (1 << 32)
+        self.assertEqual(hamming_distance(value, flipped), 3)
+        self.assertTrue(is_near_duplicate(value, flipped))
+        self.assertTrue(any(a == b for a, b in zip(split_bands(value), split_bands(flipped))))
+        self.assertFalse(is_near_duplicate(value, flipped ^ (1 << 48)))
+
+
+class NearDuplicateIndexTests(SimpleTestCase):
+    def test_finds_near_copies_only(self):
+        value = simhash(TITLE)
+        index = NearDuplicateIndex()
+        index.add(value, 'first')
+        index.add(None, 'ignored')
+
+        self.assertEqual(index.find(value ^ 0b101), 'first')
+        self.assertIsNone(index.find(value ^ 0b1111))
+        self.assertIsNone(index.find(None))
+
+
+class StoredNearDuplicateTests(TestCase):
+    def setUp(self):
+        category = ScholarshipCategory.objects.create(name='sc/st')
+        self.stored = VerifiedScholarship.objects.create(
+            category=category, title=TITLE, url="https://scholarships.gov.in/post-matric",
+            canonical_url="https://scholarships.gov.in/post-matric", trust_score=90, status="Official",
+            info_paragraph="", **fingerprint_fields(simhash(TITLE)),
+        )
+
+    def test_matches_through_the_band_index(self):
+        found = find_stored_near_duplicate(simhash(f"{TITLE} - Hindustan Times") ^ 0b11, " SC/ST ")
+        self.assertEqual(found, self.stored)
+
+    def test_other_categories_are_not_searched(self):
+        self.assertIsNone(find_stored_near_duplicate(simhash(TITLE), 'obc'))
@@ -0,0 +1,79 @@
+# agent/tests/test_gnews.py
+import io
+import json
+import base64
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from agent.gnews import article_id, decode_article_url, is_opaque_article
+from agent.management.commands.check_gnews_decoder import DEFAULT_CORPUS
+
+
+def varint(n):
+    out = bytearray()
+    while True:
+        byte, n = n & 0x7F, n >> 7
+        out.append(byte | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def google_link(*strings, path="/rss/articles/"):
+    """A classic article ID: field 1 = 19, then one length-delimited field per string."""
+    payload = b'\x08\x13' + b''.join(b'\x22' + varint(len(s)) + s for s in (s.encode() for s in strings)) + b'\xd2\x01\x00'
+    return f"https://news.google.com{path}{base64.urlsafe_b64encode(payload).decode().rstrip('=')}?oc=5"
+
+
+class DecodeArticleUrlTests(SimpleTestCase):
+    def test_classic_ids_decode_offline(self):
+        url = "https://www.jagranjosh.com/education/news/mahadbt-scholarship-2026-1810111"
+        self.assertEqual(decode_article_url(google_link(url)), url)
+        self.assertEqual(decode_article_url(google_link(url, path="/articles/")), url)
+        self.assertEqual(decode_article_url(google_link(url, path="/read/")), url)
+
+    def test_amp_url_that_follows_is_ignored(self):
+        url = "https://indianexpress.com/article/education/ebc-fee-reimbursement/"
+        self.assertEqual(decode_article_url(google_link(url, url.replace('/article/', '/article/amp/'))), url)
+
+    def test_long_urls_use_multi_byte_lengths(self):
+        url = "https://www.hindustantimes.com/education/" + "a" * 300
+        self.assertEqual(decode_article_url(google_link(url)), url)
+
+    def test_opaque_ids_need_the_network(self):
+        link = google_link("AU_yqLNq0gH3kOa7xQp2cV9sZtR1mWbE4yJd")
+        self.assertIsNone(decode_article_url(link))
+        self.assertTrue(is_opaque_article(link))
+        self.assertFalse(is_opaque_article(google_link("https://example.org/")))
+
+    def test_unreadable_ids(self):
+        for link in [
+            "https://news.google.com/rss/articles/CBMi_wFodHRwczovL3RydW5j?oc=5", # length past the end
+            "https://news.google.com/rss/articles/bm90IGEgcHJvdG9idWYgYXQgYWxs",  # not a protobuf
+            "https://news.google.com/rss/articles/%%%invalid%%%",
+            google_link("not a url"),
+            google_link("javascript:alert(1)"),
+        ]:
+            with self.subTest(link=link):
+                self.assertIsNone(decode_article_url(link))
+                self.assertFalse(is_opaque_article(link))
+
+    def test_only_google_news_article_links_have_an_id(self):
+        self.assertEqual(article_id("https://news.google.com/rss/articles/CBMiABC?oc=5"), "CBMiABC")
+        self.assertIsNone(article_id("https://news.google.com/search?q=scholarship"))
+        self.assertIsNone(article_id("https://evil.example/rss/articles/CBMiABC"))
+        self.assertIsNone(article_id("http://[broken"))
+        self.assertIsNone(decode_article_url("https://timesofindia.indiatimes.com/education/"))
+
+    def test_synthetic_corpus(self):
+        with open(DEFAULT_CORPUS) as f:
+            corpus = json.load(f)
+        self.assertTrue(corpus['synthetic'])
+        for case in corpus['cases']:
+            with self.subTest(kind=case['kind'], link=case['link']):
+                self.assertEqual(decode_article_url(case['link']), case['expected'])
+
+    def test_check_command_passes_on_the_shipped_corpus(self):
+        out = io.StringIO()
+        call_command('check_gnews_decoder', stdout=out)
+        self.assertIn("Every link with a known target decoded as expected.", out.getvalue())
@@ -0,0 +1,77 @@
+# agent/tests/test_ratelimit.py
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from agent import ratelimit
+from agent.models import UpstreamBudget
+
+NAME = 'twilio_messages' # 10 tokens/second, bucket of 10
+
+
+def updates(queries):
+    return [q for q in queries if q['sql'].startswith('UPDATE')]
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        self.now = 1_000_000.0
+        clock = mock.patch.object(ratelimit, 'time', mock.Mock(time=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.new_worker()
+
+    def new_worker(self):
+        """Forget the in-process leases, as a separate gunicorn worker would start without them."""
+        ratelimit._leases.clear()
+
+    def test_a_batch_of_tokens_costs_one_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = [ratelimit.try_acquire(NAME) for _ in range(10)]
+        self.assertEqual(results, [(True, 0.0)] * 10)
+        self.assertEqual(len(updates(queries)), 1)
+
+        acquired, wait = ratelimit.try_acquire(NAME)
+        self.assertFalse(acquired)
+        self.assertAlmostEqual(wait, 0.1)
+
+    def test_workers_share_one_bucket(self):
+        for _ in range(10):
+            ratelimit.try_acquire(NAME)
+        self.new_worker()
+        self.assertFalse(ratelimit.try_acquire(NAME)[0])
+
+        self.now += 0.5 # five tokens refilled
+        self.assertEqual([ratelimit.try_acquire(NAME)[0] for _ in range(6)], [True] * 5 + [False])
+
+    def test_unspent_tokens_lapse_with_the_lease(self):
+        self.assertTrue(ratelimit.try_acquire(NAME)[0]) # claims 10, spends 1
+        self.now += ratelimit.TOKEN_LEASE_SECONDS + 0.01
+        self.new_worker()
+        # The other 9 are gone for everyone; only the refill since the claim is left
+        self.assertEqual(sum(ratelimit.try_acquire(NAME)[0] for _ in range(20)), 10)
+
+    def test_throttling_pauses_every_worker_until_retry_after(self):
+        ratelimit.try_acquire(NAME)
+        ratelimit.report_response(NAME, 429, retry_after='30')
+        self.assertEqual(ratelimit.try_acquire(NAME), (False, 30.0))
+        self.new_worker()
+        self.assertEqual(ratelimit.try_acquire(NAME), (False, 30.0))
+
+        self.now += 31
+        self.assertTrue(ratelimit.try_acquire(NAME)[0])
+        ratelimit.report_response(NAME, 200)
+        self.assertEqual(UpstreamBudget.objects.get(name=NAME).backoff_seconds, 0)
+
+    def test_repeated_throttling_backs_off_exponentially(self):
+        ratelimit.report_response(NAME, 503)
+        ratelimit.report_response(NAME, 503)
+        self.assertEqual(UpstreamBudget.objects.get(name=NAME).backoff_seconds, ratelimit.BACKOFF_BASE * 2)
+
+    def test_successes_without_a_backoff_do_not_write(self):
+        ratelimit.try_acquire(NAME)
+        with CaptureQueriesContext(connection) as queries:
+            ratelimit.report_response(NAME, 200)
+        self.assertEqual(updates(queries), [])
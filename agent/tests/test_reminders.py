@@ -0,0 +1,67 @@
+# agent/tests/test_reminders.py
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from agent import breaker, ratelimit
+from agent.management.commands.fake_twilio import fake_twilio_server
+from agent.models import ReminderDelivery, ScholarshipCategory, VerifiedScholarship
+from agent.reminders import ReminderRun, subscribe, unsubscribe
+
+SUBSCRIBERS = ['+919800000001', '+919800000002', '+919800000003']
+
+
+class ReminderRunTests(TestCase):
+    def setUp(self):
+        ratelimit._leases.clear()
+        breaker._views.clear()
+        today = timezone.localdate()
+        category = ScholarshipCategory.objects.create(name='msbte')
+        for n, days_left in enumerate([1, 30]): # only the first closes within REMINDER_DAYS_BEFORE
+            VerifiedScholarship.objects.create(
+                category=category, title=f"MSBTE Scholarship {n}", url=f"https://msbte.org.in/{n}",
+                canonical_url=f"https://msbte.org.in/{n}", trust_score=90, status="Verified",
+                info_paragraph="", deadline=today + timedelta(days=days_left),
+            )
+        for phone in SUBSCRIBERS:
+            subscribe(phone, 'MSBTE')
+        subscribe('+919800000009', 'medical')  # other category
+        subscribe('+919800000010', 'msbte')
+        unsubscribe('+919800000010', 'msbte')  # switched off
+
+    def start_twilio(self, **options):
+        server = fake_twilio_server(port=0, latency=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    def run_reminders(self, api_base):
+        return ReminderRun(days_before=3, concurrency=4, api_base=api_base, log=lambda message: None).run()
+
+    def test_each_subscriber_gets_exactly_one_reminder_across_runs(self):
+        twilio, api_base = self.start_twilio()
+        self.assertEqual(self.run_reminders(api_base)['sent'], 3)
+        self.assertEqual(self.run_reminders(api_base)['sent'], 0)
+
+        self.assertEqual(Counter(message['to'] for message in twilio.received),
+                         {f"whatsapp:{phone}": 1 for phone in SUBSCRIBERS})
+        self.assertIn("MSBTE Scholarship 0", twilio.received[0]['body'])
+        self.assertIn("(tomorrow)", twilio.received[0]['body'])
+        self.assertEqual(set(ReminderDelivery.objects.values_list('status', flat=True)), {'sent'})
+        self.assertEqual(set(ReminderDelivery.objects.values_list('message_sid', flat=True)),
+                         {message['sid'] for message in twilio.received})
+
+    def test_failed_sends_are_retried_by_the_next_run(self):
+        _, failing = self.start_twilio(fail_rate=1.0)
+        stats = self.run_reminders(failing)
+        self.assertEqual((stats['sent'], stats['failed']), (0, 3))
+
+        twilio, api_base = self.start_twilio()
+        self.assertEqual(self.run_reminders(api_base)['sent'], 3)
+        self.assertEqual(self.run_reminders(api_base)['sent'], 0)
+        self.assertEqual(len(twilio.received), 3)
+        self.assertEqual(set(ReminderDelivery.objects.values_list('status', 'attempts')), {('sent', 1)})
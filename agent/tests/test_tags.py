@@ -0,0 +1,70 @@
+# agent/tests/test_tags.py
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from agent.models import ScholarshipTag, VerifiedScholarship
+from agent.tags import DOCUMENT, FLAG, normalize_tag, parse_tag_list, tag_values
+from agent.utils import save_scholarship_to_db
+from agent.views import filter_by_tags
+
+
+class NormalizeTagTests(SimpleTestCase):
+    def test_canonical_keys(self):
+        for raw, key in [
+            ("Pushy Tone Detected: urgent, hurry", "pushy tone detected"),
+            ("Income Certificate (Below 2.5 LPA)", "income certificate"),
+            ("Aadhaar Card [mandatory]", "aadhaar card"),
+            ("Fee Receipt / Bonafide  Certificate", "fee receipt/bonafide certificate"),
+            ("  CASTE certificate ", "caste certificate"),
+        ]:
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_tag(raw), key)
+
+    def test_tag_values(self):
+        documents = ["Income Certificate (Below 2.5 LPA)", "income certificate", "", "Aadhaar Card"]
+        flags = ["Pushy Tone Detected: urgent", "Pushy Tone Detected: hurry", "Insecure Connection (No SSL)"]
+        self.assertEqual(tag_values(documents, flags), {
+            (DOCUMENT, "income certificate"), (DOCUMENT, "aadhaar card"),
+            (FLAG, "pushy tone detected"), (FLAG, "insecure connection"),
+        })
+        self.assertEqual(tag_values(None, None), set())
+
+    def test_query_parameters_use_the_same_keys(self):
+        self.assertEqual(parse_tag_list("Aadhaar Card, income certificate (below 1 LPA),,"),
+                         {"aadhaar card", "income certificate"})
+        self.assertEqual(parse_tag_list(None), set())
+
+
+class ScholarshipTagTests(TestCase):
+    def save(self, url, documents, flags=()):
+        save_scholarship_to_db('general', {
+            'url': url, 'title': "Scholarship", 'trust_score': 80, 'status': "Verified",
+            'documents_required': documents, 'security_flags': list(flags),
+        }, "RSS_API")
+        return VerifiedScholarship.objects.get(url=url)
+
+    def tags(self, row):
+        return set(ScholarshipTag.objects.filter(scholarship=row).values_list('kind', 'value'))
+
+    def test_upserts_keep_tags_in_line(self):
+        row = self.save("https://a.gov.in/1", ["Aadhaar Card", "Income Certificate (Below 2.5 LPA)"])
+        row = self.save("https://a.gov.in/1", ["Aadhaar Card"], ["Insecure Connection (No SSL)"])
+        self.assertEqual(self.tags(row), {(DOCUMENT, "aadhaar card"), (FLAG, "insecure connection")})
+
+    def test_admin_edits_keep_tags_in_line(self):
+        row = self.save("https://a.gov.in/1", ["Aadhaar Card"])
+        row.documents_required = ["Domicile Certificate"]
+        row.security_flags = ["Pushy Tone Detected: urgent"]
+        site._registry[VerifiedScholarship].save_model(RequestFactory().post('/admin/'), row, None, change=True)
+        self.assertEqual(self.tags(row), {(DOCUMENT, "domicile certificate"), (FLAG, "pushy tone detected")})
+
+    def test_profile_matching(self):
+        easy = self.save("https://a.gov.in/1", ["Aadhaar Card"])
+        self.save("https://a.gov.in/2", ["Aadhaar Card", "Income Certificate (Below 2.5 LPA)", "Caste Certificate"])
+        flagged = self.save("http://a.example/3", [], ["Insecure Connection (No SSL)"])
+        everything = VerifiedScholarship.objects.all()
+
+        matched = filter_by_tags(everything, {'have_documents': "aadhaar card,Income Certificate"})
+        self.assertEqual(set(matched), {easy, flagged})
+        matched = filter_by_tags(everything, {'have_documents': "Aadhaar Card", 'exclude_flags': "Insecure Connection"})
+        self.assertEqual(set(matched), {easy})
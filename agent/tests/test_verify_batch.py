@@ -0,0 +1,73 @@
+# agent/tests/test_verify_batch.py
+import json
+
+from django.test import RequestFactory, SimpleTestCase
+
+from agent.views import MAX_BATCH_ITEMS, parse_batch_items
+
+GOV = "https://scholarships.gov.in/"
+BLOG = "http://free-scholarship-money.example/apply"
+
+
+def post(body, content_type='application/json'):
+    return RequestFactory().post('/api/verify/batch/', data=body, content_type=content_type)
+
+
+class ParseBatchItemsTests(SimpleTestCase):
+    def test_json_list_and_urls_object(self):
+        expected = [(GOV, ""), (BLOG, "Get money fast")]
+        items = [GOV, {"url": BLOG, "title": "Get money fast"}]
+        self.assertEqual(parse_batch_items(post(json.dumps(items))), expected)
+        self.assertEqual(parse_batch_items(post(json.dumps({"urls": items}))), expected)
+
+    def test_single_object_is_a_batch_of_one(self):
+        body = json.dumps({"url": GOV, "title": "NSP"})
+        self.assertEqual(parse_batch_items(post(body)), [(GOV, "NSP")])
+        # One NDJSON line without the x-ndjson content type reads the same
+        self.assertEqual(parse_batch_items(post(body, 'text/plain')), [(GOV, "NSP")])
+
+    def test_ndjson_lines_stand_on_their_own(self):
+        body = "\n".join([json.dumps({"url": GOV}), BLOG, "{broken", "", json.dumps(42)])
+        items = parse_batch_items(post(body, 'application/x-ndjson'))
+        self.assertEqual(items[:2], [(GOV, ""), (BLOG, "")])
+        self.assertIsInstance(items[2], str) # not JSON, not a URL
+        self.assertIsInstance(items[3], str) # JSON, but not an item
+        self.assertEqual(len(items), 4)
+
+    def test_unreadable_documents_raise(self):
+        for body in ['{"urls": [', '{"links": []}', '"just a string"']:
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                parse_batch_items(post(body))
+
+
+class VerifyBatchApiTests(SimpleTestCase):
+    def lines(self, response):
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    def test_streams_one_verdict_per_item_then_a_summary(self):
+        response = self.client.post('/api/verify/batch/', data=json.dumps([GOV, "ftp://x", GOV, BLOG]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['X-Batch-Size'], '4')
+
+        *verdicts, summary = self.lines(response)
+        self.assertEqual([v['index'] for v in verdicts], [0, 1, 2, 3])
+        self.assertEqual((verdicts[0]['trust_score'], verdicts[0]['is_safe']), (100, True))
+        self.assertIn('error', verdicts[1])
+        self.assertEqual(verdicts[2]['trust_score'], verdicts[0]['trust_score'])
+        self.assertTrue(verdicts[3]['is_scam'])
+        self.assertEqual(summary, {"done": True, "total": 4, "errors": 1})
+
+    def test_single_object_body(self):
+        response = self.client.post('/api/verify/batch/', data=json.dumps({"url": GOV}), content_type='application/json')
+        *verdicts, summary = self.lines(response)
+        self.assertEqual(verdicts[0]['analyzed_url'], GOV)
+        self.assertEqual(summary['total'], 1)
+
+    def test_rejected_requests(self):
+        self.assertEqual(self.client.get('/api/verify/batch/').status_code, 405)
+        self.assertEqual(self.client.post('/api/verify/batch/', data='[]', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post('/api/verify/batch/', data='{oops', content_type='application/json').status_code, 400)
+        too_many = json.dumps([GOV] * (MAX_BATCH_ITEMS + 1))
+        self.assertEqual(self.client.post('/api/verify/batch/', data=too_many, content_type='application/json').status_code, 413)
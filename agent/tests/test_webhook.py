@@ -0,0 +1,53 @@
+# agent/tests/test_webhook.py
+from unittest import mock
+
+from django.test import TestCase
+
+from agent import views
+from agent.models import WebhookReceipt
+
+SCAM = {'Body': "is this real? http://free-scholarship-cash.example/apply", 'From': "whatsapp:+919800000001"}
+
+
+class WhatsAppWebhookTests(TestCase):
+    def deliver(self, message_sid, **form):
+        return self.client.post('/api/whatsapp/', {**SCAM, 'MessageSid': message_sid, **form})
+
+    def test_duplicate_message_sid_replays_the_first_reply(self):
+        with mock.patch.object(views, 'process_whatsapp_message', wraps=views.process_whatsapp_message) as process:
+            first = self.deliver('SM1')
+            retry = self.deliver('SM1')
+            other = self.deliver('SM2')
+
+        self.assertEqual(process.call_count, 2) # SM1 once, SM2 once
+        self.assertEqual(first['X-Webhook-Delivery'], 'fresh')
+        self.assertEqual(retry['X-Webhook-Delivery'], 'replayed')
+        self.assertEqual(retry.content, first.content)
+        self.assertIn("SCAM DETECTED", first.content.decode())
+        self.assertEqual(other['X-Webhook-Delivery'], 'fresh')
+
+    def test_error_replies_are_not_replayed(self):
+        media = {'NumMedia': '1', 'MediaUrl0': "https://api.twilio.com/media/1", 'MediaContentType0': "image/jpeg"}
+        with mock.patch.object(views, 'extract_url_with_gemini', return_value="ERROR: Gemini API failed -> 503"):
+            first = self.deliver('SM1', **media)
+        self.assertIn("Gemini API failed", first.content.decode())
+        self.assertFalse(WebhookReceipt.objects.filter(message_sid='SM1').exists())
+
+        with mock.patch.object(views, 'extract_url_with_gemini', return_value="http://free-scholarship-cash.example/"):
+            retry = self.deliver('SM1', **media)
+        self.assertEqual(retry['X-Webhook-Delivery'], 'fresh')
+        self.assertIn("SCAM DETECTED", retry.content.decode())
+
+    def test_a_crashed_delivery_is_processed_again(self):
+        with mock.patch.object(views, 'process_whatsapp_message', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.deliver('SM1')
+        self.assertFalse(WebhookReceipt.objects.exists())
+        self.assertEqual(self.deliver('SM1')['X-Webhook-Delivery'], 'fresh')
+
+    def test_in_flight_duplicate_asks_twilio_to_retry(self):
+        self.deliver('SM1')
+        WebhookReceipt.objects.filter(message_sid='SM1').update(state='processing')
+        with mock.patch('agent.idempotency.WAIT_TIMEOUT', 0):
+            response = self.deliver('SM1')
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '5'))
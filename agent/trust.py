@@ -0,0 +1,92 @@
+# agent/trust.py
+# The Trust Engine as plain functions: no Django, no network, no DB. Importable
+# from worker processes and scripts without settings (see `manage.py score_urls`).
+from urllib.parse import urlparse
+
+# ==========================================
+#  1. NLP TONE ANALYZER (The "Scam Detector")
+# ==========================================
+PUSHY_PATTERNS = (
+    "act now", "don't wait", "urgent", "immediate action",
+    "expires in", "last chance", "hurry", "limited spots",
+)
+GUARANTEES = ("100% success", "guaranteed", "no selection", "direct entry", "free cash")
+
+
+def analyze_nlp_tone(text):
+    """
+    Analyzes text for 'Pushy' or 'Aggressive' tones.
+    """
+    text = text.lower()
+    penalty = 0
+    flags = []
+
+    # 1. THE "PUSHY" CHECK
+    if text.count('!') > 2:
+        penalty -= 15
+        flags.append("Aggressive Punctuation (!!!)")
+
+    found_pushy = [w for w in PUSHY_PATTERNS if w in text]
+    if found_pushy:
+        penalty -= 25
+        flags.append(f"Pushy Tone Detected: {', '.join(found_pushy)}")
+
+    # 2. THE "TOO GOOD TO BE TRUE" CHECK
+    if any(g in text for g in GUARANTEES):
+        penalty -= 30
+        flags.append("Unrealistic Guarantees")
+
+    return penalty, flags
+
+# ==========================================
+#  2. AUTHENTICITY VERIFICATION (Fixed Scoring)
+# ==========================================
+TRUSTED_GOV = ('.gov.in', '.nic.in', '.ai', 'aicte-india.org')
+TRUSTED_EDU = ('.edu.in', '.ac.in')
+REPUTABLE_NEWS = ('timesofindia', 'hindustantimes', 'ndtv', 'jagran', 'careers360', 'shiksha')
+
+
+def verify_url_authenticity(url, title=""):
+    """Scores a link from -100 to 100. Returns (score, flags, status)."""
+    try:
+        domain = urlparse(url).netloc
+    except Exception:
+        return 0, ["Invalid URL"], ""
+
+    # Start with a Baseline Score
+    trust_score = 50
+    flags = []
+
+    # --- LAYER 1: STRICT WHITELIST (Gov & Edu) ---
+    if any(t in domain for t in TRUSTED_GOV):
+        return 100, ["Official Government Source"], "High Trust"
+
+    if any(t in domain for t in TRUSTED_EDU):
+        return 90, ["Official Educational Institute"], "High Trust"
+
+    # --- LAYER 2: REPUTABLE NEWS SOURCES ---
+    if any(news in domain for news in REPUTABLE_NEWS):
+        trust_score += 30 # Bumps them to 80 (Verified)
+        flags.append("Reputable News Source")
+
+    # --- LAYER 3: NLP TONE CHECK ---
+    combined_text = f"{url} {title}"
+    nlp_penalty, nlp_flags = analyze_nlp_tone(combined_text)
+
+    trust_score += nlp_penalty
+    flags.extend(nlp_flags)
+
+    # --- LAYER 4: SECURITY ---
+    if not url.startswith("https"):
+        trust_score -= 50 # Massive penalty for HTTP
+        flags.append("Insecure Connection (No SSL)")
+    else:
+        trust_score += 10 # Small bonus for having SSL
+
+    # Clamp score between -100 and 100
+    final_score = max(-100, min(100, trust_score))
+
+    status = "Verified" if final_score > 60 else "Caution"
+    if final_score < 30: status = "Risk"
+
+    return final_score, flags, status
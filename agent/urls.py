@@ -6,9 +6,14 @@ urlpatterns = [
     # Ensure name is exactly "dashboard"
     path('', views.dashboard_ui, name="dashboard"),
     path('api/search/', views.search_and_verify, name="api_search"),
+    path('api/scan/', views.api_scan_endpoint, name='api_scan'),
     path('api/verify/', views.api_verify_url, name='api_verify'),
+    path('api/verify/batch/', views.api_verify_batch, name='api_verify_batch'),
     path('api/list/', views.get_verified_scholarships, name="api_list"),
     path('api/whatsapp/', views.whatsapp_webhook, name='whatsapp_webhook'),
     path('api/main-search/', views.api_main_site_search, name='api_main_site_search'),
     path('api/saved-scholarships/', views.api_get_saved_scholarships, name='api_get_saved_scholarships'),
+    path('api/facets/', views.api_facets, name='api_facets'),
+    path('api/export/', views.api_export, name='api_export'),
+    path('api/metrics/', views.api_metrics, name='api_metrics'),
 ]
\ No newline at end of file
@@ -1,27 +1,46 @@
 # agent/views.py
 import os
 import re
+import sys
+import hmac
+import json
 import tempfile
 import urllib.parse
 import requests
 import google.generativeai as genai
 
+from datetime import date, timedelta
+
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
 from twilio.twiml.messaging_response import MessagingResponse
 from dotenv import load_dotenv
 
 # Internal imports
-from .models import VerifiedScholarship
+from . import breaker, export, facets, metrics, ratelimit
+from .models import ScholarshipTag, VerifiedScholarship
+from .tags import DOCUMENT, FLAG, parse_tag_list
+from .reminders import subscribe, unsubscribe
+from .idempotency import handle_once
 from .utils import (
     search_web_for_scholarships, 
     verify_url_authenticity, 
     extract_details, 
     extract_rich_metadata,
-    save_scholarship_to_db
+    save_scholarship_to_db,
+    dedupe_by_canonical_url,
+    mark_examined,
+    normalize_category,
+    refresh_category_coalesced
 )
+from .canonical import canonicalize_url
+from .crawler import official_portal_scholarships
+from .landing import LandingBudget
 
 # ==========================================
 # Configure API Keys Securely
@@ -34,20 +53,47 @@ gemini_key = os.getenv("GEMINI_API_KEY")
 if gemini_key:
     genai.configure(api_key=gemini_key)
 else:
-    print("⚠️ WARNING: GEMINI_API_KEY is missing from your .env file or Render Dashboard!")
+    print("⚠️ WARNING: GEMINI_API_KEY is missing from your .env file or Render Dashboard!", file=sys.stderr)
 
 # ==========================================
 # AI Helper Functions
 # ==========================================
-def extract_url_with_gemini(media_url, mime_type):
+URL_PATTERN = re.compile(r'(https?://[^\s<>"\')\]]+)')
+
+def extract_url_without_ai(content, mime_type, caption=""):
+    """
+    Fallback while Gemini is unavailable: a plain regex over the message caption
+    and, for PDFs, the raw file (link annotations are usually stored uncompressed).
+    """
+    texts = [caption or ""]
+    if content and 'pdf' in (mime_type or ''):
+        texts.append(content.decode('latin-1'))
+    for text in texts:
+        match = URL_PATTERN.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+def extract_url_with_gemini(media_url, mime_type, caption=""):
     """Downloads Twilio media, passes it to Gemini Vision, and extracts the URL."""
     try:
         # DEBUG CHECK: Are the keys actually loaded?
         if not twilio_sid or not twilio_token:
             return "ERROR: Server cannot find TWILIO_ACCOUNT_SID or TWILIO_AUTH_TOKEN! Check your .env or Render dashboard."
 
-        # Download the image/PDF from Twilio
-        response = requests.get(media_url, auth=(twilio_sid, twilio_token))
+        # Download the image/PDF from Twilio (waits briefly for a token under bursts)
+        if not ratelimit.acquire('twilio_media', on_limit=ratelimit.WAIT, max_wait=5):
+            return "ERROR: Too many media downloads right now. Please resend the screenshot in a minute."
+        try:
+            with breaker.guard('twilio') as call:
+                response = requests.get(media_url, auth=(twilio_sid, twilio_token), timeout=10)
+                if response.status_code >= 500:
+                    call.fail(f"HTTP {response.status_code}")
+        except breaker.CircuitOpen:
+            # Twilio media is down: the caption is all we have
+            return (extract_url_without_ai(None, mime_type, caption)
+                    or "ERROR: WhatsApp media downloads are failing right now. Please send the scholarship link as a text message.")
+        ratelimit.report_response('twilio_media', response.status_code, response.headers.get('Retry-After'))
         
         if response.status_code != 200:
             return f"ERROR: Twilio blocked the image download (Status {response.status_code}). Auth attempted with SID ending in: ...{twilio_sid[-4:]}"
@@ -59,14 +105,28 @@ def extract_url_with_gemini(media_url, mime_type):
             temp_path = temp_file.name
 
         try:
-            # Upload to Gemini and ask for the URL
-            sample_file = genai.upload_file(path=temp_path)
-            model = genai.GenerativeModel(model_name="gemini-2.5-flash") # Using latest fast model
-            
-            prompt = "Extract the website link (URL) from this image. Reply ONLY with the raw URL starting with http:// or https://."
-            result = model.generate_content([sample_file, prompt])
-            extracted_text = result.text.strip()
+            if not ratelimit.acquire('gemini', on_limit=ratelimit.WAIT, max_wait=8):
+                raise RuntimeError("Gemini is over its request budget, try again shortly")
+
+            with breaker.guard('gemini'):
+                # Upload to Gemini and ask for the URL
+                sample_file = genai.upload_file(path=temp_path)
+                model = genai.GenerativeModel(model_name="gemini-2.5-flash") # Using latest fast model
+                
+                prompt = "Extract the website link (URL) from this image. Reply ONLY with the raw URL starting with http:// or https://."
+                result = model.generate_content([sample_file, prompt])
+                extracted_text = result.text.strip()
+            ratelimit.report_response('gemini', 200)
+        except breaker.CircuitOpen:
+            # Gemini is down or slow: regex-only extraction instead of waiting on it
+            metrics.incr("whatsapp.gemini_fallback")
+            extracted_text = (extract_url_without_ai(response.content, mime_type, caption)
+                              or "ERROR: The AI scanner is temporarily unavailable and no link was found in the file. Please send the scholarship link as a text message.")
         except Exception as ai_error:
+            # google.api_core raises ResourceExhausted (429) / ServiceUnavailable (503)
+            ai_status = getattr(ai_error, 'code', None)
+            if ai_status in ratelimit.THROTTLED_STATUSES:
+                ratelimit.report_response('gemini', ai_status)
             extracted_text = f"ERROR: Gemini API failed -> {str(ai_error)}"
         finally:
             # Clean up the temp file
@@ -84,93 +144,133 @@ def whatsapp_webhook(request):
     """
     Listens for WhatsApp messages. Supports both direct text URLs 
     and Image/PDF uploads using Gemini AI Vision.
+    Twilio retries slow deliveries with the same MessageSid: each message is
+    processed once and the retries get the same reply (see idempotency.py).
     """
     if request.method == 'POST':
-        incoming_msg = request.POST.get('Body', '').strip()
-        num_media = int(request.POST.get('NumMedia', 0))
+        message_sid = request.POST.get('MessageSid')
+        if not message_sid:
+            return process_whatsapp_message(request)
+
+        def reply_once():
+            response = process_whatsapp_message(request)
+            # Error replies (media download or Gemini failed) are not replayed to retries
+            return response.content.decode(), response.status_code < 400 and not response.has_header('X-Scan-Error')
+
+        status, reply = handle_once(message_sid, reply_once)
+        if reply is None:
+            # The first delivery is still working on it: have Twilio retry once more
+            response = HttpResponse(status=503)
+            response['Retry-After'] = '5'
+            return response
+        response = HttpResponse(reply, content_type='application/xml')
+        response['X-Webhook-Delivery'] = status # fresh / replayed / joined
+        return response
+
+def process_whatsapp_message(request):
+    """Handles one incoming WhatsApp message and returns the TwiML reply."""
+    incoming_msg = request.POST.get('Body', '').strip()
+    num_media = int(request.POST.get('NumMedia', 0))
+    
+    twilio_resp = MessagingResponse()
+    reply_msg = twilio_resp.message()
+    
+    target_url = None
+
+    # --- BRANCH A: USER SENT AN IMAGE OR PDF ---
+    if num_media > 0:
+        media_url = request.POST.get('MediaUrl0')
+        mime_type = request.POST.get('MediaContentType0')
         
-        twilio_resp = MessagingResponse()
-        reply_msg = twilio_resp.message()
+        extracted_text = extract_url_with_gemini(media_url, mime_type, caption=incoming_msg)
         
-        target_url = None
-
-        # --- BRANCH A: USER SENT AN IMAGE OR PDF ---
-        if num_media > 0:
-            media_url = request.POST.get('MediaUrl0')
-            mime_type = request.POST.get('MediaContentType0')
-            
-            extracted_text = extract_url_with_gemini(media_url, mime_type)
-            
-            if extracted_text.startswith("ERROR"):
-                reply_msg.body(f"🛠️ *DEBUG MODE*\n{extracted_text}")
-                return HttpResponse(str(twilio_resp), content_type='application/xml')
+        if extracted_text.startswith("ERROR"):
+            reply_msg.body(f"🛠️ *DEBUG MODE*\n{extracted_text}")
+            response = HttpResponse(str(twilio_resp), content_type='application/xml')
+            response['X-Scan-Error'] = 'media' # transient: a retry of this message should try again
+            return response
 
-            url_match = re.search(r'(https?://[^\s]+)', extracted_text)
-            
-            if url_match:
-                target_url = url_match.group(1)
+        url_match = re.search(r'(https?://[^\s]+)', extracted_text)
+        
+        if url_match:
+            target_url = url_match.group(1)
+        else:
+            reply_msg.body("🤖 *AUTHIC AGENT*\nI scanned your document but couldn't find a clear web address. Please ensure the image contains a valid URL starting with http/https.")
+            return HttpResponse(str(twilio_resp), content_type='application/xml')
+
+    # --- BRANCH B: USER SENT A TEXT MESSAGE ---
+    else:
+        # Deadline reminders: "SUBSCRIBE msbte" / "UNSUBSCRIBE msbte"
+        reminder_cmd = re.match(r'^(SUBSCRIBE|UNSUBSCRIBE)\s+(.+)$', incoming_msg, re.IGNORECASE)
+        if reminder_cmd:
+            sender = request.POST.get('From', '').replace('whatsapp:', '')
+            category = normalize_category(reminder_cmd.group(2))
+            if reminder_cmd.group(1).upper() == 'SUBSCRIBE':
+                subscribe(sender, category)
+                reply_msg.body(f"🔔 *AUTHIC AGENT*\nYou will get a reminder here before *{category}* scholarships close.\nReply UNSUBSCRIBE {category} to stop.")
+            elif unsubscribe(sender, category):
+                reply_msg.body(f"🔕 *AUTHIC AGENT*\nReminders for *{category}* are switched off.")
             else:
-                reply_msg.body("🤖 *AUTHIC AGENT*\nI scanned your document but couldn't find a clear web address. Please ensure the image contains a valid URL starting with http/https.")
-                return HttpResponse(str(twilio_resp), content_type='application/xml')
+                reply_msg.body(f"🤖 *AUTHIC AGENT*\nYou were not subscribed to *{category}* reminders.")
+            return HttpResponse(str(twilio_resp), content_type='application/xml')
 
-        # --- BRANCH B: USER SENT A TEXT MESSAGE ---
+        url_match = re.search(r'(https?://[^\s]+)', incoming_msg)
+        if url_match:
+            target_url = url_match.group(1)
         else:
-            url_match = re.search(r'(https?://[^\s]+)', incoming_msg)
-            if url_match:
-                target_url = url_match.group(1)
-            else:
-                reply_msg.body("🤖 *AUTHIC AGENT*\nPlease send me a direct scholarship link or upload a screenshot/PDF of the scholarship to run a security scan.")
-                return HttpResponse(str(twilio_resp), content_type='application/xml')
+            reply_msg.body("🤖 *AUTHIC AGENT*\nPlease send me a direct scholarship link or upload a screenshot/PDF of the scholarship to run a security scan.")
+            return HttpResponse(str(twilio_resp), content_type='application/xml')
 
-        # --- RUN THE TRUST ENGINE ON THE EXTRACTED URL ---
-        score, flags, status = verify_url_authenticity(target_url, title="WhatsApp Submission")
-        flags_text = "\n- " + "\n- ".join(flags) if flags else "\n- None detected"
+    # --- RUN THE TRUST ENGINE ON THE EXTRACTED URL ---
+    score, flags, status = verify_url_authenticity(target_url, title="WhatsApp Submission")
+    flags_text = "\n- " + "\n- ".join(flags) if flags else "\n- None detected"
+    
+    # 🚨 UPGRADED DB SAVING LOGIC 🚨
+    if score >= 60:  
+        # It's a verified link! Extract details and save it to the DB
+        metadata = extract_rich_metadata("WhatsApp Scholarship Submission", "", url=target_url)
+        db_data = {
+            "title": "Community Submitted Scholarship",
+            "url": target_url,
+            "source": "WhatsApp User",
+            "trust_score": score,
+            "status": status,
+            "security_flags": flags,
+            "deadline": metadata['deadline'],
+            "info_paragraph": "This scholarship was crowdsourced and verified via the AUTHIC WhatsApp Agent.",
+            "eligibility": metadata['eligibility'],
+            "documents_required": metadata['documents_required']
+        }
         
-        # 🚨 UPGRADED DB SAVING LOGIC 🚨
-        if score >= 60:  
-            # It's a verified link! Extract details and save it to the DB
-            metadata = extract_rich_metadata("WhatsApp Scholarship Submission", "")
-            db_data = {
-                "title": "Community Submitted Scholarship",
-                "url": target_url,
-                "source": "WhatsApp User",
-                "trust_score": score,
-                "status": status,
-                "security_flags": flags,
-                "deadline": metadata['deadline'],
-                "info_paragraph": "This scholarship was crowdsourced and verified via the AUTHIC WhatsApp Agent.",
-                "documents_required": metadata['documents_required']
-            }
-            
-            # save_scholarship_to_db returns True if it's new, False if it already exists!
-            is_new = save_scholarship_to_db("community_forwarded", db_data, added_from="WhatsApp")
+        # save_scholarship_to_db returns True if it's new, False if it already exists!
+        is_new = save_scholarship_to_db("community_forwarded", db_data, added_from="WhatsApp")
 
-            # Customize the WhatsApp message based on the database response
-            if is_new:
-                db_message = "💾 *Saved to ScholarMatch Database!*\n⭐*50 Karma points* added to your ScholarMatch Account.\n-Use karma points to get vouchers and cash!"
-            else:
-                db_message = "🔄 *Already on Portal! (Record Updated)*"
-
-            final_text = (f"✅ *VERIFIED SCHOLARSHIP*\n\n"
-                          f"🔗 *Detected URL:* {target_url}\n"
-                          f"🛡️ *Trust Score:* {score}/100\n"
-                          f"📊 *Status:* Safe to Apply\n"
-                          f"{db_message}\n\n*Scan Results:*{flags_text}")
-                          
-        elif score < 30:
-            final_text = (f"🚨 *SCAM DETECTED* 🚨\n\n"
-                          f"🔗 *Detected URL:* {target_url}\n"
-                          f"🛡️ *Trust Score:* {score}/100\n"
-                          f"⚠️ *Status:* HIGH RISK\n\n*Red Flags:*{flags_text}\n\n"
-                          f"⛔ _Do NOT submit Aadhaar or bank details to this site!_")
+        # Customize the WhatsApp message based on the database response
+        if is_new:
+            db_message = "💾 *Saved to ScholarMatch Database!*\n⭐*50 Karma points* added to your ScholarMatch Account.\n-Use karma points to get vouchers and cash!"
         else:
-            final_text = (f"⚠️ *CAUTION ADVISED*\n\n"
-                          f"🔗 *Detected URL:* {target_url}\n"
-                          f"🛡️ *Trust Score:* {score}/100\n"
-                          f"👀 *Status:* Suspicious\n\n*Scan Results:*{flags_text}")
-
-        reply_msg.body(final_text)
-        return HttpResponse(str(twilio_resp), content_type='application/xml')
+            db_message = "🔄 *Already on Portal! (Record Updated)*"
+
+        final_text = (f"✅ *VERIFIED SCHOLARSHIP*\n\n"
+                      f"🔗 *Detected URL:* {target_url}\n"
+                      f"🛡️ *Trust Score:* {score}/100\n"
+                      f"📊 *Status:* Safe to Apply\n"
+                      f"{db_message}\n\n*Scan Results:*{flags_text}")
+                      
+    elif score < 30:
+        final_text = (f"🚨 *SCAM DETECTED* 🚨\n\n"
+                      f"🔗 *Detected URL:* {target_url}\n"
+                      f"🛡️ *Trust Score:* {score}/100\n"
+                      f"⚠️ *Status:* HIGH RISK\n\n*Red Flags:*{flags_text}\n\n"
+                      f"⛔ _Do NOT submit Aadhaar or bank details to this site!_")
+    else:
+        final_text = (f"⚠️ *CAUTION ADVISED*\n\n"
+                      f"🔗 *Detected URL:* {target_url}\n"
+                      f"🛡️ *Trust Score:* {score}/100\n"
+                      f"👀 *Status:* Suspicious\n\n*Scan Results:*{flags_text}")
+
+    reply_msg.body(final_text)
+    return HttpResponse(str(twilio_resp), content_type='application/xml')
 
 # ==========================================
 # Web Dashboard View
@@ -197,6 +297,8 @@ def dashboard_ui(request):
             'source': 'Test Injection'
         })
         # ==========================================
+        raw_data = dedupe_by_canonical_url(raw_data)
+        budget = LandingBudget()
         
         for item in raw_data:
             score, flags, status = verify_url_authenticity(item['url'], item['title'])
@@ -204,7 +306,7 @@ def dashboard_ui(request):
             
             # 🚨 NEW: SAVE DASHBOARD SEARCHES TO DB 🚨
             if score >= 30:
-                metadata = extract_rich_metadata(item['title'], item.get('summary', ''))
+                metadata = extract_rich_metadata(item['title'], item.get('summary', ''), url=item['url'], budget=budget)
                 db_data = {
                     "title": item['title'],
                     "url": item['url'],
@@ -214,9 +316,13 @@ def dashboard_ui(request):
                     "security_flags": flags,
                     "deadline": metadata['deadline'],
                     "info_paragraph": metadata['info'],
-                    "documents_required": metadata['documents_required']
+                    "eligibility": metadata['eligibility'],
+                    "documents_required": metadata['documents_required'],
+                    "fingerprint": item.get('fingerprint'),
+                    "alternates": item.get('alternates', [])
                 }
                 save_scholarship_to_db(query, db_data, added_from="Web_Dashboard")
+            mark_examined(item)
             # -------------------------------------------
 
             results.append({
@@ -228,11 +334,77 @@ def dashboard_ui(request):
                 'details': details
             })
 
+        # Feeds are polled incrementally, so earlier finds for this keyword come from the DB,
+        # along with the schemes crawled from the official portals (crawler.py)
+        shown = {canonicalize_url(r['url']) for r in results}
+        stored = VerifiedScholarship.objects.filter(category__name=normalize_category(query)).order_by('-created_at')[:20]
+        for sch in [*official_portal_scholarships(query), *stored]:
+            if sch.canonical_url not in shown:
+                shown.add(sch.canonical_url)
+                results.append({
+                    'title': sch.title,
+                    'url': sch.url,
+                    'source': sch.source,
+                    'trust_score': sch.trust_score,
+                    'flags': sch.security_flags,
+                    'details': extract_details(sch.title)
+                })
+
     return render(request, 'agent/dashboard.html', {'results': results, 'query': query})
 
 # ==========================================
 # Main API Endpoints (UPGRADED FOR MULTI-DOMAIN)
 # ==========================================
+def filter_by_deadline(scholarships, params):
+    """
+    Applies the shared deadline filters to a VerifiedScholarship queryset:
+      ?deadline_from=2026-11-01&deadline_to=2026-11-30   (inclusive, YYYY-MM-DD)
+      ?closing_within=7                                  (today .. today+7 days)
+      ?hide_expired=1                                    (keeps undated ones)
+    Raises ValueError with a readable message on bad input.
+    """
+    today = timezone.localdate()
+
+    for param, lookup in (('deadline_from', 'deadline__gte'), ('deadline_to', 'deadline__lte')):
+        if params.get(param):
+            try:
+                value = date.fromisoformat(params[param])
+            except ValueError:
+                raise ValueError(f"'{param}' must be a date like 2026-11-03")
+            scholarships = scholarships.filter(**{lookup: value})
+
+    if params.get('closing_within'):
+        try:
+            days = int(params['closing_within'])
+        except ValueError:
+            raise ValueError("'closing_within' must be a number of days")
+        scholarships = scholarships.filter(deadline__range=(today, today + timedelta(days=days)))
+
+    if params.get('hide_expired', '').lower() in ('1', 'true', 'yes'):
+        scholarships = scholarships.filter(Q(deadline__gte=today) | Q(deadline__isnull=True))
+
+    return scholarships
+
+def filter_by_tags(scholarships, params):
+    """
+    Student-profile matching on the indexed tag table:
+      ?have_documents=Aadhaar Card,Income Certificate  (only scholarships needing nothing else)
+      ?exclude_flags=Insecure Connection                (drops rows carrying any of these flags)
+    Names are matched on their canonical key (tags.normalize_tag): the text before
+    ':', without qualifiers in brackets such as "(Below 2.5 LPA)", case-insensitively.
+    """
+    if 'have_documents' in params:
+        have = parse_tag_list(params['have_documents'])
+        missing = ScholarshipTag.objects.filter(scholarship=OuterRef('pk'), kind=DOCUMENT).exclude(value__in=have)
+        scholarships = scholarships.filter(~Exists(missing))
+
+    excluded = parse_tag_list(params.get('exclude_flags'))
+    if excluded:
+        flagged = ScholarshipTag.objects.filter(scholarship=OuterRef('pk'), kind=FLAG, value__in=excluded)
+        scholarships = scholarships.filter(~Exists(flagged))
+
+    return scholarships
+
 @csrf_exempt
 def api_main_site_search(request):
     """
@@ -249,33 +421,24 @@ def api_main_site_search(request):
     # 1. Split the comma-separated string into a clean list of domains
     domains = [d.strip() for d in domain_query_raw.split(',') if d.strip()]
     
-    # 2. Process each domain separately in the background
+    # 2. Process each domain separately in the background.
+    #    Concurrent requests for the same domain share ONE scrape (any worker).
+    scrape_status = {}
     for domain_query in domains:
-        raw_results = search_web_for_scholarships(domain_query)
-        
-        for result in raw_results:
-            score, flags, status = verify_url_authenticity(result['url'], result['title'])
-            
-            if score >= 30:
-                metadata = extract_rich_metadata(result['title'], result.get('summary', ''))
-                db_data = {
-                    "title": result['title'],
-                    "url": result['url'],
-                    "source": result['source'],
-                    "trust_score": score,
-                    "status": status,
-                    "security_flags": flags,
-                    "deadline": metadata['deadline'],
-                    "info_paragraph": metadata['info'],
-                    "documents_required": metadata['documents_required']
-                }
-                save_scholarship_to_db(domain_query, db_data, added_from="RSS_API")
+        scrape_status[domain_query] = refresh_category_coalesced(domain_query, added_from="RSS_API")
 
     # 3. Pull ALL data for ALL requested categories directly from the database
     lower_domains = [d.lower() for d in domains]
     
     # The __in filter acts as a massive OR operator (category=X OR category=Y)
-    saved_scholarships = VerifiedScholarship.objects.filter(category__name__in=lower_domains).order_by('-created_at')
+    saved_scholarships = (VerifiedScholarship.objects.filter(category__name__in=lower_domains)
+                          .select_related('category').prefetch_related('alternate_sources')
+                          .order_by('-created_at'))
+    try:
+        saved_scholarships = filter_by_deadline(saved_scholarships, request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    saved_scholarships = filter_by_tags(saved_scholarships, request.GET)
     
     final_output = []
     for sch in saved_scholarships:
@@ -287,15 +450,19 @@ def api_main_site_search(request):
             "trust_score": sch.trust_score,
             "status": sch.status,
             "security_flags": sch.security_flags,
-            "deadline": sch.deadline,
+            "deadline": sch.deadline.strftime("%d %b %Y") if sch.deadline else None,
+            "deadline_iso": sch.deadline.isoformat() if sch.deadline else None,
             "info_paragraph": sch.info_paragraph,
+            "eligibility": sch.eligibility,
             "documents_required": sch.documents_required,
             "added_from": sch.added_from,
-            "category": sch.category.name if sch.category else "general"
+            "category": sch.category.name if sch.category else "general",
+            "alternate_sources": [{"url": alt.url, "source": alt.source} for alt in sch.alternate_sources.all()]
         })
 
     return JsonResponse({
         "requested_domains": domains,
+        "scrape_status": scrape_status,
         "total_in_database": len(final_output),
         "scholarships": final_output
     })
@@ -305,12 +472,16 @@ def api_get_saved_scholarships(request):
     """
     FAST READ-ONLY API for the frontend.
     Now supports multiple categories: ?category=engineering,medical
+    and deadline ranges: ?closing_within=7&hide_expired=1 (see filter_by_deadline)
+    and profile matching: ?have_documents=...&exclude_flags=... (see filter_by_tags)
     """
     category_query_raw = request.GET.get('category', '').lower().strip()
     source_query = request.GET.get('source', '').strip()
 
     # 1. Start by grabbing EVERYTHING, sorted by newest first
-    scholarships = VerifiedScholarship.objects.all().order_by('-created_at')
+    scholarships = (VerifiedScholarship.objects.all()
+                    .select_related('category').prefetch_related('alternate_sources')
+                    .order_by('-created_at'))
 
     # 2. If the frontend asked for specific categories, filter them
     if category_query_raw:
@@ -321,6 +492,15 @@ def api_get_saved_scholarships(request):
     if source_query:
         scholarships = scholarships.filter(added_from__icontains=source_query)
 
+    # 3b. Deadline range filters (indexed DateField, no Python-side scanning)
+    try:
+        scholarships = filter_by_deadline(scholarships, request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # 3c. Profile matching: documents the student has, flags they won't accept
+    scholarships = filter_by_tags(scholarships, request.GET)
+
     # 4. Package it into clean JSON
     final_output = []
     for sch in scholarships:
@@ -332,11 +512,14 @@ def api_get_saved_scholarships(request):
             "trust_score": sch.trust_score,
             "status": sch.status,
             "security_flags": sch.security_flags,
-            "deadline": sch.deadline,
+            "deadline": sch.deadline.strftime("%d %b %Y") if sch.deadline else None,
+            "deadline_iso": sch.deadline.isoformat() if sch.deadline else None,
             "info_paragraph": sch.info_paragraph,
+            "eligibility": sch.eligibility,
             "documents_required": sch.documents_required,
             "added_from": sch.added_from,
             "category": sch.category.name if sch.category else "general",
+            "alternate_sources": [{"url": alt.url, "source": alt.source} for alt in sch.alternate_sources.all()],
             "date_added": sch.created_at.strftime("%b %d, %Y")
         })
 
@@ -344,7 +527,9 @@ def api_get_saved_scholarships(request):
         "total_results": len(final_output),
         "active_filters": {
             "categories": category_query_raw.split(',') if category_query_raw else ["All"],
-            "source": source_query or "All"
+            "source": source_query or "All",
+            "deadline": {k: request.GET[k] for k in ('deadline_from', 'deadline_to', 'closing_within', 'hide_expired') if request.GET.get(k)},
+            "profile": {k: request.GET[k] for k in ('have_documents', 'exclude_flags') if k in request.GET}
         },
         "data": final_output
     })
@@ -359,11 +544,32 @@ def api_scan_endpoint(request):
     processed_results = []
     for result in raw_results:
         score, flags, status = verify_url_authenticity(result['url'], result['title'])
+        # Scans don't save anything: only entries the Trust Engine throws out are
+        # settled, the rest stay unseen for the next dashboard/API scrape to save
+        if score < 30:
+            mark_examined(result)
+        result.pop('mark_seen', None)
         result['trust_score'] = score
         result['flags'] = flags
         result['status'] = status
         processed_results.append(result)
 
+    # Feeds are polled incrementally (a repeat scan may get nothing new): add earlier finds
+    # from the DB and the schemes crawled from the official portals
+    shown = {canonicalize_url(r['url']) for r in processed_results}
+    stored = VerifiedScholarship.objects.filter(category__name=normalize_category(query)).order_by('-created_at')[:20]
+    for sch in [*official_portal_scholarships(query), *stored]:
+        if sch.canonical_url not in shown:
+            shown.add(sch.canonical_url)
+            processed_results.append({
+                'title': sch.title,
+                'url': sch.url,
+                'source': sch.source,
+                'trust_score': sch.trust_score,
+                'flags': sch.security_flags,
+                'status': sch.status,
+            })
+
     return JsonResponse({
         "target_query": query,
         "results_found": len(processed_results),
@@ -378,19 +584,179 @@ def api_verify_url(request):
 
     target_url = urllib.parse.unquote(encoded_url)
     score, flags, status = verify_url_authenticity(target_url, title="WhatsApp Submission")
-    
+    return JsonResponse(build_verdict(target_url, score, flags, status))
+
+def build_verdict(target_url, score, flags, status):
+    """The public Trust Engine verdict shape, shared by single and batch verification."""
     is_safe = True if score > 60 else False
     is_scam = True if score < 30 else False
 
-    return JsonResponse({
+    return {
         "analyzed_url": target_url,
         "trust_score": score,
         "status": status,
         "is_safe": is_safe,
         "is_scam": is_scam,
         "flags_detected": flags
+    }
+
+# ==========================================
+# Bulk Verification (partner colleges)
+# ==========================================
+MAX_BATCH_BYTES = 1024 * 1024 # 1 MB of JSON/NDJSON
+MAX_BATCH_ITEMS = 1000
+
+def parse_batch_items(request):
+    """
+    Accepts either a JSON body (a list, {"urls": [...]}, or a single item) or NDJSON
+    (one item per line). Each item is a URL string or {"url": "...", "title": "..."}.
+    Returns a list whose entries are (url, title) tuples, or an error string for
+    lines that could not be read, so one bad line doesn't fail the batch.
+    """
+    body = request.body.decode('utf-8', errors='replace').strip()
+    payload = None
+    if 'ndjson' not in (request.content_type or ''):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            if '\n' not in body:
+                raise # a single broken JSON document -> 400 in the view
+
+    if payload is None:
+        # NDJSON: every line stands on its own
+        raw_items = []
+        for line in body.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw_items.append(json.loads(line))
+            except ValueError:
+                # A bare URL line is fine too
+                raw_items.append(line if line.startswith('http') else ValueError("Line is not valid JSON"))
+    else:
+        if isinstance(payload, dict):
+            # {"url": ...} alone (or one NDJSON line sent as JSON) is a batch of one
+            raw_items = payload['urls'] if 'urls' in payload else [payload] if 'url' in payload else None
+        else:
+            raw_items = payload
+        if not isinstance(raw_items, list):
+            raise ValueError("Expected a JSON list of URLs")
+
+    items = []
+    for raw in raw_items:
+        if isinstance(raw, Exception):
+            items.append(str(raw))
+        elif isinstance(raw, str):
+            items.append((raw.strip(), ""))
+        elif isinstance(raw, dict) and isinstance(raw.get('url'), str):
+            items.append((raw['url'].strip(), str(raw.get('title') or "")))
+        else:
+            items.append("Each item must be a URL string or an object with a 'url' field")
+    return items
+
+@csrf_exempt
+def api_verify_batch(request):
+    """
+    POST /api/verify/batch/ — scores up to MAX_BATCH_ITEMS links in one request.
+    Verdicts are streamed back as NDJSON, one line per input item (with its
+    "index"), followed by a summary line. Bad items get an "error" line instead.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "POST a JSON or NDJSON list of URLs"}, status=405)
+
+    if int(request.META.get('CONTENT_LENGTH') or 0) > MAX_BATCH_BYTES:
+        return JsonResponse({"error": f"Request body is larger than {MAX_BATCH_BYTES} bytes"}, status=413)
+
+    try:
+        items = parse_batch_items(request)
+    except ValueError as e:
+        return JsonResponse({"error": f"Could not read the batch: {e}"}, status=400)
+
+    if not items:
+        return JsonResponse({"error": "The batch is empty"}, status=400)
+    if len(items) > MAX_BATCH_ITEMS:
+        return JsonResponse({"error": f"At most {MAX_BATCH_ITEMS} URLs per batch (got {len(items)})"}, status=413)
+
+    def stream_verdicts():
+        verdicts = {} # the same (url, title) is only scored once per batch
+        errors = 0
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                errors += 1
+                line = {"index": index, "error": item}
+            elif not item[0].startswith(('http://', 'https://')):
+                errors += 1
+                line = {"index": index, "url": item[0], "error": "URL must start with http:// or https://"}
+            else:
+                if item not in verdicts:
+                    score, flags, status = verify_url_authenticity(item[0], title=item[1])
+                    verdicts[item] = build_verdict(item[0], score, flags, status)
+                line = {"index": index, **verdicts[item]}
+            yield json.dumps(line) + "\n"
+
+        yield json.dumps({"done": True, "total": len(items), "errors": errors}) + "\n"
+
+    response = StreamingHttpResponse(stream_verdicts(), content_type='application/x-ndjson')
+    response['X-Batch-Size'] = str(len(items))
+    return response
+
+def api_metrics(request):
+    """Operational counters for this worker + shared upstream budgets."""
+    snapshot = metrics.snapshot()
+    unwraps = {outcome: snapshot["counters"].get(f"gnews.unwrap.{outcome}", 0)
+               for outcome in ("decoded", "opaque_id", "undecodable")}
+    return JsonResponse({
+        "worker_pid": os.getpid(),
+        **snapshot,
+        # Share of Google News links resolved from the article ID, with no redirect request
+        "gnews_offline_hit_rate": round(unwraps["decoded"] / sum(unwraps.values()), 3) if any(unwraps.values()) else None,
+        "upstream_budgets": ratelimit.budget_snapshot(),
+        "circuit_breakers": breaker.breaker_snapshot()
     })
 
+def api_facets(request):
+    """Scholarship counts per category / source / status, read from the running counters."""
+    return JsonResponse({"status": "success", "facets": facets.current_facets()})
+
+def export_token_ok(request):
+    """Bearer token from EXPORT_API_TOKENS; with no tokens configured the export is switched off."""
+    tokens = getattr(settings, 'EXPORT_API_TOKENS', [])
+    scheme, _, supplied = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if scheme.lower() != 'bearer' or not supplied:
+        return False
+    # compare_digest against every token, so timing doesn't reveal which one nearly matched
+    return any([hmac.compare_digest(supplied.strip().encode(), token.encode()) for token in tokens])
+
+def api_export(request):
+    """
+    GET /api/export/?format=ndjson|csv|parquet&since=<ISO timestamp>
+    Streams the scholarship table chunk by chunk (constant memory). `since` limits
+    it to rows inserted or updated since then (deletions are not included, see
+    export.iter_chunks); pass back X-Export-High-Water-Mark next time.
+    """
+    if not getattr(settings, 'EXPORT_API_TOKENS', []):
+        return JsonResponse({"error": "Exports are disabled (no EXPORT_API_TOKENS configured)"}, status=404)
+    if not export_token_ok(request):
+        response = JsonResponse({"error": "A valid 'Authorization: Bearer <token>' header is required"}, status=401)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+
+    fmt = request.GET.get('format', 'ndjson').lower()
+    high_water_mark = timezone.now() # rows changed from here on belong to the next export
+    try:
+        since = export.parse_since(request.GET.get('since'))
+        stream = export.export_stream(fmt, since=since)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    response = StreamingHttpResponse(stream, content_type=export.CONTENT_TYPES[fmt])
+    suffix = f"-since-{since:%Y%m%dT%H%M%S}" if since else ""
+    response['Content-Disposition'] = f'attachment; filename="scholarships{suffix}.{fmt}"'
+    response['X-Export-High-Water-Mark'] = high_water_mark.isoformat()
+    response['Cache-Control'] = 'no-store'
+    return response
+
 # ==========================================
 # Legacy Route Placeholders 
 # ==========================================
@@ -0,0 +1,126 @@
+# agent/writequeue.py
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import connection, transaction, OperationalError
+
+from . import metrics
+
+MAX_BATCH = getattr(settings, 'SCHOLARSHIP_WRITE_MAX_BATCH', 50)
+MAX_DELAY = getattr(settings, 'SCHOLARSHIP_WRITE_MAX_DELAY', 0.05)
+LOCK_RETRIES = 5
+
+
+class WriteQueue:
+    """
+    Funnels writes from every request thread in this worker into one writer
+    thread, which commits them in short batched transactions. SQLite allows a
+    single writer at a time, so 50 upserts in one BEGIN IMMEDIATE ... COMMIT
+    beat 50 threads queueing for the lock one by one.
+
+    `write_fn(*args)` runs inside the batch transaction; each call gets its own
+    savepoint, so one bad row fails only its own caller.
+    """
+
+    def __init__(self, write_fn, name="scholarships"):
+        self.write_fn = write_fn
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, *args):
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((args, future, time.monotonic()))
+        return future
+
+    def wait(self, future, timeout):
+        """
+        Result of a submitted write. A write that has not started within
+        `timeout` seconds is cancelled (it will never commit) and TimeoutError
+        is raised; one already in the batch transaction is waited for, so the
+        caller never reports a failure for a row that was in fact saved.
+        """
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            if future.cancel():
+                metrics.incr(f"db.{self.name}.cancelled")
+                raise
+            return future.result()
+
+    def _ensure_thread(self):
+        # Started lazily, and again in each forked gunicorn worker
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                if self._pid is not None and self._pid != os.getpid():
+                    self._queue = queue.Queue() # inherited from the parent process by fork
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + MAX_DELAY
+            while len(batch) < MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Writes whose caller gave up (see wait()) are dropped; the rest can no longer be cancelled
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                connection.close_if_unusable_or_obsolete()
+
+    def _commit(self, batch):
+        for attempt in range(LOCK_RETRIES):
+            results = []
+            started = time.monotonic()
+            try:
+                with transaction.atomic():
+                    # BEGIN IMMEDIATE has returned: we now hold the write lock
+                    metrics.observe(f"db.{self.name}.lock_wait", time.monotonic() - started)
+                    for args, _, _ in batch:
+                        try:
+                            with transaction.atomic():
+                                results.append((True, self.write_fn(*args)))
+                        except OperationalError:
+                            raise
+                        except Exception as e:
+                            results.append((False, e))
+                break
+            except OperationalError as e:
+                if 'locked' not in str(e) or attempt == LOCK_RETRIES - 1:
+                    raise
+                metrics.incr(f"db.{self.name}.locked_retries")
+                time.sleep(0.05 * (2 ** attempt))
+
+        committed_at = time.monotonic()
+        metrics.observe(f"db.{self.name}.batch_size", len(batch))
+        metrics.observe(f"db.{self.name}.transaction_seconds", committed_at - started)
+        for (ok, value), (_, future, queued_at) in zip(results, batch):
+            metrics.observe(f"db.{self.name}.write_latency", committed_at - queued_at)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,6 +82,34 @@ DATABASES = {
     }
 }
 
+# Write contention: when several gunicorn workers write to the same SQLite file,
+# the deployment turns on two switches (both off by default, e.g. for local runs and tests):
+#  - SQLITE_PROFILE=production: the profile below
+#  - WEB_THREADS=<gunicorn --threads>: batches scholarship upserts (SCHOLARSHIP_WRITE_BATCHING,
+#    further down); only worth it when a worker serves several requests at once
+#
+# Production SQLite profile:
+#  - WAL lets readers keep reading while one writer commits
+#  - BEGIN IMMEDIATE takes the write lock up front, so waiting writers honour the
+#    busy timeout instead of failing with "database is locked" on lock upgrade
+#  - synchronous=NORMAL is durable under WAL and avoids an fsync per commit
+if os.getenv('SQLITE_PROFILE', 'default') == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,          # keep connections (and their page cache) between requests
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,            # busy timeout in seconds
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-20000;'  # ~20 MB page cache per connection
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA mmap_size=134217728;'
+            ),
+        },
+    })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,4 +155,96 @@ import os
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
\ No newline at end of file
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# ==========================================
+# AUTHIC Agent tuning
+# ==========================================
+# Landing-page metadata extractor (agent/landing.py)
+LANDING_PAGE_MAX_BYTES = 512 * 1024       # hard cap on bytes read per scholarship page
+LANDING_PAGE_TIMEOUT = 3.5                # seconds per socket read
+LANDING_PAGE_FETCH_DEADLINE = 6.0         # wall-clock seconds for one whole page fetch
+LANDING_PAGE_REQUEST_BUDGET = 12.0        # wall-clock seconds of page fetches per request/scrape
+LANDING_PAGE_REFRESH_SECONDS = 6 * 60 * 60 # re-check (conditional GET) after this long
+
+# Single-flight scraping (agent/singleflight.py)
+SCRAPE_COALESCE_TIMEOUT = 20  # seconds a waiting request waits before serving DB results
+SCRAPE_LEASE_SECONDS = 120    # a crashed worker's scrape lease expires after this (renewed while a scrape runs)
+
+# Outbound rate limiting (agent/ratelimit.py): token bucket per upstream, shared by all workers.
+# The per-upstream rates live in ratelimit.DEFAULT_LIMITS; override single values here,
+# e.g. {'twilio_messages': {'rate': 20.0}} (tokens/second) or {'gemini': {'burst': 10}}.
+UPSTREAM_RATE_LIMITS = {}
+UPSTREAM_TOKEN_LEASE_SECONDS = 1.0   # a worker claims this much refill per DB write and spends it from memory
+UPSTREAM_BACKOFF_BASE_SECONDS = 2.0  # first pause after a 429/503, doubles on repeats
+UPSTREAM_BACKOFF_MAX_SECONDS = 300.0
+
+# Write-coalescing queue for scholarship upserts (agent/writequeue.py), the second
+# write-contention switch (see DATABASES). Only worth it when one worker serves several
+# requests at once: with sync workers every batch would hold a single write and only add
+# latency. Set the WEB_THREADS env var to the gunicorn --threads value of the start command.
+WEB_THREADS = int(os.getenv('WEB_THREADS', '1'))
+SCHOLARSHIP_WRITE_BATCHING = WEB_THREADS > 1
+SCHOLARSHIP_WRITE_TIMEOUT = 60      # seconds a write may wait to start before it is cancelled
+SCHOLARSHIP_WRITE_MAX_BATCH = 50
+SCHOLARSHIP_WRITE_MAX_DELAY = 0.05 # seconds to wait for more writes before committing
+
+# Incremental RSS polling (agent/feeds.py)
+RSS_POLL_INTERVAL_SECONDS = 15 * 60     # expected interval; quiet feeds back off up to the max
+RSS_POLL_MAX_INTERVAL_SECONDS = 60 * 60
+RSS_SEEN_ENTRY_TTL_DAYS = 30
+
+# Search providers (agent/providers.py): the first one starts at once, the rest are hedges
+SEARCH_PROVIDERS = ['google_news_rss', 'ddgs']
+SEARCH_HEDGE_DELAY_SECONDS = 1.0 # start the next provider if the quota isn't filled by then
+SEARCH_TIMEOUT_SECONDS = 15.0    # give up on stragglers and return what we have
+
+# Circuit breakers (agent/breaker.py), state shared by all workers. The per-upstream
+# thresholds live in breaker.DEFAULT_BREAKER/DEFAULT_BREAKERS; override single values here:
+# window_seconds, min_calls, error_rate, slow_rate, slow_call_seconds, cooldown_seconds, probe_timeout
+CIRCUIT_BREAKERS = {}
+CIRCUIT_BREAKER_SYNC_SECONDS = 2.0  # healthy outcomes are written (and state re-read) at most this often per worker
+
+# WhatsApp deadline reminders (agent/reminders.py, `manage.py send_deadline_reminders`)
+TWILIO_API_BASE = os.getenv('TWILIO_API_BASE', 'https://api.twilio.com') # point at `manage.py fake_twilio` to test
+TWILIO_WHATSAPP_FROM = os.getenv('TWILIO_WHATSAPP_FROM', '+14155238886')  # sandbox number by default
+REMINDER_DAYS_BEFORE = 3       # remind when a deadline is this close (days)
+REMINDER_SEND_CONCURRENCY = 8  # sender threads; the pace itself comes from 'twilio_messages'
+REMINDER_MAX_ATTEMPTS = 3      # failed sends are retried by later runs up to this many times
+
+# WhatsApp webhook idempotency (agent/idempotency.py), keyed by Twilio's MessageSid
+WEBHOOK_RECEIPT_TTL_SECONDS = 24 * 60 * 60  # Twilio only retries within minutes; a day is plenty
+WEBHOOK_DUPLICATE_WAIT_SECONDS = 10         # a retry waits this long for the in-flight reply
+WEBHOOK_PROCESSING_LEASE_SECONDS = 120      # after this a crashed worker's message is processed again
+
+# Bulk exports (agent/export.py, `manage.py export`, GET /api/export/)
+EXPORT_API_TOKENS = [t.strip() for t in os.getenv('EXPORT_API_TOKENS', '').split(',') if t.strip()] # none -> endpoint off
+EXPORT_CHUNK_SIZE = 2000 # rows per keyset page / Parquet row group
+
+# Official portal crawler (agent/crawler.py, `manage.py crawl_portals`): every seed is crawled
+# for scheme pages, which go through the Trust Engine into the given category
+CRAWL_SEED_PORTALS = [
+    {
+        'url': 'https://mahadbt.maharashtra.gov.in/',
+        'category': 'official portals',
+        'title': 'MahaDBT Official Portal - Post Matric Scholarship', # used for the seed page itself
+        'source': 'GOV.IN (Verified Portal)',
+        'summary': 'Official Direct Benefit Transfer portal for Maharashtra State scholarships.',
+    },
+    {
+        # Certificates portal (income, domicile): crawled for scheme pages, but no
+        # title, so its own home page is not saved as a scholarship
+        'url': 'https://aaplesarkar.mahaonline.gov.in/',
+        'category': 'official portals',
+        'source': 'MAHAONLINE.GOV.IN',
+    },
+]
+CRAWL_USER_AGENT = 'AUTHIC-PortalCrawler/1.0' # robots.txt rules for this agent are honoured
+CRAWL_MAX_DEPTH = 2                  # links followed from a seed page
+CRAWL_MAX_PAGES_PER_RUN = 200        # the rest of the frontier waits for the next run
+CRAWL_CONCURRENCY = 4
+CRAWL_HOST_CONCURRENCY = 2           # parallel requests to one host
+CRAWL_HOST_DELAY_SECONDS = 1.0       # gap between requests to one host (robots.txt Crawl-delay wins if longer)
+CRAWL_RECRAWL_SECONDS = 24 * 60 * 60 # unchanged pages are re-checked (conditional GET) after this
+CRAWL_PORTAL_RESULTS = 5             # crawled portal schemes listed with every dashboard / scan search
+CRAWL_MAX_PAGE_BYTES = 1024 * 1024